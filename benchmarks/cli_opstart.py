@@ -0,0 +1,56 @@
+# Måler opstartstiden for kommandolinjen og fejler, hvis den bliver for langsom
+# eller hvis tunge pakker (streamlit, pandas, numpy) bliver importeret.
+#   python benchmarks/cli_opstart.py [--gentagelser 20] [--budget-ms 40]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TUNGE_PAKKER = ('streamlit', 'pandas', 'numpy')
+
+
+def tid_ms(cmd, stdin=b''):
+    start = time.perf_counter()
+    subprocess.run(cmd, input=stdin, stdout=subprocess.DEVNULL, check=True, cwd=ROOT)
+    return (time.perf_counter() - start) * 1000
+
+
+def median_ms(cmd, gentagelser, stdin=b''):
+    return statistics.median(tid_ms(cmd, stdin) for _ in range(gentagelser))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--gentagelser', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=40.0,
+                        help='tilladt ekstra tid i forhold til en tom Python-opstart')
+    args = parser.parse_args()
+
+    tjek = (
+        "import sys, kodesamling.cli; "
+        f"tunge = [m for m in {TUNGE_PAKKER!r} if m in sys.modules]; "
+        "sys.exit(' '.join(tunge) or None)"
+    )
+    proc = subprocess.run([sys.executable, '-c', tjek], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"FEJL: tunge pakker importeret ved opstart: {proc.stderr.strip()}")
+        return 1
+
+    tom = median_ms([sys.executable, '-c', 'pass'], args.gentagelser)
+    cli = median_ms([sys.executable, '-m', 'kodesamling', 'kod', 'morse'], args.gentagelser,
+                    stdin='hej med dig\n'.encode('utf-8'))
+    ekstra = cli - tom
+    print(f"tom python:     {tom:7.1f} ms")
+    print(f"kodesamling cli: {cli:7.1f} ms")
+    print(f"ekstra:         {ekstra:7.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if ekstra > args.budget_ms:
+        print("FEJL: opstarten er over budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# Måler alle koder fra appen på syntetisk dansk tekst i stigende størrelser:
+# tid, gennemstrømning (MB/s) og højeste hukommelsesforbrug (tracemalloc).
+# For hver kode findes eksponenten k i tid ~ størrelse^k ved mindste
+# kvadraters metode på log-log-skala, og scriptet fejler, hvis en kode vokser
+# mere end lineært. Resultatet skrives som JSON, så kørsler kan sammenlignes.
+#   python benchmarks/kodeydelse.py [--max-mb 100] [--kode morse] [--json ydelse.json]
+#
+# Romertal (ét tal ad gangen), Bogkoden (kræver en bog) og morselyd (lyd,
+# ikke tekst) er ikke med.
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from kodesamling import (  # noqa: E402
+    alpha_num_decode,
+    alpha_num_encode,
+    bacon_code_decode,
+    bacon_code_encode,
+    bifid_decode,
+    bifid_encode,
+    binær_decode,
+    binær_encode,
+    decode_100p,
+    decode_from_morse,
+    decode_roversprog,
+    encode_100p,
+    encode_roversprog,
+    encode_to_morse,
+    kodeordskode_decode,
+    kodeordskode_encode,
+    rot_x_decode,
+    rot_x_encode,
+    sms_decode,
+    sms_encode,
+    vigenere_kode,
+)
+from kodesamling.npkompat import has_numpy  # noqa: E402
+
+KB = 1024
+MB = 1024 * KB
+MIN_TID = 0.05     # sekunder; små størrelser gentages, til målingen varer mindst så længe
+MIN_STØRRELSE = 64 * KB  # eksponenten findes kun ud fra størrelser herfra, hvor faste omkostninger ikke dominerer
+MAX_EKSPONENT = 1.15
+
+_ORD = ('og i at det en den til er som på de med han af for ikke der var mig sig men et har om vi '
+        'min havde hun nu over da fra du ud sin dem os op man hans hvor eller hvad skal selv her '
+        'alle vil blev kunne ind når være dog noget ville jo deres efter ned skulle denne end dette '
+        'mit også under have dig anden hende mine alt meget sit sine vor mod disse hvis din nogle '
+        'hos blive mange ad bliver hendes været thi jer sådan spejder lejr bål kompas skov træ sø '
+        'patrulje leder kort øvelse tårn båd rygsæk sovepose mørke nat morgen frokost hæk æble').split()
+
+
+def dansk_tekst(size, seed=1):
+    # Tilfældige danske ord med enkelte punktummer og store bogstaver; præcis size tegn
+    rng = random.Random(seed)
+    words = rng.choices(_ORD, k=size // 4 + 16)
+    for i in range(0, len(words), 12):
+        words[i] = words[i].capitalize()
+    text = ' '.join(words)
+    while len(text) < size:
+        text += ' ' + text
+    return text[:size]
+
+
+# (navn, forbered(tekst) -> input, kode(input)); forbered laver fx
+# morsekode til afkodningen og tæller ikke med i tiden
+def _ingen(text):
+    return text
+
+KODER = [
+    ('morse kod', _ingen, encode_to_morse),
+    ('morse afkod', encode_to_morse, decode_from_morse),
+    ('rot-x kod', _ingen, lambda t: rot_x_encode(t, 3)),
+    ('rot-x afkod', lambda t: rot_x_encode(t, 3), lambda t: rot_x_decode(t, 3)),
+    ('alfa-nr kod', _ingen, alpha_num_encode),
+    ('alfa-nr afkod', alpha_num_encode, alpha_num_decode),
+    ('kodeordskode kod', _ingen, lambda t: kodeordskode_encode(t, 'SPEJDER')),
+    ('kodeordskode afkod', lambda t: kodeordskode_encode(t, 'SPEJDER'), lambda t: kodeordskode_decode(t, 'SPEJDER')),
+    ('sms kod', _ingen, sms_encode),
+    ('sms afkod', sms_encode, sms_decode),
+    ('100p kod', _ingen, encode_100p),
+    ('100p afkod', encode_100p, decode_100p),
+    ('røversprog kod', _ingen, encode_roversprog),
+    ('røversprog afkod', encode_roversprog, decode_roversprog),
+    ('binær kod', _ingen, binær_encode),
+    ('binær afkod', binær_encode, binær_decode),
+    ('vigenère kod', _ingen, lambda t: vigenere_kode(t, 'SJAK')),
+    ('vigenère afkod', lambda t: vigenere_kode(t, 'SJAK'), lambda t: vigenere_kode(t, 'SJAK', encode=False)),
+    ('bifid kod', _ingen, bifid_encode),
+    ('bifid afkod', bifid_encode, bifid_decode),
+    ('bacon kod', _ingen, lambda t: bacon_code_encode('hej med dig ' * (len(t) // 80 + 1), t)),
+    ('bacon afkod', lambda t: bacon_code_encode('hej med dig ' * (len(t) // 80 + 1), t), bacon_code_decode),
+]
+if has_numpy():
+    from kodesamling.vektor import rot_x_encode_np, vigenere_kode_np
+    KODER += [
+        ('rot-x kod (numpy)', _ingen, lambda t: rot_x_encode_np(t, 3)),
+        ('vigenère kod (numpy)', _ingen, lambda t: vigenere_kode_np(t, 'SJAK')),
+    ]
+
+
+def størrelser(max_bytes):
+    # 1 KB, 4 KB, 16 KB ... og til sidst max_bytes selv
+    sizes = []
+    size = KB
+    while size < max_bytes:
+        sizes.append(size)
+        size *= 4
+    sizes.append(max_bytes)
+    return sizes
+
+def mål(kode, data):
+    # (sekunder pr. kald, højeste ekstra hukommelse i bytes)
+    gc.collect()
+    gentagelser = 0
+    start = time.perf_counter()
+    while True:
+        kode(data)
+        gentagelser += 1
+        brugt = time.perf_counter() - start
+        if brugt >= MIN_TID:
+            break
+    sekunder = brugt / gentagelser
+    tracemalloc.start()
+    kode(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sekunder, peak
+
+def eksponent(punkter):
+    # Hældningen af log(tid) mod log(størrelse) ved mindste kvadraters metode
+    xs = [math.log(n) for n, _ in punkter]
+    ys = [math.log(t) for _, t in punkter]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-mb', type=float, default=4.0, help='største tekst i MB (100 for hele skalaen)')
+    parser.add_argument('--kode', action='append', help='kun koder hvis navn indeholder dette (kan gentages)')
+    parser.add_argument('--max-eksponent', type=float, default=MAX_EKSPONENT)
+    parser.add_argument('--json', help='skriv resultatet til denne fil i stedet for stdout')
+    args = parser.parse_args()
+
+    sizes = størrelser(int(args.max_mb * MB))
+    tekster = {}
+    resultat = {
+        'tidspunkt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': has_numpy(),
+        'max_eksponent': args.max_eksponent,
+        'koder': [],
+    }
+    fejl = []
+    for navn, forbered, kode in KODER:
+        if args.kode and not any(k in navn for k in args.kode):
+            continue
+        målinger = []
+        for size in sizes:
+            if size not in tekster:
+                tekster[size] = dansk_tekst(size)
+            data = forbered(tekster[size])
+            sekunder, peak = mål(kode, data)
+            målinger.append({'bytes': size, 'sekunder': sekunder,
+                             'mb_pr_sekund': size / MB / sekunder, 'peak_bytes': peak})
+            del data
+        punkter = [(m['bytes'], m['sekunder']) for m in målinger if m['bytes'] >= MIN_STØRRELSE]
+        k = eksponent(punkter) if len(punkter) >= 2 else None
+        ok = k is None or k <= args.max_eksponent
+        resultat['koder'].append({'navn': navn, 'eksponent': k, 'ok': ok, 'målinger': målinger})
+        sidste = målinger[-1]
+        print(f"{navn:22} {sidste['mb_pr_sekund']:8.1f} MB/s  peak {sidste['peak_bytes'] / MB:7.1f} MB  "
+              f"eksponent {'-' if k is None else f'{k:.2f}'}{'' if ok else '  FEJL'}", file=sys.stderr)
+        if not ok:
+            fejl.append(navn)
+
+    data = json.dumps(resultat, ensure_ascii=False, indent=1)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as out:
+            out.write(data + '\n')
+    else:
+        print(data)
+    if fejl:
+        print(f"FEJL: vokser mere end lineært: {', '.join(fejl)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
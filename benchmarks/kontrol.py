@@ -0,0 +1,120 @@
+# Kontrol af kendte fejl: hver kontrol er et lille eksempel, der engang gav
+# et forkert resultat. Fejler med en liste over dem, der ikke passer.
+#   python benchmarks/kontrol.py
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from kodesamling import koder  # noqa: E402
+from kodesamling.bogkode import Bog  # noqa: E402
+from kodesamling.genkend import identify  # noqa: E402
+from kodesamling.morseopdeling import decode_morse_unsegmented  # noqa: E402
+
+KONTROLLER = []
+
+
+def kontrol(func):
+    KONTROLLER.append(func)
+    return func
+
+
+@kontrol
+def ukendt_kode_med_tegnsætning():
+    # Koderne skriver '?' for komma og punktum; det må ikke udelukke koden
+    tekst = 'Hej, med dig.'
+    for navn, kod in (('Morsekode', koder.encode_to_morse), ('Alfa-Nr.', koder.alpha_num_encode),
+                      ('SMS-kode', koder.sms_encode), ('100P-koden', koder.encode_100p)):
+        results, _ = identify(kod(tekst), budget=5)
+        if not results or results[0][1] != navn:
+            return f"{navn}: {results[:1]}"
+
+
+@kontrol
+def morse_med_skilletegn():
+    # Grupper mellem '/' med en gyldig kode må ikke deles op
+    for kode, tekst in (('--.-/..-/../--..', 'QUIZ'), ('-..-/-.--/--..', 'XYZ'),
+                        ('-.-./-.--/-.-/./.-..', 'CYKEL'), ('..---/-----/..---/....-', '2024')):
+        if decode_morse_unsegmented(kode) != tekst:
+            return f"{kode} -> {decode_morse_unsegmented(kode)!r}, ikke {tekst!r}"
+
+
+@kontrol
+def cli_filer_efter_tilvalg():
+    # Kaldet fra README: filnavne må stå før -o og andre tilvalg
+    with tempfile.TemporaryDirectory() as mappe:
+        with open(os.path.join(mappe, 'besked.txt'), 'w', encoding='utf-8') as f:
+            f.write(koder.vigenere_kode('Vi ses i morgen', 'SJAK'))
+        kald = [sys.executable, '-m', 'kodesamling', 'afkod', 'vigenere', '-k', 'SJAK',
+                'besked.txt', '-o', 'klartekst.txt']
+        svar = subprocess.run(kald, cwd=mappe, capture_output=True, text=True,
+                              env=dict(os.environ, PYTHONPATH=ROOT))
+        if svar.returncode:
+            return svar.stderr.strip().splitlines()[-1]
+        with open(os.path.join(mappe, 'klartekst.txt'), encoding='utf-8') as f:
+            tekst = f.read()
+        if tekst.upper() != 'VI SES I MORGEN':
+            return f"klartekst.txt: {tekst!r}"
+
+
+@kontrol
+def cli_ingen_halv_fil():
+    # For kort fyldtekst til Baconkode opdages først undervejs; -o skal stå urørt
+    with tempfile.TemporaryDirectory() as mappe:
+        for navn, tekst in (('fyld.txt', 'kort fyld'), ('ud.txt', 'gammel')):
+            with open(os.path.join(mappe, navn), 'w', encoding='utf-8') as f:
+                f.write(tekst)
+        kald = [sys.executable, '-m', 'kodesamling', 'kod', 'bacon', '-k', 'hemmelig besked',
+                'fyld.txt', '-o', 'ud.txt']
+        svar = subprocess.run(kald, cwd=mappe, capture_output=True, text=True,
+                              env=dict(os.environ, PYTHONPATH=ROOT))
+        with open(os.path.join(mappe, 'ud.txt'), encoding='utf-8') as f:
+            tekst = f.read()
+        if svar.returncode != 1 or tekst != 'gammel' or sorted(os.listdir(mappe)) != ['fyld.txt', 'ud.txt']:
+            return f"returkode {svar.returncode}, ud.txt {tekst!r}, filer {sorted(os.listdir(mappe))}"
+
+
+@kontrol
+def bogkode_efter_sideskift():
+    # Første linje på en side starter efter sideskiftet, ikke på sidste linje før
+    with tempfile.TemporaryDirectory() as mappe:
+        sti = os.path.join(mappe, 'bog.txt')
+        with open(sti, 'w', encoding='utf-8') as f:
+            f.write('Der var engang en konge\nsom havde tre sønner\fDen ældste hed Per\nog den yngste Ib\n')
+        bog = Bog(sti)
+        # P i "Per" er bogstav 13 på side 2, linje 1, talt i hånden
+        for fundet, ventet in ((bog.letter(2, 1, 1), 'D'), (bog.encode('P', bogstaver=True), '2,1,13'),
+                               (bog.letter(1, 2, 1), 'S')):
+            if fundet != ventet:
+                return f"{fundet!r}, ikke {ventet!r}"
+
+
+@kontrol
+def sms_æøå_kun_i_kendte_ord():
+    # AE, OE og AA er kun Æ, Ø og Å, når ordlisten kender ordet sådan
+    for tekst, ventet in (('aerobic', 'AEROBIC'), ('shoe', 'SHOE'), ('søen går også', 'SØENGÅROGSÅ')):
+        if koder.sms_decode(koder.sms_encode(tekst)) != ventet:
+            return f"{tekst!r} -> {koder.sms_decode(koder.sms_encode(tekst))!r}, ikke {ventet!r}"
+
+
+def main():
+    fejl = []
+    for func in KONTROLLER:
+        try:
+            problem = func()
+        except Exception as e:  # en kontrol der fejler med en undtagelse, er også en fejl
+            problem = f"{type(e).__name__}: {e}"
+        print(f"{'FEJL' if problem else 'ok':4}  {func.__name__}" + (f": {problem}" if problem else ''))
+        if problem:
+            fejl.append(func.__name__)
+    if fejl:
+        print(f"FEJL: {len(fejl)} af {len(KONTROLLER)} kontroller passer ikke")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
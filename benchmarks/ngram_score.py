@@ -0,0 +1,60 @@
+# Måler n-gram-modellen (kodesamling.ngram): tid for at åbne modelfilen og
+# antal vurderede bogstavstykker pr. sekund, når mange kandidattekster
+# vurderes på én gang. Fejler under --mindst millioner stykker pr. sekund.
+#   python benchmarks/ngram_score.py [--tekster 20000] [--mindst 2]
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from kodesamling.koder import danish_alphabet, rot_x_encode  # noqa: E402
+from kodesamling.ngram import load_model, standard_model, wordlist_model_path  # noqa: E402
+from kodesamling.npkompat import has_numpy  # noqa: E402
+
+TEKST = "Vi mødes ved det gamle egetræ i skoven klokken tre"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tekster', type=int, default=20000, help='kandidattekster pr. kald')
+    parser.add_argument('--gentagelser', type=int, default=5)
+    parser.add_argument('--mindst', type=float, default=2.0, help='millioner stykker pr. sekund')
+    args = parser.parse_args()
+    if not has_numpy():
+        print("FEJL: n-gram-modellen kræver NumPy")
+        return 1
+
+    model = standard_model()  # bygger modelfilen, hvis den mangler
+    path = os.environ.get('KODESAMLING_NGRAM') or wordlist_model_path()
+    start = time.perf_counter()
+    load_model(path)
+    indlæs = time.perf_counter() - start
+
+    # Halvdelen dansk, halvdelen ROT-X af dansk, som i en knækker
+    rnd = random.Random(1)
+    tekster = [rot_x_encode(TEKST, rnd.randrange(len(danish_alphabet))) if i % 2 else TEKST
+               for i in range(args.tekster)]
+    bogstaver = sum(int(n) for n in model.text_bits(tekster)[1])
+    tider = []
+    for _ in range(args.gentagelser):
+        start = time.perf_counter()
+        model.score_many(tekster)
+        tider.append(time.perf_counter() - start)
+    pr_sekund = bogstaver / min(tider)
+    print(json.dumps({
+        'indlæsning_ms': 1000 * indlæs, 'tekster': args.tekster, 'stykker': bogstaver,
+        'sekunder': min(tider), 'millioner_stykker_pr_sekund': pr_sekund / 1e6,
+    }, ensure_ascii=False, indent=1))
+    if pr_sekund < args.mindst * 1e6:
+        print(f"FEJL: under {args.mindst:g} millioner stykker pr. sekund")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# Belastningstest af JSON-tjenesten (kodesamling.tjeneste) på localhost.
+# Starter selv en tjeneste på en ledig port (eller bruger --port på en, der
+# allerede kører), sender batches fra mange samtidige klienter med keep-alive
+# og måler konverteringer pr. sekund og svartider.
+#   python benchmarks/tjeneste_belastning.py [--klienter 32] [--sekunder 10] [--batch 100]
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEKST = "Vi mødes ved det gamle egetræ i skoven klokken tre"
+METODER = [
+    ('Morsekode', {}), ('Vigenère', {'nøgle': 'SJAK'}), ('Alfa-Nr.', {}),
+    ('ROT-X', {'offset': 3}), ('Bifid', {'period': 5}), ('SMS-kode', {}),
+]
+
+
+def ledig_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+async def vent_på(port, timeout=10.0):
+    slut = time.monotonic() + timeout
+    while time.monotonic() < slut:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("Tjenesten startede ikke")
+
+async def post(reader, writer, body):
+    data = json.dumps(body).encode('utf-8')
+    writer.write(b'POST /batch HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 b'Content-Length: %d\r\n\r\n' % len(data) + data)
+    await writer.drain()
+    hoved = await reader.readuntil(b'\r\n\r\n')
+    status = int(hoved.split(b' ', 2)[1])
+    længde = int(next(line.split(b':')[1] for line in hoved.split(b'\r\n')
+                      if line.lower().startswith(b'content-length')))
+    return status, json.loads(await reader.readexactly(længde))
+
+async def klient(port, nr, slut, batch, tider, statusser):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    metode, parametre = METODER[nr % len(METODER)]
+    body = {'metode': metode, 'handling': 'kod', 'parametre': parametre,
+            'tekster': [f'{TEKST} {i}' for i in range(batch)]}
+    konverteringer = 0
+    while time.perf_counter() < slut:
+        start = time.perf_counter()
+        status, svar = await post(reader, writer, body)
+        tider.append(time.perf_counter() - start)
+        statusser[status] = statusser.get(status, 0) + 1
+        if status == 200:
+            konverteringer += len(svar['resultater'])
+        elif status == 503:
+            await asyncio.sleep(0.01)
+    writer.close()
+    return konverteringer
+
+async def kør(args, port):
+    await vent_på(port)
+    tider, statusser = [], {}
+    start = time.perf_counter()
+    slut = start + args.sekunder
+    antal = await asyncio.gather(*(klient(port, i, slut, args.batch, tider, statusser)
+                                   for i in range(args.klienter)))
+    varighed = time.perf_counter() - start
+    # Én stor batch, som tjenesten sender videre til processpuljen
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    stor = {'metode': 'Vigenère', 'parametre': {'nøgle': 'SJAK'}, 'tekster': [TEKST * 40] * 2000}
+    t = time.perf_counter()
+    status, _ = await post(reader, writer, stor)
+    stor_tid = time.perf_counter() - t
+    writer.close()
+    tider.sort()
+    return {
+        'klienter': args.klienter, 'batch': args.batch, 'sekunder': varighed,
+        'konverteringer_pr_sekund': sum(antal) / varighed,
+        'forespørgsler': len(tider), 'statusser': statusser,
+        'median_ms': 1000 * statistics.median(tider),
+        'p99_ms': 1000 * tider[int(0.99 * (len(tider) - 1))],
+        'stor_batch': {'status': status, 'tegn': 2000 * len(TEKST) * 40, 'sekunder': stor_tid},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, help='brug en tjeneste der allerede kører')
+    parser.add_argument('--klienter', type=int, default=32)
+    parser.add_argument('--sekunder', type=float, default=10.0)
+    parser.add_argument('--batch', type=int, default=100, help='tekster pr. forespørgsel')
+    parser.add_argument('--mindst', type=float, default=0, help='fejl hvis færre konverteringer pr. sekund')
+    args = parser.parse_args()
+
+    proces = None
+    port = args.port
+    if port is None:
+        port = ledig_port()
+        proces = subprocess.Popen([sys.executable, '-m', 'kodesamling.tjeneste', '--port', str(port)], cwd=ROOT)
+    try:
+        resultat = asyncio.run(kør(args, port))
+    finally:
+        if proces is not None:
+            proces.terminate()
+            proces.wait()
+    print(json.dumps(resultat, ensure_ascii=False, indent=1))
+    if resultat['konverteringer_pr_sekund'] < args.mindst:
+        print(f"FEJL: under {args.mindst:.0f} konverteringer pr. sekund", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# Kodesamlingens koder uden Streamlit, så de kan bruges fra scripts og CLI.
+# Kun standardbiblioteket importeres her; NumPy-udgaverne ligger i
+# kodesamling.vektor og importerer først NumPy, når de bruges.
+from .bacon import BACON_VALUES, bacon_capacity, bacon_decode_many, bacon_encode_many
+from .binaer import BinærDecoder, binær_decode, binær_encode, binær_table
+from .koder import (
+    BACON_DICT,
+    MORSE_CODE_DICT,
+    SMS_KEYPAD,
+    alpha_num_decode,
+    alpha_num_encode,
+    bacon_code_decode,
+    bacon_code_encode,
+    bifid_decode,
+    bifid_encode,
+    bifid_kode,
+    binærkode_tabel,
+    codec_table,
+    coords_to_letter,
+    create_danish_square,
+    create_polybius_square,
+    danish_alphabet,
+    danish_alphabet_2,
+    decode_100p,
+    decode_from_morse,
+    decode_roversprog,
+    encode_100p,
+    encode_roversprog,
+    encode_to_morse,
+    int_to_roman,
+    join_tokens,
+    keyword_cipher_setup,
+    kodeordskode_decode,
+    kodeordskode_encode,
+    letter_to_coords,
+    roman_to_int,
+    rot_x_decode,
+    rot_x_encode,
+    roversprog_vokal,
+    sms_decode,
+    sms_encode,
+    vigenere_kode,
+)
+from .polybius import PolybiusFirkant, polybius_decode, polybius_encode, polybius_square
+from .streaming import (
+    alpha_num_decode_stream,
+    alpha_num_encode_stream,
+    bacon_code_decode_stream,
+    bacon_code_encode_stream,
+    bifid_decode_stream,
+    bifid_encode_stream,
+    binærkode_stream,
+    decode_100p_stream,
+    decode_from_morse_stream,
+    decode_roversprog_stream,
+    encode_100p_stream,
+    encode_roversprog_stream,
+    encode_to_morse_stream,
+    kodeordskode_decode_stream,
+    kodeordskode_encode_stream,
+    read_chunks,
+    rot_x_decode_stream,
+    rot_x_encode_stream,
+    sms_decode_stream,
+    sms_encode_stream,
+    vigenere_stream,
+)
+
+
+def __getattr__(name):
+    # Opslagstabeller der bygges første gang, de bruges (se koder._LAZY_TABLES)
+    from . import koder
+    if name in koder._LAZY_TABLES:
+        return getattr(koder, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
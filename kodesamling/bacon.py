@@ -0,0 +1,213 @@
+# Baconkode: hvert bogstav er et 5-bit tal (A=0 ... Z=23, I/J og U/V deler
+# kode). Bit 0 skjules som et lille bogstav i fyldteksten og bit 1 som et stort.
+# Med NumPy findes bogstaver og store/små bogstaver for hele fyldteksten på
+# én gang via opslagstabeller, og bits pakkes og udpakkes som arrays.
+import itertools
+from functools import lru_cache
+
+from .npkompat import numpy_or_none
+
+_BACON_LETTERS = 'ABCDEFGHIKLMNOPQRSTUWXYZ'  # 24 koder; J deler med I og V med U
+BACON_VALUES = {letter: value for value, letter in enumerate(_BACON_LETTERS)}
+BACON_VALUES['J'] = BACON_VALUES['I']
+BACON_VALUES['V'] = BACON_VALUES['U']
+
+# Samme tabel som A/B-strenge, fx 'C': 'AAABA'
+BACON_DICT = {letter: format(value, '05b').translate(str.maketrans('01', 'AB'))
+              for letter, value in sorted(BACON_VALUES.items())}
+
+# Afkodning: 5-bit tal -> bogstav; 24-31 bruges ikke og bliver til '?'
+_DECODE = _BACON_LETTERS + '?' * (32 - len(_BACON_LETTERS))
+
+# Under denne længde (i bits) er ren Python hurtigere end at starte NumPy op
+_NUMPY_MIN_BITS = 1280
+
+FEJL_FOR_KORT = "FEJL: Fyldteksten skal være mindst lige så lang som Bacon-koden (uden mellemrum)."
+
+
+def _message_values(plaintext):
+    # Ukendte tegn kodes som AAAAA
+    return [BACON_VALUES.get(char, 0) for char in plaintext.upper().replace(" ", "")]
+
+def _message_bits(values):
+    np = numpy_or_none()
+    if np is not None and 5 * len(values) >= _NUMPY_MIN_BITS:
+        packed = np.array(values, dtype=np.uint8)[:, None] << 3
+        return np.unpackbits(packed, axis=1)[:, :5].ravel()
+    return [(value >> shift) & 1 for value in values for shift in (4, 3, 2, 1, 0)]
+
+
+@lru_cache(maxsize=1)
+def _latin1_tables():
+    # Tegnklasser for tegnkoder under 256: bogstav?, ikke-lille-bogstav?,
+    # og tegnkoden for tegnet som lille og stort bogstav (0 hvis det bliver flere tegn)
+    np = numpy_or_none()
+    chars = [chr(i) for i in range(256)]
+    return (np.array([c.isalpha() for c in chars]),
+            np.array([not c.islower() for c in chars], dtype=np.uint8),
+            np.array([_single(c.lower()) for c in chars], dtype=np.uint32),
+            np.array([_single(c.upper()) for c in chars], dtype=np.uint32))
+
+def _single(text):
+    return ord(text) if len(text) == 1 else 0
+
+def _classify(points, table, func):
+    # Slår tegnkoder under 256 op i tabellen og beregner resten én gang pr. unikt tegn
+    np = numpy_or_none()
+    out = table[np.minimum(points, 255)]
+    high = points > 255
+    if high.any():
+        unique, inverse = np.unique(points[high], return_inverse=True)
+        out[high] = np.array([func(chr(c)) for c in unique], dtype=table.dtype)[inverse]
+    return out
+
+def _points(text):
+    np = numpy_or_none()
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def bacon_capacity(covertext):
+    # (antal bogstaver i fyldteksten, antal tegn der kan skjules i den)
+    np = numpy_or_none()
+    if np is not None and len(covertext) >= _NUMPY_MIN_BITS:
+        letters = int(_classify(_points(covertext), _latin1_tables()[0], str.isalpha).sum())
+    else:
+        letters = sum(map(str.isalpha, covertext))
+    return letters, letters // 5
+
+
+def bacon_code_encode(plaintext, covertext):
+    bits = _message_bits(_message_values(plaintext))
+    if len(bits) == 0:
+        return covertext
+    np = numpy_or_none()
+    if np is not None and len(bits) >= _NUMPY_MIN_BITS:
+        result = _encode_numpy(bits, covertext)
+        if result is not None:
+            return result
+
+    # Kun de første len(bits) bogstaver i fyldteksten skal ændres
+    positions = list(itertools.islice((i for i, c in enumerate(covertext) if c.isalpha()), len(bits)))
+    if len(positions) < len(bits):
+        return FEJL_FOR_KORT
+    end = positions[-1] + 1
+    chars = list(covertext[:end])
+    for pos, bit in zip(positions, bits):
+        chars[pos] = chars[pos].upper() if bit else chars[pos].lower()
+    # resten af fyldteksten lader vi være uberørt
+    return ''.join(chars) + covertext[end:]
+
+def _encode_numpy(bits, covertext):
+    # Bogstavmasken for hele fyldteksten på én gang; store/små bogstaver vælges
+    # pr. position efter bits. Giver None hvis et bogstav skifter længde (fx ß)
+    np = numpy_or_none()
+    alpha, _, lower, upper = _latin1_tables()
+    points = _points(covertext)
+    positions = np.flatnonzero(_classify(points, alpha, str.isalpha))[:len(bits)]
+    if len(positions) < len(bits):
+        return FEJL_FOR_KORT
+    selected = points[positions]
+    bits = np.asarray(bits, dtype=bool)
+    new = np.where(bits,
+                   _classify(selected, upper, lambda c: _single(c.upper())),
+                   _classify(selected, lower, lambda c: _single(c.lower())))
+    if not new.all():
+        return None
+    points = points.copy()
+    points[positions] = new
+    return points.tobytes().decode('utf-32-le')
+
+def bacon_code_decode(code_text):
+    # Små bogstaver = 0 (A), alt andet = 1 (B); en ufuldstændig gruppe til sidst ignoreres
+    np = numpy_or_none()
+    if np is not None and len(code_text) >= _NUMPY_MIN_BITS:
+        alpha, upper_bit, _, _ = _latin1_tables()
+        points = _points(code_text)
+        points = points[_classify(points, alpha, str.isalpha)]
+        points = points[:len(points) - len(points) % 5]
+        bits = _classify(points, upper_bit, lambda c: not c.islower())
+        values = bits.reshape(-1, 5) @ np.array([16, 8, 4, 2, 1], dtype=np.uint8)
+        return _decode_points()[values].tobytes().decode('utf-32-le')
+
+    letters = ''.join(filter(str.isalpha, code_text))
+    result = []
+    for i in range(0, len(letters) - len(letters) % 5, 5):
+        value = 0
+        for char in letters[i:i+5]:
+            value = value * 2 + (not char.islower())
+        result.append(_DECODE[value])
+    return ''.join(result)
+
+@lru_cache(maxsize=1)
+def _decode_points():
+    np = numpy_or_none()
+    return np.array([ord(c) for c in _DECODE], dtype=np.uint32)
+
+
+def bacon_encode_many(messages, covertexts):
+    # Skjul mange beskeder i hver sin fyldtekst i ét kald. Med NumPy samles
+    # fyldteksterne i ét array, så bogstavmasken og de nye store/små bogstaver
+    # findes i én omgang for dem alle, og resultatet deles bagefter
+    messages = list(messages)
+    covertexts = list(covertexts)
+    if len(messages) != len(covertexts):
+        raise ValueError("Der skal være lige mange beskeder og fyldtekster.")
+    values = [_message_values(message) for message in messages]
+    np = numpy_or_none()
+    if np is not None and 5 * sum(map(len, values)) >= _NUMPY_MIN_BITS:
+        result = _encode_many_numpy(values, covertexts)
+        if result is not None:
+            return result
+    return [bacon_code_encode(message, cover) for message, cover in zip(messages, covertexts)]
+
+def _encode_many_numpy(values, covertexts):
+    np = numpy_or_none()
+    alpha, _, lower, upper = _latin1_tables()
+    lengths = np.array([len(cover) for cover in covertexts])
+    ends = np.cumsum(lengths)
+    points = _points(''.join(covertexts))
+    positions = np.flatnonzero(_classify(points, alpha, str.isalpha))
+    # Fyldtekst i har bogstaverne positions[first[i]:last[i]]
+    first = np.searchsorted(positions, ends - lengths)
+    last = np.searchsorted(positions, ends)
+    needed = 5 * np.array([len(v) for v in values])
+    short = needed > last - first
+    needed[short] = 0
+    bits = _message_bits([x for v, s in zip(values, short.tolist()) if not s for x in v])
+    # Indeks i positions for hver bit: fyldtekstens første bogstav + nummer i beskeden
+    starts = np.cumsum(needed) - needed
+    index = np.repeat(first - starts, needed) + np.arange(int(needed.sum()))
+    selected = positions[index]
+    bits = np.asarray(bits, dtype=bool)
+    new = np.where(bits,
+                   _classify(points[selected], upper, lambda c: _single(c.upper())),
+                   _classify(points[selected], lower, lambda c: _single(c.lower())))
+    if not new.all():
+        return None
+    points = points.copy()
+    points[selected] = new
+    joined = points.tobytes().decode('utf-32-le')
+    return [FEJL_FOR_KORT if s else joined[end - n:end]
+            for s, end, n in zip(short.tolist(), ends.tolist(), lengths.tolist())]
+
+def bacon_decode_many(code_texts):
+    # Som bacon_code_decode for mange tekster; med NumPy klassificeres alle
+    # tegn i én omgang, og hver teksts ufuldstændige sidste gruppe fjernes
+    code_texts = list(code_texts)
+    np = numpy_or_none()
+    if np is None or sum(map(len, code_texts)) < _NUMPY_MIN_BITS:
+        return [bacon_code_decode(text) for text in code_texts]
+    alpha, upper_bit, _, _ = _latin1_tables()
+    lengths = np.array([len(text) for text in code_texts])
+    ends = np.cumsum(lengths)
+    points = _points(''.join(code_texts))
+    positions = np.flatnonzero(_classify(points, alpha, str.isalpha))
+    counts = np.searchsorted(positions, ends) - np.searchsorted(positions, ends - lengths)
+    # Bogstavets nummer i sin egen tekst; kun hele grupper på 5 beholdes
+    local = np.arange(len(positions)) - np.repeat(np.cumsum(counts) - counts, counts)
+    keep = local < np.repeat(counts - counts % 5, counts)
+    bits = _classify(points[positions[keep]], upper_bit, lambda c: not c.islower())
+    values = bits.reshape(-1, 5) @ np.array([16, 8, 4, 2, 1], dtype=np.uint8)
+    decoded = _decode_points()[values].tobytes().decode('utf-32-le')
+    groups = np.cumsum(counts // 5).tolist()
+    return [decoded[start:end] for start, end in zip([0] + groups, groups)]
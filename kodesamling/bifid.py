@@ -0,0 +1,152 @@
+# Bifid: hvert bogstav får koordinater (række, kolonne) i en Polybius-firkant.
+# For hver periode skrives alle rækker og derefter alle kolonner efter
+# hinanden, og tallene læses igen parvis som nye koordinater.
+# Koordinattabellerne bygges én gang pr. firkant, og med NumPy klares
+# omrokeringen af alle perioder på én gang med reshape. Uden NumPy bruges
+# en ren Python-udgave af samme fremgangsmåde.
+from functools import lru_cache
+
+from .npkompat import numpy_or_none
+
+_UDENFOR = 255  # koordinat for tegn der ikke er i firkanten
+
+
+def create_polybius_square():
+    # 5x5 firkant uden Æ, Ø, Å - I/J på samme plads
+    return [
+        ['A','B','C','D','E'],
+        ['F','G','H','I','K'],
+        ['L','M','N','O','P'],
+        ['Q','R','S','T','U'],
+        ['V','W','X','Y','Z']
+    ]
+
+def create_danish_square():
+    # 6x6 firkant med hele det danske alfabet; de sidste 7 felter er cifrene 0-6
+    cells = 'ABCDEFGHIJKLMNOPQRSTUVWXYZÆØÅ0123456'
+    return [list(cells[i:i+6]) for i in range(0, 36, 6)]
+
+def letter_to_coords(letter, square):
+    letter = letter.upper()
+    if letter == 'J' and len(square) == 5:  # I/J deler plads
+        letter = 'I'
+    for row_idx, row in enumerate(square):
+        if letter in row:
+            return (row_idx + 1, row.index(letter) + 1)
+    return None
+def coords_to_letter(coords, square):
+    row, col = coords
+    return square[row - 1][col - 1]
+
+
+@lru_cache(maxsize=8)
+def _square_tables(cells, size):
+    # Opslag fra tegnkode (0-255) til række og kolonne (0-baseret) og tilbage
+    rows = [_UDENFOR] * 256
+    cols = [_UDENFOR] * 256
+    for idx, char in enumerate(cells):
+        rows[ord(char)] = idx // size
+        cols[ord(char)] = idx % size
+    if size == 5:
+        rows[ord('J')], cols[ord('J')] = rows[ord('I')], cols[ord('I')]
+    return bytes(rows), bytes(cols)
+
+@lru_cache(maxsize=8)
+def _square_arrays(cells, size):
+    np = numpy_or_none()
+    rows, cols = _square_tables(cells, size)
+    return (np.frombuffer(rows, dtype=np.uint8), np.frombuffer(cols, dtype=np.uint8),
+            np.array([ord(c) for c in cells], dtype=np.uint32))
+
+def _square_key(square):
+    square = square or create_polybius_square()
+    return ''.join(''.join(row) for row in square), len(square)
+
+def square_letters(text, square=None):
+    # Kun de tegn der findes i firkanten (J bliver til I i 5x5), som store bogstaver
+    cells, size = _square_key(square)
+    rows, cols = _square_tables(cells, size)
+    return ''.join([cells[rows[o] * size + cols[o]] for o in map(ord, text.upper())
+                    if o < 256 and rows[o] != _UDENFOR])
+
+
+def _period_blocks(n, period):
+    # [(periodelængde, antal perioder)]: først alle hele perioder, så en evt.
+    # kortere sidste periode. period 0/None betyder hele beskeden som én periode.
+    # Begge motorer (NumPy og ren Python) går herigennem, så kontrollen står her
+    if period is not None and period < 0:
+        raise ValueError(f"Perioden skal være 0 (hele beskeden) eller et positivt tal, ikke {period}.")
+    if n == 0:
+        return []
+    if not period or period >= n:
+        return [(n, 1)]
+    blocks = [(period, n // period)]
+    if n % period:
+        blocks.append((n % period, 1))
+    return blocks
+
+def _bifid_numpy(text, period, cells, size, encode):
+    np = numpy_or_none()
+    row_lut, col_lut, codes = _square_arrays(cells, size)
+    points = np.frombuffer(text.upper().encode('utf-32-le'), dtype=np.uint32)
+    clipped = np.minimum(points, 255)
+    rows = row_lut[clipped]
+    mask = rows != _UDENFOR
+    rows = rows[mask]
+    cols = col_lut[clipped][mask]
+
+    n = len(rows)
+    new_rows = np.empty_like(rows)
+    new_cols = np.empty_like(cols)
+    start = 0
+    # Alle hele perioder klares med én reshape, en evt. kortere sidste periode for sig
+    for p, count in _period_blocks(n, period):
+        end = start + p * count
+        r = rows[start:end].reshape(count, p)
+        c = cols[start:end].reshape(count, p)
+        if encode:
+            mixed = np.concatenate([r, c], axis=1).reshape(count, p, 2)
+            new_rows[start:end] = mixed[:, :, 0].ravel()
+            new_cols[start:end] = mixed[:, :, 1].ravel()
+        else:
+            mixed = np.stack([r, c], axis=2).reshape(count, 2 * p)
+            new_rows[start:end] = mixed[:, :p].ravel()
+            new_cols[start:end] = mixed[:, p:].ravel()
+        start = end
+    out = codes[new_rows.astype(np.intp) * size + new_cols]
+    return out.tobytes().decode('utf-32-le')
+
+def _bifid_python(text, period, cells, size, encode):
+    row_lut, col_lut = _square_tables(cells, size)
+    points = [o for o in map(ord, text.upper()) if o < 256 and row_lut[o] != _UDENFOR]
+    rows = [row_lut[o] for o in points]
+    cols = [col_lut[o] for o in points]
+    result = []
+    start = 0
+    for p, count in _period_blocks(len(points), period):
+        for _ in range(count):
+            r = rows[start:start+p]
+            c = cols[start:start+p]
+            if encode:
+                tal = r + c
+                new_rows, new_cols = tal[0::2], tal[1::2]
+            else:
+                tal = [x for pair in zip(r, c) for x in pair]
+                new_rows, new_cols = tal[:p], tal[p:]
+            result.extend(cells[nr * size + nc] for nr, nc in zip(new_rows, new_cols))
+            start += p
+    return ''.join(result)
+
+def bifid_kode(text, encode=True, period=5, square=None):
+    # Tegn der ikke er i firkanten (mellemrum, tegnsætning, og Æ/Ø/Å i 5x5)
+    # springes over, så perioderne kun tæller bogstaver
+    cells, size = _square_key(square)
+    if numpy_or_none() is not None:
+        return _bifid_numpy(text, period, cells, size, encode)
+    return _bifid_python(text, period, cells, size, encode)
+
+def bifid_encode(text, period=5, square=None, dansk=False):
+    # dansk=True bruger 6x6-firkanten med Æ, Ø og Å i stedet for square
+    return bifid_kode(text, encode=True, period=period, square=create_danish_square() if dansk else square)
+def bifid_decode(text, period=5, square=None, dansk=False):
+    return bifid_kode(text, encode=False, period=period, square=create_danish_square() if dansk else square)
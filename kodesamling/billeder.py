@@ -0,0 +1,91 @@
+# Referencebilleder (morsenøgle, frimurerkode, tastatur, punktskrift og
+# semafor) ligger i mappen billeder/ ved siden af appen og følger med i
+# repoet, så siderne virker uden net, fx på lejr. Billederne tegnes af
+# kodesamling.billedtegning og gemmes i nogle få bredder; laves igen med
+#   python -m kodesamling.billeder
+#
+# Appen og tjenesten læser kun filerne og holder bytes i hukommelsen sammen
+# med en ETag, så en ny kørsel ikke rører disken igen, før filen ændres.
+# Mangler en fil, giver billede() None og skriver én gang til stderr; et
+# manglende billede huskes ikke, så det bruges, så snart det er lavet.
+import hashlib
+import os
+import re
+import sys
+from io import BytesIO
+
+BILLED_MAPPE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'billeder')
+BREDDER = (480, 960)  # pixel; 960 passer til Streamlits fulde spaltebredde
+BILLEDER = ('morse', 'frimurer', 'tastatur', 'punktskrift', 'semafor')
+_FILNAVN = re.compile(r'([a-z]+)-(\d+)\.png')
+
+
+def billede_sti(navn, bredde):
+    return os.path.join(BILLED_MAPPE, f'{navn}-{bredde}.png')
+
+def _bredde(bredde):
+    # Den mindste udgave der er mindst så bred som ønsket (ellers den største)
+    return ([b for b in BREDDER if b >= bredde] or [BREDDER[-1]])[0]
+
+
+_BYTES = {}     # sti: (mtime_ns, bytes, etag), kun for filer der findes
+_MELDT = set()  # stier der mangler og allerede er nævnt på stderr
+
+def _læs(sti):
+    try:
+        mtime = os.stat(sti).st_mtime_ns
+        gemt = _BYTES.get(sti)
+        if gemt is not None and gemt[0] == mtime:
+            return gemt
+        with open(sti, 'rb') as fil:
+            data = fil.read()
+    except OSError:
+        _BYTES.pop(sti, None)
+        if sti not in _MELDT:
+            _MELDT.add(sti)
+            print(f'{sti} mangler; kør python -m kodesamling.billeder', file=sys.stderr)
+        return None
+    gemt = _BYTES[sti] = (mtime, data, '"' + hashlib.sha1(data).hexdigest()[:16] + '"')
+    return gemt
+
+def billede(navn, bredde=BREDDER[-1]):
+    # Billedet som PNG-bytes; None hvis filen mangler
+    if navn not in BILLEDER:
+        raise KeyError(navn)
+    gemt = _læs(billede_sti(navn, _bredde(bredde)))
+    return gemt and gemt[1]
+
+def billede_fil(filnavn):
+    # (bytes, etag) for fx 'morse-480.png', eller None; til HTTP med cache-hoveder
+    match = _FILNAVN.fullmatch(filnavn)
+    if not match or match.group(1) not in BILLEDER or int(match.group(2)) not in BREDDER:
+        return None
+    gemt = _læs(billede_sti(match.group(1), int(match.group(2))))
+    return gemt and gemt[1:]
+
+def billede_cache_clear():
+    _BYTES.clear()
+    _MELDT.clear()
+
+
+def lav_billeder(navne=None, mappe=None):
+    # Tegner billederne og gemmer alle bredder; kræver Pillow
+    from PIL import Image
+    from .billedtegning import TEGNINGER
+    mappe = mappe or BILLED_MAPPE
+    os.makedirs(mappe, exist_ok=True)
+    for navn in navne or BILLEDER:
+        img = TEGNINGER[navn]()
+        for bredde in BREDDER:
+            lille = img.resize((bredde, round(img.height * bredde / img.width)), Image.LANCZOS)
+            # Få farver, så en palette holder filerne små
+            out = BytesIO()
+            lille.quantize(colors=64, method=Image.Quantize.MEDIANCUT).save(out, 'PNG', optimize=True)
+            with open(os.path.join(mappe, f'{navn}-{bredde}.png'), 'wb') as fil:
+                fil.write(out.getvalue())
+        print(f'{navn}: {img.width}x{img.height} tegnet', file=sys.stderr)
+    billede_cache_clear()
+
+
+if __name__ == '__main__':
+    lav_billeder(sys.argv[1:] or None)
@@ -0,0 +1,218 @@
+# Tegner referencebillederne (morsenøgle, frimurerkode, tastatur, punktskrift
+# og semafor) ud fra tabellerne her og i kodesamling.koder, så der ikke er
+# brug for billeder fra andre sider på nettet. Bruges kun, når billederne i
+# billeder/ laves (python -m kodesamling.billeder), og kræver Pillow, som
+# følger med Streamlit. Skriften er DejaVu Sans, som har Æ, Ø og Å; mangler
+# den, bruges Pillows indbyggede skrift, der viser dem som firkanter.
+#
+# Alt tegnes i dobbelt bredde (BASIS) og skaleres ned bagefter, så streger
+# og prikker bliver glatte.
+import functools
+import math
+import sys
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .koder import MORSE_CODE_DICT
+
+BASIS = 1920
+BAGGRUND = (255, 255, 255)
+STREG = (34, 34, 34)
+SVAG = (200, 200, 200)
+RØD = (200, 30, 30)
+GUL = (245, 200, 30)
+BLÅ = (30, 70, 140)
+
+# Punktskrift: prikkerne 1-2-3 i venstre kolonne og 4-5-6 i højre, dansk ÆØÅ
+PUNKTSKRIFT = {
+    'A': '1', 'B': '12', 'C': '14', 'D': '145', 'E': '15', 'F': '124', 'G': '1245',
+    'H': '125', 'I': '24', 'J': '245', 'K': '13', 'L': '123', 'M': '134', 'N': '1345',
+    'O': '135', 'P': '1234', 'Q': '12345', 'R': '1235', 'S': '234', 'T': '2345',
+    'U': '136', 'V': '1236', 'W': '2456', 'X': '1346', 'Y': '13456', 'Z': '1356',
+    'Æ': '345', 'Ø': '246', 'Å': '16', 'Tal': '3456',
+}
+
+# Semafor: de to flags retning set fra den, der læser signalet
+# (S = ned, SV, V, NV, N, NØ, Ø, SØ); mellemrum er begge flag nede
+SEMAFOR = {
+    'A': ('SV', 'S'), 'B': ('V', 'S'), 'C': ('NV', 'S'), 'D': ('N', 'S'), 'E': ('S', 'NØ'),
+    'F': ('S', 'Ø'), 'G': ('S', 'SØ'), 'H': ('V', 'SV'), 'I': ('NV', 'SV'), 'J': ('N', 'Ø'),
+    'K': ('SV', 'N'), 'L': ('SV', 'NØ'), 'M': ('SV', 'Ø'), 'N': ('SV', 'SØ'), 'O': ('NV', 'V'),
+    'P': ('V', 'N'), 'Q': ('V', 'NØ'), 'R': ('V', 'Ø'), 'S': ('V', 'SØ'), 'T': ('NV', 'N'),
+    'U': ('NV', 'NØ'), 'V': ('N', 'SØ'), 'W': ('NØ', 'Ø'), 'X': ('NØ', 'SØ'), 'Y': ('NV', 'Ø'),
+    'Z': ('SØ', 'Ø'), 'Mellemrum': ('S', 'S'),
+}
+_RETNING = {'S': 270, 'SV': 225, 'V': 180, 'NV': 135, 'N': 90, 'NØ': 45, 'Ø': 0, 'SØ': 315}
+
+# Dansk tastatur; hver række er forskudt som på et rigtigt tastatur
+TASTATUR = (
+    (0.0, '½1234567890+´'),
+    (0.6, 'QWERTYUIOPÅ¨'),
+    (0.9, "ASDFGHJKLÆØ'"),
+    (0.4, '<ZXCVBNM,.-'),
+)
+
+# Frimurerkode: to gitre og to krydser, de sidste med prik, og ÆØÅ i et
+# gitter med to prikker
+FRIMURER = (
+    ('gitter', 'ABCDEFGHI', 0), ('gitter', 'JKLMNOPQR', 1),
+    ('kryds', 'STUV', 0), ('kryds', 'WXYZ', 1), ('gitter', 'ÆØÅ', 2),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _skrift(størrelse):
+    try:
+        return ImageFont.truetype('DejaVuSans.ttf', størrelse)
+    except OSError:
+        print('DejaVu Sans mangler; Æ, Ø og Å tegnes ikke rigtigt', file=sys.stderr)
+        return ImageFont.load_default(size=størrelse)
+
+def _lærred(højde, titel):
+    img = Image.new('RGB', (BASIS, højde), BAGGRUND)
+    draw = ImageDraw.Draw(img)
+    draw.text((BASIS // 2, 60), titel, font=_skrift(72), fill=STREG, anchor='mm')
+    return img, draw
+
+def _midt(draw, xy, tekst, størrelse, fill=STREG):
+    draw.text(xy, tekst, font=_skrift(størrelse), fill=fill, anchor='mm')
+
+
+def tegn_morse():
+    tegn = [c for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZÆØÅ0123456789']
+    kolonner, række_højde = 3, 110
+    rækker = math.ceil(len(tegn) / kolonner)
+    img, draw = _lærred(160 + rækker * række_højde, 'Morsekode')
+    bredde = BASIS // kolonner
+    for i, c in enumerate(tegn):
+        x0 = (i // rækker) * bredde + 60
+        y = 160 + (i % rækker) * række_højde + række_højde // 2
+        _midt(draw, (x0 + 30, y), c, 64)
+        x = x0 + 110
+        for symbol in MORSE_CODE_DICT[c]:
+            if symbol == '.':
+                draw.ellipse((x, y - 14, x + 28, y + 14), fill=STREG)
+                x += 28 + 22
+            else:
+                draw.rounded_rectangle((x, y - 14, x + 90, y + 14), radius=14, fill=STREG)
+                x += 90 + 22
+    return img
+
+
+def _frimurer_figur(draw, slags, bogstaver, prikker, x, y, side):
+    # Gitter (3x3) eller kryds med bogstaverne i felterne og prikker i hvert felt
+    tykkelse = 10
+    if slags == 'gitter':
+        for k in (1, 2):
+            draw.line((x + k * side / 3, y, x + k * side / 3, y + side), fill=STREG, width=tykkelse)
+            draw.line((x, y + k * side / 3, x + side, y + k * side / 3), fill=STREG, width=tykkelse)
+        felter = [(x + (i % 3 + 0.5) * side / 3, y + (i // 3 + 0.5) * side / 3) for i in range(9)]
+    else:
+        draw.line((x, y, x + side, y + side), fill=STREG, width=tykkelse)
+        draw.line((x + side, y, x, y + side), fill=STREG, width=tykkelse)
+        m = side / 2
+        felter = [(x + m, y + m * 0.45), (x + side - m * 0.45, y + m),
+                  (x + m, y + side - m * 0.45), (x + m * 0.45, y + m)]
+    for (fx, fy), c in zip(felter, bogstaver):
+        _midt(draw, (fx, fy - (14 if prikker else 0)), c, 56)
+        for p in range(prikker):
+            px = fx + (p - (prikker - 1) / 2) * 30
+            draw.ellipse((px - 9, fy + 26, px + 9, fy + 44), fill=RØD)
+
+def tegn_frimurer():
+    side = 300
+    img, draw = _lærred(1040, 'Frimurerkode')
+    afstand = (BASIS - 3 * side) // 4
+    for i, (slags, bogstaver, prikker) in enumerate(FRIMURER):
+        række, kolonne = divmod(i, 3)
+        x = afstand + kolonne * (side + afstand)
+        if række:
+            x += (side + afstand) // 2
+        _frimurer_figur(draw, slags, bogstaver, prikker, x, 160 + række * (side + 140), side)
+    _midt(draw, (BASIS // 2, 990), 'Hvert bogstav skrives som stregerne omkring dets felt (og prikkerne)', 44)
+    return img
+
+
+def tegn_tastatur():
+    tast, mellemrum = 122, 12
+    img, draw = _lærred(200 + len(TASTATUR) * (tast + mellemrum) + 40, 'Dansk tastatur')
+    venstre = (BASIS - 13.6 * (tast + mellemrum)) / 2
+    for r, (forskydning, taster) in enumerate(TASTATUR):
+        y = 160 + r * (tast + mellemrum)
+        for k, c in enumerate(taster):
+            x = venstre + (forskydning + k) * (tast + mellemrum)
+            draw.rounded_rectangle((x, y, x + tast, y + tast), radius=16, outline=STREG, width=5,
+                                   fill=(245, 245, 245))
+            _midt(draw, (x + tast / 2, y + tast / 2), c, 56)
+    x = venstre + 3.4 * (tast + mellemrum)
+    y = 160 + len(TASTATUR) * (tast + mellemrum)
+    draw.rounded_rectangle((x, y, x + 6.5 * (tast + mellemrum), y + tast * 0.6), radius=16,
+                           outline=STREG, width=5, fill=(245, 245, 245))
+    return img
+
+
+def tegn_punktskrift():
+    kolonner, celle_b, celle_h = 6, BASIS // 6, 300
+    tegn = list(PUNKTSKRIFT)
+    rækker = math.ceil(len(tegn) / kolonner)
+    img, draw = _lærred(170 + rækker * celle_h, 'Punktskrift')
+    for i, c in enumerate(tegn):
+        x = (i % kolonner) * celle_b + celle_b // 2
+        y = 160 + (i // kolonner) * celle_h
+        _midt(draw, (x, y + 40), c, 56 if len(c) == 1 else 44)
+        for prik in range(6):
+            px = x + (-30 if prik < 3 else 30)
+            py = y + 100 + (prik % 3) * 56
+            fyldt = str(prik + 1) in PUNKTSKRIFT[c]
+            draw.ellipse((px - 20, py - 20, px + 20, py + 20),
+                         fill=STREG if fyldt else None, outline=STREG if fyldt else SVAG, width=4)
+    return img
+
+
+def _semafor_figur(draw, x, y, arme, størrelse):
+    # Person set forfra med et flag i hver hånd; armene går ud fra skuldrene
+    hoved = størrelse * 0.12
+    skulder = (x, y - størrelse * 0.18)
+    draw.ellipse((x - hoved, y - størrelse * 0.45, x + hoved, y - størrelse * 0.45 + 2 * hoved), fill=BLÅ)
+    draw.rounded_rectangle((x - størrelse * 0.12, skulder[1], x + størrelse * 0.12, y + størrelse * 0.3),
+                           radius=10, fill=BLÅ)
+    for retning in arme:
+        v = math.radians(_RETNING[retning])
+        dx, dy = math.cos(v), -math.sin(v)
+        arm = størrelse * 0.42
+        hånd = (skulder[0] + dx * arm, skulder[1] + dy * arm)
+        draw.line((skulder, hånd), fill=BLÅ, width=int(størrelse * 0.06))
+        # Flaget: et kvadrat delt diagonalt i rødt og gult for enden af stangen
+        f = størrelse * 0.2
+        nx, ny = -dy, dx  # vinkelret på armen
+        if nx < 0 or (nx == 0 and ny < 0):
+            nx, ny = -nx, -ny
+        a = hånd
+        b = (hånd[0] + dx * f, hånd[1] + dy * f)
+        c = (b[0] + nx * f, b[1] + ny * f)
+        d = (a[0] + nx * f, a[1] + ny * f)
+        draw.polygon((a, b, c), fill=RØD)
+        draw.polygon((a, c, d), fill=GUL)
+        draw.line((a, b), fill=STREG, width=4)
+
+def tegn_semafor():
+    kolonner, celle_b, celle_h = 6, BASIS // 6, 330
+    tegn = list(SEMAFOR)
+    rækker = math.ceil(len(tegn) / kolonner)
+    img, draw = _lærred(240 + rækker * celle_h, 'Semafor')
+    for i, c in enumerate(tegn):
+        x = (i % kolonner) * celle_b + celle_b // 2
+        y = 160 + (i // kolonner) * celle_h
+        _semafor_figur(draw, x, y + 175, SEMAFOR[c], 200)
+        _midt(draw, (x, y + 300), c, 52 if len(c) == 1 else 36)
+    _midt(draw, (BASIS // 2, img.height - 40), 'Set forfra af den, der læser signalet. Æ, Ø og Å skrives AE, OE og AA', 40)
+    return img
+
+
+TEGNINGER = {
+    'morse': tegn_morse,
+    'frimurer': tegn_frimurer,
+    'tastatur': tegn_tastatur,
+    'punktskrift': tegn_punktskrift,
+    'semafor': tegn_semafor,
+}
@@ -0,0 +1,129 @@
+# Binærkode: bogstav nr. i i danish_alphabet_2 skrives som i med 8 bit,
+# fx A = '0000 0000', B = '0000 0001' ... Å = '0001 1100'. Koderne regnes ud
+# fra indekset, så der ikke er nogen tabel at vedligeholde.
+#
+# To formater:
+#   normal:  '0000 0111 | 0000 0100 |   | 0000 0001' (' | ' mellem tegn, mellemrum som tom blok)
+#   kompakt: '0000011100000100 00000001' (8 bit pr. bogstav, mellemrum mellem ord)
+#
+# Afkodningen læser input som bytes med ét kompileret regulært udtryk, der
+# kan køre direkte på bytes eller memoryview, så input aldrig kopieres eller
+# skæres op igen og igen.
+import re
+from functools import lru_cache
+
+_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZÆØÅ'  # samme rækkefølge som danish_alphabet_2
+
+# Et bogstav (8 bit, evt. med ét mellemrum mellem de to halvdele) med en
+# evt. | efter sig, en | med mellemrummene omkring den, mellemrum, eller alt
+# andet: en stump bits eller ét andet tegn (UTF-8), som bliver til '?'.
+# I det normale format læses '0000 0000 | ' som ét stykke.
+_ANDET = rb'([01]+|[^\s|01\x80-\xbf][\x80-\xbf]*)'
+_TOKEN = re.compile(rb'\s*([01]{4}\s?[01]{4})\s*(\|)?|(\s*)\|(\s*)|(\s+)|' + _ANDET)
+# I det kompakte format betyder mellemrum noget og hører ikke til bogstaver eller |
+_COMPACT_TOKEN = re.compile(rb'([01]{8})(\|)?|()\|()|(\s+)|' + _ANDET)
+# match.lastindex for de forskellige slags
+_LETTER, _LETTER_PIPE, _PIPE, _SPACE = 1, 2, 4, 5
+_LETTER_MAX = 9  # længste bogstav: 8 bit og ét mellemrum
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+def binær_code(index, compact=False):
+    bits = format(index, '08b')
+    return bits if compact else bits[:4] + ' ' + bits[4:]
+
+@lru_cache(maxsize=2)
+def _encode_table(compact):
+    table = {letter: binær_code(i, compact) for i, letter in enumerate(_ALPHABET)}
+    table[' '] = ' '  # adskiller ord
+    return table
+
+def binær_table():
+    # [(bogstav, kode)] til visning
+    return [(letter, binær_code(i)) for i, letter in enumerate(_ALPHABET)]
+
+def binær_encode(text, compact=False):
+    table = _encode_table(compact)
+    get = table.get
+    sep = '' if compact else ' | '
+    return sep.join([get(char, '?') for char in text.upper()])
+
+
+# Bogstaver der allerede er regnet ud, slået op på deres bytes
+_letter_cache = {}
+
+def _letter(token):
+    index = int(token.translate(None, _WHITESPACE), 2)
+    return _ALPHABET[index] if index < len(_ALPHABET) else '?'
+
+
+class BinærDecoder:
+    # Afkoder i bidder: feed() kan kaldes flere gange, og et tegn der er delt
+    # mellem to bidder gemmes til næste kald
+    def __init__(self, compact=False):
+        self.compact = compact
+        self.rest = b''
+        self.seen_pipe = False
+        self.block_content = False
+        self.block_space = False
+
+    def feed(self, data, final=False):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if self.rest:
+            data = self.rest + bytes(data)
+        pattern = _COMPACT_TOKEN if self.compact else _TOKEN
+        letters = _letter_cache
+        seen_pipe, content, space = self.seen_pipe, self.block_content, self.block_space
+        out = []
+        append = out.append
+        end = 0
+        limit = len(data) if final else len(data) - _LETTER_MAX
+        for match in pattern.finditer(data):
+            # Uden final kan de sidste op til 9 bytes høre til et bogstav,
+            # der fortsætter i næste bid
+            if match.start() > limit or (not final and match.end() == len(data)):
+                break
+            end = match.end()
+            kind = match.lastindex
+            if kind == _LETTER or kind == _LETTER_PIPE:
+                token = match[1]
+                char = letters.get(token)
+                if char is None:
+                    char = letters[token] = _letter(token)
+                append(char)
+                if kind == _LETTER_PIPE:
+                    seen_pipe = True
+                    content = space = False
+                else:
+                    content = True
+            elif kind == _PIPE:
+                if (space or match[3]) and not content:
+                    append(' ')
+                seen_pipe = True
+                content = False
+                space = bool(match[4])
+            elif kind == _SPACE:
+                if self.compact:
+                    append(' ' * len(match[5]))
+                space = True
+            else:
+                append('?')
+                content = True
+        if final:
+            if seen_pipe and space and not content:
+                append(' ')
+            self.rest = b''
+        else:
+            self.rest = bytes(data[end:])
+        self.seen_pipe, self.block_content, self.block_space = seen_pipe, content, space
+        return ''.join(out)
+
+def binær_decode(data, compact=False):
+    # data kan være str, bytes eller memoryview
+    return BinærDecoder(compact).feed(data, final=True)
+
+def binærkode_tabel(text, encode=True, compact=False):
+    if encode:
+        return binær_encode(text, compact)
+    return binær_decode(text, compact)
@@ -0,0 +1,304 @@
+# Bogkode: 24,12,3 betyder side 24, linje 12 og ord (eller bogstav) nr. 3 på
+# linjen. Bogen er en tekstfil (UTF-8), som læses via mmap. Sider adskilles
+# af sideskift (\f) eller er et fast antal linjer; tomme linjer tæller ikke med.
+#
+# Første gang en bog åbnes, bygges et kompakt indeks med byte-positionen af
+# hver linje og hvert ord samt et omvendt opslag fra ord til alle dets
+# forekomster. Bogstaver findes ved at læse den ene linje, så de koster ikke
+# plads i indekset. Indekset gemmes i en fil ved siden af bogen
+# (bog.txt.bogindeks) og læses også via mmap, så afkodning er rene opslag,
+# og en ny Streamlit-kørsel ikke skal bygge det igen.
+import bisect
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import sys
+import tempfile
+from array import array
+
+INDEKS_ENDELSE = '.bogindeks'
+_VERSION = 2
+_TOKEN = re.compile(rb'\f|\n|[^\s]+')
+_ORD = re.compile(rb'[^\s]+')
+_KANT = re.compile(r'^\W+|\W+$')  # tegnsætning i starten og slutningen af et ord
+_TAL = re.compile(r'\d+')
+# Arrays i indeksfilen (alle uint32), i den rækkefølge de gemmes
+_ARRAYS = ('page_lines', 'line_start', 'line_end', 'line_words', 'word_start', 'word_order')
+
+
+def word_key(word):
+    return _KANT.sub('', word).lower()
+
+
+def _check_utf8(data):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for start in range(0, len(data), 1 << 20):
+            decoder.decode(data[start:start + (1 << 20)])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        raise ValueError("Bogen skal være gemt som UTF-8.") from e
+
+def _build_index(data, linjer_pr_side):
+    # Én gennemgang af bogen: sider, linjer med ord og ord
+    _check_utf8(data)
+    use_formfeed = b'\f' in data
+    page_lines, line_start, line_end = array('I', [0]), array('I'), array('I')
+    line_words, word_start = array('I'), array('I')
+    words = {}
+    line_open = False
+    start = 3 if data[:3] == codecs.BOM_UTF8 else 0
+    line_begin = start  # efter seneste linje- eller sideskift
+    for match in _TOKEN.finditer(data, start):
+        token = match.group()
+        if token == b'\n' or token == b'\f':
+            line_begin = match.end()
+            if line_open:
+                line_open = False
+                line_end.append(match.start())
+                if not use_formfeed and linjer_pr_side and len(line_words) % linjer_pr_side == 0:
+                    page_lines.append(len(line_words))
+            if token == b'\f':
+                page_lines.append(len(line_words))
+            continue
+        key = word_key(token.decode('utf-8'))
+        if not key:
+            continue  # kun tegnsætning, fx en tankestreg
+        if not line_open:
+            line_open = True
+            line_start.append(line_begin)
+            line_words.append(len(word_start))
+        words.setdefault(key, []).append(len(word_start))
+        word_start.append(match.start())
+    if line_open:
+        line_end.append(len(data))
+    # Slutmarkører, så linje/side i+1's start også er i's slutning
+    line_words.append(len(word_start))
+    lines = len(line_start)
+    if page_lines[-1] == lines and len(page_lines) > 1:
+        page_lines.pop()  # tom side til sidst (fx sideskift sidst i filen)
+    page_lines.append(lines)
+
+    index = {'page_lines': page_lines, 'line_start': line_start, 'line_end': line_end,
+             'line_words': line_words, 'word_start': word_start}
+    index['word_order'], index['ord'] = _inverted(words)
+    return index
+
+def _inverted(positions):
+    # {nøgle: [i, ...]} -> ét array med alle positioner og {nøgle: [start, antal]}
+    order = array('I')
+    keys = {}
+    for key, items in positions.items():
+        keys[key] = [len(order), len(items)]
+        order.extend(items)
+    return order, keys
+
+
+def _index_path(path, linjer_pr_side):
+    # Ét indeks pr. sideinddeling, så man kan skifte uden at bygge forfra
+    side = f'.s{linjer_pr_side}' if linjer_pr_side else ''
+    return os.fspath(path) + side + INDEKS_ENDELSE
+
+def _write_index(path, stat, linjer_pr_side, index):
+    header = {
+        'version': _VERSION, 'byteorder': sys.byteorder,
+        'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'linjer_pr_side': linjer_pr_side,
+        'arrays': [len(index[name]) for name in _ARRAYS],
+        'ord': index['ord'],
+    }
+    head = json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n'
+    head += b' ' * (-len(head) % 4)  # så arrays starter på en 4-byte grænse
+    tmp = _index_path(path, linjer_pr_side) + '.tmp'
+    with open(tmp, 'wb') as out:
+        out.write(head)
+        for name in _ARRAYS:
+            index[name].tofile(out)
+    os.replace(tmp, _index_path(path, linjer_pr_side))
+
+def _read_index(path, stat, linjer_pr_side):
+    # Indekset fra disken, hvis det passer til bogen; ellers None
+    try:
+        with open(_index_path(path, linjer_pr_side), 'rb') as fil:
+            if os.fstat(fil.fileno()).st_size == 0:
+                return None
+            mm = mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+    end = mm.find(b'\n')
+    try:
+        header = json.loads(mm[:end])
+    except ValueError:
+        mm.close()
+        return None
+    if (header.get('version') != _VERSION or header.get('byteorder') != sys.byteorder
+            or header.get('size') != stat.st_size or header.get('mtime_ns') != stat.st_mtime_ns
+            or header.get('linjer_pr_side') != linjer_pr_side):
+        mm.close()
+        return None
+    index = {'ord': header['ord'], '_mmap': mm}
+    pos = end + 1 + (-(end + 1) % 4)
+    view = memoryview(mm)
+    for name, length in zip(_ARRAYS, header['arrays']):
+        index[name] = view[pos:pos + 4 * length].cast('I')
+        pos += 4 * length
+    return index
+
+
+class Bog:
+    # En bog med indeks; indekset gemmes ved siden af bogen og genbruges
+    def __init__(self, path, linjer_pr_side=0):
+        self.path = os.fspath(path)
+        self.linjer_pr_side = linjer_pr_side
+        with open(self.path, 'rb') as fil:
+            stat = os.fstat(fil.fileno())
+            if stat.st_size == 0:
+                raise ValueError("Bogen er tom.")
+            self.data = mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = _read_index(self.path, stat, linjer_pr_side)
+        if self.index is None:
+            self.index = _build_index(self.data, linjer_pr_side)
+            try:
+                _write_index(self.path, stat, linjer_pr_side, self.index)
+            except OSError:
+                pass  # fx en skrivebeskyttet mappe; så bruges indekset kun i hukommelsen
+        for name in _ARRAYS:
+            setattr(self, name, self.index[name])
+        self._letters = None
+
+    @property
+    def pages(self):
+        return len(self.page_lines) - 1
+
+    def close(self):
+        for name in _ARRAYS:
+            setattr(self, name, None)
+        mm = self.index.pop('_mmap', None)
+        self.index = None
+        if mm is not None:
+            mm.close()
+        self.data.close()
+
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+
+    # Opslag: (side, linje, nr) -> ord eller bogstav, None hvis det ikke findes
+    def _line(self, side, linje):
+        if not 1 <= side <= self.pages:
+            return None
+        line = self.page_lines[side - 1] + linje - 1
+        if linje < 1 or line >= self.page_lines[side]:
+            return None
+        return line
+
+    def _token(self, i):
+        return _ORD.match(self.data, self.word_start[i]).group().decode('utf-8')
+
+    def word(self, side, linje, nr):
+        line = self._line(side, linje)
+        if line is None or nr < 1:
+            return None
+        i = self.line_words[line] + nr - 1
+        if i >= self.line_words[line + 1]:
+            return None
+        return _KANT.sub('', self._token(i))
+
+    def letter(self, side, linje, nr):
+        # Linjen er kort, så den læses og bogstaverne tælles
+        line = self._line(side, linje)
+        if line is None or nr < 1:
+            return None
+        text = self.data[self.line_start[line]:self.line_end[line]].decode('utf-8')
+        letters = [char for char in text if char.isalpha()]
+        return letters[nr - 1].upper() if nr <= len(letters) else None
+
+    # Omvendt: ordnummer i hele bogen -> (side, linje, nr)
+    def _word_triple(self, i):
+        line = bisect.bisect_right(self.line_words, i) - 1
+        page = bisect.bisect_right(self.page_lines, line) - 1
+        return page + 1, line - self.page_lines[page] + 1, i - self.line_words[line] + 1
+
+    def _occurrences(self, key):
+        start, count = self.index['ord'][key]
+        return self.word_order[start:start + count]
+
+    def _find_word(self, key, tilfældig, rng):
+        if key not in self.index['ord']:
+            return None
+        occurrences = self._occurrences(key)
+        return self._word_triple(rng.choice(occurrences) if tilfældig else occurrences[0])
+
+    def _letter_words(self):
+        # {bogstav: ([ord i bogen med bogstavet], første forekomst)}; bygges
+        # første gang der kodes med bogstaver
+        if self._letters is None:
+            self._letters = {}
+            for key in self.index['ord']:
+                first = self._occurrences(key)[0]
+                for char in set(key):
+                    upper = char.upper()
+                    if char.isalpha() and len(upper) == 1:
+                        keys, i = self._letters.get(upper, ([], first))
+                        keys.append(key)
+                        self._letters[upper] = keys, min(i, first)
+        return self._letters
+
+    def _find_letter(self, letter, tilfældig, rng):
+        if letter not in self._letter_words():
+            return None
+        keys, i = self._letters[letter]
+        if tilfældig:
+            i = rng.choice(self._occurrences(rng.choice(keys)))
+        side, linje, _ = self._word_triple(i)
+        line = self.page_lines[side - 1] + linje - 1
+        before = self.data[self.line_start[line]:self.word_start[i]].decode('utf-8')
+        in_word = [n for n, char in enumerate(c for c in self._token(i) if c.isalpha())
+                   if char.upper() == letter]
+        nr = sum(map(str.isalpha, before)) + (rng.choice(in_word) if tilfældig else in_word[0]) + 1
+        return side, linje, nr
+
+    def encode(self, text, bogstaver=False, tilfældig=False, rng=None):
+        # Ord der ikke findes i bogen bliver til '?'. Med bogstaver adskilles ord af ' / '
+        rng = rng or random
+        words = []
+        for word in text.split():
+            if bogstaver:
+                triples = [self._find_letter(char.upper(), tilfældig, rng) for char in word if char.isalpha()]
+            else:
+                key = word_key(word)
+                triples = [self._find_word(key, tilfældig, rng)] if key else []
+            if triples:
+                words.append(' '.join('%d,%d,%d' % t if t else '?' for t in triples))
+        return (' / ' if bogstaver else ' ').join(words)
+
+    def decode(self, code, bogstaver=False):
+        # Tallene læses tre og tre; alt andet end tal adskiller dem. Med
+        # bogstaver giver '/' mellemrum mellem ordene
+        lookup = self.letter if bogstaver else self.word
+        words = []
+        for part in code.split('/') if bogstaver else [code]:
+            numbers = [int(n) for n in _TAL.findall(part)]
+            found = [lookup(*numbers[i:i + 3]) if i + 3 <= len(numbers) else None
+                     for i in range(0, len(numbers), 3)]
+            if found:
+                words.append(('' if bogstaver else ' ').join(f or '?' for f in found))
+        return ' '.join(words)
+
+
+def save_book(data, folder=None):
+    # Gemmer en uploadet bog under et navn ud fra indholdet, så samme bog
+    # (og dens indeks) genbruges ved næste kørsel
+    folder = folder or os.path.join(tempfile.gettempdir(), 'kodesamling-bøger')
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, hashlib.sha256(data).hexdigest()[:20] + '.txt')
+    if not os.path.exists(path):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as out:
+            out.write(data)
+        os.replace(tmp, path)
+    return path
@@ -0,0 +1,21 @@
+# Filer der er afledt af andre filer (T9-indekset og n-gram-modellen for en
+# ordliste) gemmes i brugerens cachemappe, $XDG_CACHE_HOME/kodesamling eller
+# ~/.cache/kodesamling, og aldrig i pakken, der kan være skrivebeskyttet
+# eller delt mellem brugere. Filnavnet indeholder en hash af kildens fulde
+# sti, så to ordlister med samme navn ikke deler cache. Mappen oprettes
+# først, når der skrives til den.
+import hashlib
+import os
+
+
+def cache_mappe():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'kodesamling')
+
+def cache_sti(kilde, endelse):
+    kilde = os.path.abspath(os.fspath(kilde))
+    navn = hashlib.sha1(kilde.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return os.path.join(cache_mappe(), f'{os.path.basename(kilde)}-{navn}{endelse}')
+
+def opret_cache_mappe(sti):
+    os.makedirs(os.path.dirname(sti), exist_ok=True)
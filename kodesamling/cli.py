@@ -0,0 +1,192 @@
+# Kommandolinje til kodesamlingen, fx:
+#   echo "hej med dig" | python -m kodesamling kod morse
+#   python -m kodesamling afkod vigenere -k SJAK besked.txt -o klartekst.txt
+# Modulet må kun importere standardbiblioteket ved opstart, så mange korte
+# kørsler fra shell-scripts ikke betaler for Streamlit og pandas.
+import argparse
+import os
+import sys
+
+from .koder import create_danish_square, danish_alphabet, int_to_roman, roman_to_int
+from .streaming import (
+    alpha_num_decode_stream,
+    alpha_num_encode_stream,
+    bacon_code_decode_stream,
+    bacon_code_encode_stream,
+    bifid_decode_stream,
+    bifid_encode_stream,
+    binærkode_stream,
+    decode_100p_stream,
+    decode_from_morse_stream,
+    decode_roversprog_stream,
+    encode_100p_stream,
+    encode_roversprog_stream,
+    encode_to_morse_stream,
+    kodeordskode_decode_stream,
+    kodeordskode_encode_stream,
+    read_chunks,
+    rot_x_decode_stream,
+    rot_x_encode_stream,
+    sms_decode_stream,
+    sms_encode_stream,
+    vigenere_stream,
+)
+
+
+def rot_offset(key):
+    # Nøglen kan være et bogstav (A-Å) som i appen eller et tal
+    key = (key or '').strip().upper()
+    if key.lstrip('-').isdigit():
+        return int(key)
+    if key in danish_alphabet:
+        return danish_alphabet.index(key)
+    raise ValueError(f"Ugyldig ROT-X nøgle: {key!r} (brug et bogstav A-Å eller et tal)")
+
+def _vigenere_key(key):
+    if not key or not key.isalpha():
+        raise ValueError("Nøgleord skal kun indeholde bogstaver og må ikke være tomt.")
+    return key
+
+def _bacon_message(key):
+    if not key:
+        raise ValueError("Baconkode kræver den hemmelige besked som nøgle (-k).")
+    return key
+
+def _bifid_square(args):
+    return create_danish_square() if args.dansk_firkant else None
+
+def _romertal_stream(chunks, encode):
+    # Romertal omregner ét tal pr. linje
+    text = ''.join(chunks)
+    results = []
+    for line in text.splitlines():
+        line = line.strip().upper()
+        if not line:
+            results.append('')
+        elif encode:
+            results.append(int_to_roman(int(line)) if line.isdigit() else '?')
+        else:
+            try:
+                results.append(str(roman_to_int(line)))
+            except KeyError:
+                results.append('?')
+    yield '\n'.join(results)
+
+# metode: (kod, afkod), hver som funktion(bidder, argumenter) -> outputbidder
+METODER = {
+    'morse': (lambda c, a: encode_to_morse_stream(c),
+              lambda c, a: decode_from_morse_stream(c)),
+    'rot-x': (lambda c, a: rot_x_encode_stream(c, rot_offset(a.key)),
+              lambda c, a: rot_x_decode_stream(c, rot_offset(a.key))),
+    'alfa-nr': (lambda c, a: alpha_num_encode_stream(c),
+                lambda c, a: alpha_num_decode_stream(c)),
+    'kodeord': (lambda c, a: kodeordskode_encode_stream(c, a.key or 'SJAK'),
+                lambda c, a: kodeordskode_decode_stream(c, a.key or 'SJAK')),
+    'sms': (lambda c, a: sms_encode_stream(c),
+            lambda c, a: sms_decode_stream(c)),
+    '100p': (lambda c, a: encode_100p_stream(c, a.key or '', a.samlet),
+             lambda c, a: decode_100p_stream(c, a.key or '', a.samlet)),
+    'romertal': (lambda c, a: _romertal_stream(c, True),
+                 lambda c, a: _romertal_stream(c, False)),
+    'roversprog': (lambda c, a: encode_roversprog_stream(c, a.key or 'o'),
+                   lambda c, a: decode_roversprog_stream(c, a.key)),
+    'binaer': (lambda c, a: binærkode_stream(c, encode=True, compact=a.kompakt),
+               lambda c, a: binærkode_stream(c, encode=False, compact=a.kompakt)),
+    'vigenere': (lambda c, a: vigenere_stream(c, _vigenere_key(a.key), encode=True),
+                 lambda c, a: vigenere_stream(c, _vigenere_key(a.key), encode=False)),
+    'bifid': (lambda c, a: bifid_encode_stream(c, a.periode, _bifid_square(a)),
+              lambda c, a: bifid_decode_stream(c, a.periode, _bifid_square(a))),
+    'bacon': (lambda c, a: bacon_code_encode_stream(_bacon_message(a.key), c),
+              lambda c, a: bacon_code_decode_stream(c)),
+}
+
+# Vektoriserede udgaver med NumPy (--numpy); importeres først når de bruges
+VEKTOR_METODER = {
+    'rot-x': (lambda c, a: rot_x_encode_stream(c, rot_offset(a.key), vectorized=True),
+              lambda c, a: rot_x_decode_stream(c, rot_offset(a.key), vectorized=True)),
+    'vigenere': (lambda c, a: vigenere_stream(c, _vigenere_key(a.key), encode=True, vectorized=True),
+                 lambda c, a: vigenere_stream(c, _vigenere_key(a.key), encode=False, vectorized=True)),
+    '100p': (lambda c, a: encode_100p_stream(c, a.key or '', a.samlet, vectorized=True),
+             lambda c, a: decode_100p_stream(c, a.key or '', a.samlet, vectorized=True)),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m kodesamling',
+        description='Kod eller afkod tekst fra filer eller stdin med kodesamlingens koder.',
+    )
+    parser.add_argument('handling', choices=('kod', 'afkod'))
+    parser.add_argument('metode', choices=sorted(METODER))
+    parser.add_argument('filer', nargs='*', default=['-'],
+                        help="inputfiler; '-' eller ingen betyder stdin")
+    parser.add_argument('-k', '--nøgle', '--key', dest='key', default=None,
+                        help='nøgle: ROT-X bogstav/tal, kodeord, Vigenère-nøgleord, 100P-kodeord, Røversprogets vokal '
+                             '(afkodning uden -k finder den selv) eller den skjulte Bacon-besked')
+    parser.add_argument('-o', '--output', default=None,
+                        help='skriv til fil i stedet for stdout')
+    parser.add_argument('-l', '--linjer', action='store_true',
+                        help='kod hver linje for sig (mange korte beskeder i én kørsel)')
+    parser.add_argument('--periode', type=int, default=5,
+                        help='Bifid: antal bogstaver pr. periode, 0 = hele beskeden (standard: %(default)s)')
+    parser.add_argument('--dansk-firkant', action='store_true',
+                        help='Bifid: brug 6x6 firkanten med Æ, Ø og Å')
+    parser.add_argument('--kompakt', action='store_true',
+                        help='Binærkode: 8 bit pr. bogstav uden adskillere, mellemrum mellem ord')
+    parser.add_argument('--samlet', action='store_true',
+                        help='100P: bogstavpar uden mellemrum (P4P5O4), mellemrum er ordskifte')
+    parser.add_argument('--numpy', action='store_true',
+                        help='brug NumPy til ROT-X, Vigenère og 100P (hurtigere på store filer)')
+    parser.add_argument('--bidstørrelse', dest='chunk_size', type=int, default=1 << 16,
+                        help='antal tegn der læses ad gangen (standard: %(default)s)')
+    return parser
+
+
+def run(codec, args, infile, outfile):
+    if args.linjer:
+        for line in infile:
+            outfile.write(''.join(codec([line.rstrip('\r\n')], args)))
+            outfile.write('\n')
+    else:
+        for part in codec(read_chunks(infile, args.chunk_size), args):
+            outfile.write(part)
+
+
+def main(argv=None):
+    args = build_parser().parse_intermixed_args(argv)
+    metoder = VEKTOR_METODER if args.numpy and args.metode in VEKTOR_METODER else METODER
+    codec = metoder[args.metode][0 if args.handling == 'kod' else 1]
+
+    for stream in (sys.stdin, sys.stdout):
+        if hasattr(stream, 'reconfigure'):
+            stream.reconfigure(encoding='utf-8')
+    # -o skrives til en midlertidig fil ved siden af, som først erstatter
+    # den rigtige, når alt er kodet; en fejl undervejs (fx for kort fyldtekst
+    # til Baconkode) efterlader ikke en halv fil. Andet end almindelige
+    # filer (fx /dev/null) skrives der direkte til
+    tmp = None
+    if args.output and (os.path.isfile(args.output) or not os.path.exists(args.output)):
+        tmp = f"{args.output}.{os.getpid()}.tmp"
+    outfile = sys.stdout
+    try:
+        if args.output:
+            outfile = open(tmp or args.output, 'x' if tmp else 'w', encoding='utf-8', newline='')
+        for path in args.filer:
+            if path == '-':
+                run(codec, args, sys.stdin, outfile)
+            else:
+                with open(path, encoding='utf-8', newline='') as infile:
+                    run(codec, args, infile, outfile)
+        if tmp:
+            outfile.close()
+            os.replace(tmp, args.output)
+            tmp = None
+    except (ValueError, OSError) as e:
+        print(f"fejl: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if outfile is not sys.stdout:
+            outfile.close()
+            if tmp:
+                os.remove(tmp)
+    return 0
@@ -0,0 +1,199 @@
+# "Ukendt kode": gæt hvilken kode en tekst er skrevet i. Tegnene i teksten
+# giver et fingeraftryk (morsetegn, tal, P/O/I/N/T-par, blandede store og
+# små bogstaver, bits ...), og kun de koder, der kan passe, prøves. De kører
+# samtidig i hver sin tråd på et udsnit af teksten, og resultaterne sorteres
+# efter hvor dansk de ser ud. Hver kode har sin egen tidsgrænse, målt i den
+# CPU-tid dens tråd bruger, så en langsom kode ikke tager tid fra de andre.
+# Udsnittet begrænser, hvor meget hver kode kan nå at arbejde, så identify
+# venter på alle trådene, og ingen af dem kører videre efter kaldet.
+import re
+import string
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .knaek import rot_x_crack
+from .koder import (
+    alpha_num_decode,
+    bacon_code_decode,
+    bifid_decode,
+    binærkode_tabel,
+    codec_table,
+    danish_alphabet,
+    decode_100p,
+    decode_from_morse,
+    decode_roversprog,
+    int_to_roman,
+    roman_to_int,
+    roversprog_vokal,
+    sms_decode,
+)
+from .statistik import danish_bits_many
+
+UDSNIT = 4000        # tegn der afkodes; lange tekster vurderes ud fra starten
+TIDSGRÆNSE = 0.5     # sekunder (CPU-tid) til hver kode
+ROT_X_BEDSTE = 3     # antal ROT-X forskydninger der kommer med på listen
+ROMERTAL_BITS = 3.0  # score for gyldige romertal, som ikke er tekst
+BLANDET_BITS = 0.5   # straf til ROT-X, når store og små bogstaver er blandet
+PAR_BITS = 1.0       # straf til ROT-X, når teksten er bogstav-tal-par som i 100P
+
+ANDEL = 0.9          # andel af tegnene der skal passe, for at en kode prøves
+
+_MORSE = '.-/'
+_BITS = '01|'
+_TAL = frozenset('0123456789')
+_100P = re.compile(r'([POINT][1-6])+', re.IGNORECASE)
+_ROMERTAL = re.compile(r'[IVXLCDM\s]+', re.IGNORECASE)
+_INDRE_STORE = re.compile(r'(?<=\w)[^\W\d_a-zæøå]')
+_KONSONANT = re.compile(r'[bcdfghjklmnpqrstvwxz]', re.IGNORECASE)
+# Koderne skriver '?' for tegn uden kode, og tegnsætning kan stå urørt
+_TEGNSÆTNING = frozenset(string.punctuation + '«»–—…‘’“”')
+
+
+def _share(text, allowed):
+    # Andelen af tegnene (uden mellemrum) der er i allowed; '?' og anden
+    # tegnsætning tæller kun med, hvis den er en del af koden
+    counted = [c for c in text if not c.isspace() and (c in allowed or c not in _TEGNSÆTNING)]
+    if not counted:
+        return 0.0
+    return sum(c in allowed for c in counted) / len(counted)
+
+def _token_share(text, match):
+    # Andelen af ordene (uden dem, der kun er tegnsætning) hvor match er sand
+    tokens = [token for token in text.split() if not _TEGNSÆTNING.issuperset(token)]
+    if not tokens:
+        return 0.0
+    return sum(1 for token in tokens if match(token)) / len(tokens)
+
+
+def fingerprint(text):
+    # De slags tegn teksten består af, fx {'morse'} eller {'bogstaver', 'blandet'}.
+    # En kode passer, når mindst ANDEL af tegnene hører til den, så enkelte
+    # '?' og kommaer ikke udelukker den
+    text = text.strip()
+    kinds = set()
+    if not text:
+        return kinds
+    if _share(text, _MORSE) >= ANDEL and ('.' in text or '-' in text):
+        kinds.add('morse')
+    if _share(text, _BITS) >= ANDEL and ('0' in text or '1' in text):
+        kinds.add('bits')
+    if _share(text, _TAL) >= ANDEL:
+        kinds.add('tal')
+        if _token_share(text, lambda token: len(set(token)) == 1 and token[0] in '023456789') >= ANDEL:
+            kinds.add('sms')
+    if _token_share(text, _100P.fullmatch) >= ANDEL:
+        kinds.add('100p')
+    if _ROMERTAL.fullmatch(text):
+        kinds.add('romertal')
+    letters = [c for c in text if c.isalpha()]
+    if letters:
+        kinds.add('bogstaver')
+        # Almindelig tekst har næsten ingen store bogstaver midt i ordene;
+        # i Baconkode er omkring halvdelen af de kodede bogstaver store.
+        # Tekst med kun store bogstaver tæller ikke som blandet
+        inner_caps = len(_INDRE_STORE.findall(text))
+        lower = sum(map(str.islower, letters))
+        if inner_caps >= max(3, 0.02 * len(letters)) and lower >= 0.1 * len(letters):
+            kinds.add('blandet')
+        consonants = len(_KONSONANT.findall(text))
+        triples = codec_table('røversprog_regex', roversprog_vokal(text)).findall(text)
+        if consonants and len(triples) >= 0.3 * consonants:
+            kinds.add('røversprog')
+    return kinds
+
+
+def _sample(text, size):
+    # Starten af teksten, skåret ved et mellemrum eller en separator, eller
+    # ved et multiplum af 10 tegn (hele Bifid-perioder og Bacon-grupper)
+    if len(text) <= size:
+        return text
+    cut = max(text.rfind(sep, 0, size) for sep in ' /|')
+    return text[:cut] if cut > size // 2 else text[:size - size % 10]
+
+def _morse(text):
+    # Morse skrevet med mellemrum i stedet for '/' mellem bogstaver
+    if '/' not in text:
+        text = re.sub(r'\s{2,}', '//', text.strip())
+        text = re.sub(r'\s', '/', text)
+    return decode_from_morse(text)
+
+def _bacon(text):
+    # Fyldtekst efter den skjulte besked er små bogstaver, som bliver til
+    # A'er; beskeden slutter ved første lange række A'er
+    return re.sub('A{5,}.*', '', bacon_code_decode(text))
+
+def _romertal(text):
+    tokens = text.upper().split()
+    numbers = [roman_to_int(token) for token in tokens]
+    # Kun gyldige romertal, fx ikke IIII eller VX
+    if any(int_to_roman(n) != token for n, token in zip(numbers, tokens)):
+        return None
+    return ' '.join(map(str, numbers))
+
+# (navn, krævet fingeraftryk, afkodning); afkodningen giver tekst eller None
+DECODERS = [
+    ('Morsekode', 'morse', _morse),
+    ('Binærkode', 'bits', lambda text: binærkode_tabel(text, encode=False)),
+    ('Alfa-Nr.', 'tal', alpha_num_decode),
+    ('SMS-kode', 'sms', sms_decode),
+    ('100P-koden', '100p', decode_100p),
+    ('Romertal', 'romertal', _romertal),
+    ('Røversprog', 'røversprog', lambda text: decode_roversprog(text, vokal=None)),
+    ('Baconkode', 'blandet', _bacon),
+    ('Bifid', 'bogstaver', bifid_decode),
+]
+
+def _rot_x(text):
+    return [(f'ROT-X ({danish_alphabet[offset]})' if offset else 'Ingen kode', decoded)
+            for offset, _, decoded in rot_x_crack(text, top=ROT_X_BEDSTE)]
+
+
+def _timed(decode, text):
+    # Afkodningen og den CPU-tid, den brugte i sin egen tråd
+    start = time.thread_time()
+    decoded = decode(text)
+    return decoded, time.thread_time() - start
+
+def identify(text, budget=TIDSGRÆNSE, sample=UDSNIT):
+    # Returnerer [(score, metode, afkodet udsnit)] med den mest danske først
+    # (score i bits pr. bogstav, se danish_bits_many) og en liste over de koder,
+    # der brugte mere end budget sekunder hver
+    # Fingeraftryk og afkodning bruger samme udsnit, så tiden ikke afhænger
+    # af tekstens længde
+    text = _sample(text.strip(), sample)
+    kinds = fingerprint(text)
+    jobs = [(name, decode) for name, kind, decode in DECODERS if kind in kinds]
+    if 'bogstaver' in kinds:
+        jobs.append(('ROT-X', _rot_x))
+    with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as pool:
+        futures = {pool.submit(_timed, decode, text): name for name, decode in jobs}
+    results = []
+    candidates = []  # (straf, metode, afkodet tekst), som vurderes samlet til sidst
+    slow = []
+    for future, name in futures.items():
+        try:
+            decoded, used = future.result()
+        except (KeyError, ValueError, IndexError):
+            continue  # teksten passede alligevel ikke til koden
+        if used > budget:
+            slow.append(name)
+            continue
+        if name == 'ROT-X':
+            # Blandede store og små bogstaver tyder på, at det er
+            # bogstavernes form og ikke deres værdi, der bærer beskeden
+            penalty = BLANDET_BITS if 'blandet' in kinds else 0.0
+            # Ligeså med par som P4: tallene tæller ikke med i vurderingen,
+            # så ROT-X af de få bogstaver kan ellers ligne dansk
+            penalty += PAR_BITS if '100p' in kinds else 0.0
+            candidates.extend((penalty, n, d) for n, d in decoded)
+        elif name == 'Romertal':
+            if decoded is not None:
+                results.append((ROMERTAL_BITS, name, decoded))
+        elif decoded:
+            candidates.append((0.0, name, decoded))
+    # '?' der allerede stod i teksten (tegn uden kode) er ikke afkodningens fejl
+    known = text.count('?')
+    scores = danish_bits_many([d.replace('?', '', known) for _, _, d in candidates])
+    results.extend((score + penalty, n, d) for score, (penalty, n, d) in zip(scores, candidates))
+    results.sort(key=lambda r: r[0])
+    return results, sorted(slow)
@@ -0,0 +1,276 @@
+# Knækkere: finder nøglen til en kode uden at kende den på forhånd ved at
+# prøve nøgler og vurdere resultatet med dansk sprogstatistik.
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .koder import _vigenere_part, danish_alphabet, danish_alphabet_2, kodeordskode_decode, rot_x_decode
+from .npkompat import has_numpy, numpy_or_none
+from .statistik import danish_bits_many, letter_histogram, letter_probabilities, log_likelihood
+from .vektor import _to_indices
+
+VURDERING = 5000  # tegn der afkodes for at vurdere de bedste nøgler
+ROT_X_OMVURDERING = 5  # ROT-X forskydninger der vurderes igen med n-gram-modellen
+
+
+def rot_x_crack(text, top=5, preview=None):
+    # Alle 28 forskydninger vurderes ud fra ét histogram: at afkode med
+    # forskydning s flytter blot histogrammet s pladser, så kun de bedste
+    # kandidater behøver at blive afkodet - og med preview kun de første tegn.
+    # Scoren er bits pr. bogstav med danske bogstavfrekvenser (som
+    # danish_bits); med NumPy vurderes de få bedste igen med n-gram-modellen.
+    # Returnerer [(forskydning, bits, afkodet tekst)] med den bedste først.
+    n = len(danish_alphabet)
+    counts = letter_histogram(text, danish_alphabet)
+    probabilities = letter_probabilities(danish_alphabet)
+    scores = []
+    for offset in range(n):
+        rotated = counts[offset:] + counts[:offset]
+        scores.append((-log_likelihood(rotated, probabilities) / math.log(2), offset))
+    scores.sort()
+    if has_numpy():
+        # Kun de bedste forskydninger afkodes; n-gram-modellen ser også på
+        # bogstavernes rækkefølge og skiller især korte tekster ad
+        best = [offset for _, offset in scores[:max(top, ROT_X_OMVURDERING)]]
+        sample = text[:VURDERING]
+        scores = sorted(zip(danish_bits_many([rot_x_decode(sample, offset) for offset in best]), best))
+    sample = text if preview is None else text[:preview]
+    return [(offset, bits, rot_x_decode(sample, offset)) for bits, offset in scores[:top]]
+
+
+def kodeord_canonical(keyword):
+    # Kodeordskodens tabel afhænger kun af kodeordets unikke bogstaver i
+    # rækkefølge, så SJAK, SJAKS og sjak giver samme tabel
+    return ''.join(dict.fromkeys(filter(_ALPHABET_SET.__contains__, keyword.upper())))
+
+_ALPHABET_SET = frozenset(danish_alphabet)
+FORUDVALG = 50  # kodeord der afkodes og vurderes efter chi²-forudvalget
+
+def kodeord_candidates(words):
+    # Fjerner kodeord der giver samme tabel; beholder første ord for hver tabel
+    candidates = {}
+    for word in words:
+        candidates.setdefault(kodeord_canonical(word), word.strip())
+    candidates.pop('', None)
+    return candidates
+
+def _score_kodeord_chunk(counts, keywords, top):
+    # Kører i en arbejdsproces og finder forudvalget til kodeord_crack.
+    # Kodeordskoden bytter bogstaver mellem de to rækker, så den afkodede
+    # teksts histogram er blot chiffertekstens histogram med bogstaverne
+    # byttet om - ingen afkodning er nødvendig. Bidraget til chi² for hvert
+    # bogstavpar slås op i en forudberegnet tabel.
+    total = sum(counts.values())
+    if total == 0:
+        return []
+    probabilities = dict(zip(danish_alphabet, letter_probabilities(danish_alphabet)))
+
+    def cost(cipher, plain):
+        expected = total * probabilities[plain]
+        return (counts[cipher] - expected) ** 2 / expected
+
+    pair_cost = {a + b: cost(a, b) + cost(b, a) for a in danish_alphabet for b in danish_alphabet}
+    mid = (len(danish_alphabet) + 1) // 2
+    scored = []
+    for keyword in keywords:
+        # Samme rækkefølge som keyword_cipher_setup: kodeord + resten af alfabetet
+        sequence = keyword + ''.join([c for c in danish_alphabet if c not in keyword])
+        pairs = map(str.__add__, sequence[:mid], sequence[mid:])
+        scored.append((sum(map(pair_cost.__getitem__, pairs)), keyword))
+    return heapq.nsmallest(top, scored)
+
+def kodeord_crack(text, words, top=10, workers=None, chunk_size=5000, preview=300, forudvalg=FORUDVALG):
+    # Ordbogsangreb på Kodeordskode. Kodeordene deles i bidder, der scores
+    # med chi² i en procespulje; de forudvalg bedste afkodes og vurderes med
+    # danish_bits_many, som også ser på bogstavernes rækkefølge. Efter hver
+    # færdig bid gives (færdige, i alt, bedste), hvor bedste er
+    # [(bits pr. bogstav, kodeord, afkodet tekst)] med den bedste først.
+    candidates = kodeord_candidates(words)
+    keywords = list(candidates)
+    counts = dict(zip(danish_alphabet, letter_histogram(text, danish_alphabet)))
+    chunks = [keywords[i:i + chunk_size] for i in range(0, len(keywords), chunk_size)]
+    forudvalg = max(top, forudvalg)
+    vurdering = text[:VURDERING]
+    bits = {}  # kodeord: bits pr. bogstav, så hvert kodeord kun afkodes én gang
+    sample = text if preview is None else text[:preview]
+
+    def results(best):
+        new = [kw for _, kw in best if kw not in bits]
+        bits.update(zip(new, danish_bits_many([kodeordskode_decode(vurdering, kw) for kw in new])))
+        ranked = sorted((bits[kw], kw) for _, kw in best)[:top]
+        return [(score, candidates[kw], kodeordskode_decode(sample, kw)) for score, kw in ranked]
+
+    best = []
+    done = 0
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            best = heapq.nsmallest(forudvalg, best + _score_kodeord_chunk(counts, chunk, forudvalg))
+            done += len(chunk)
+            yield done, len(keywords), results(best)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_score_kodeord_chunk, counts, chunk, forudvalg): len(chunk)
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                best = heapq.nsmallest(forudvalg, best + future.result())
+                done += futures[future]
+                yield done, len(keywords), results(best)
+    if not chunks:
+        yield 0, 0, []
+
+
+# Vigenère: nøglelængden findes ud fra koincidensindekset (IoC) for hver
+# mulig periode, støttet af Kasiskis metode. Ved den rigtige periode er hver
+# kolonne (hvert periode'te tegn) blot en ROT-X-kode, så bogstaverne i den
+# fordeler sig som dansk (IoC omkring 0,07) i stedet for jævnt (1/29). Ved
+# den rigtige periode og dens multipla deler gentagne trebogstavsstykker
+# desuden ofte afstande med perioden. Hver kolonnes nøglebogstav findes
+# derefter som i rot_x_crack ud fra kolonnens histogram.
+#
+# Som i vigenere_kode tæller alle tegn med i nøglepositionen, så kolonnerne
+# er tegnenes plads i hele teksten modulo perioden. Histogrammerne tælles
+# med np.bincount (eller str.count pr. kolonne uden NumPy), og lange tekster
+# fordeles over perioderne i en procespulje.
+MAKS_PERIODE = 40
+MINDST_PR_KOLONNE = 6     # bogstaver pr. kolonne før en periode kan vurderes
+KANDIDATER = 8            # perioder hvor nøglen findes og vurderes
+KASISKI_UDSNIT = 20000    # tegn; gentagelser søges kun i starten af teksten
+PARALLEL_FRA = 200000     # tegn; kortere tekster analyseres uden procespulje
+
+
+def _column_counts(text, periods, alphabet):
+    # {periode: [[antal pr. bogstav] pr. kolonne]}; kører evt. i en arbejdsproces
+    if has_numpy():
+        np = numpy_or_none()
+        _, indices, mask = _to_indices(text, tuple(alphabet))
+        positions = np.flatnonzero(mask)
+        letters = indices[mask].astype(np.intp)
+        m = len(alphabet)
+        return {period: np.bincount((positions % period) * m + letters, minlength=period * m)
+                .reshape(period, m).tolist() for period in periods}
+    # text er allerede med store bogstaver; str.count kører i C
+    return {period: [[column.count(c) for c in alphabet] for column in (text[j::period] for j in range(period))]
+            for period in periods}
+
+def _ioc(columns):
+    # Gennemsnitligt koincidensindeks over kolonnerne
+    values = []
+    for counts in columns:
+        total = sum(counts)
+        if total > 1:
+            values.append(sum(c * (c - 1) for c in counts) / (total * (total - 1)))
+    return sum(values) / len(values) if values else 0.0
+
+def kasiski_distances(text, alphabet=danish_alphabet_2, limit=KASISKI_UDSNIT):
+    # Afstande (i tegn) mellem gentagne stykker på tre bogstaver, hver til
+    # forrige forekomst af samme stykke
+    letters_set = frozenset(alphabet)
+    positions = [i for i, c in enumerate(text[:limit]) if c in letters_set]
+    letters = ''.join(text[i] for i in positions)
+    seen = {}
+    distances = []
+    for i in range(len(letters) - 2):
+        trigram = letters[i:i + 3]
+        last = seen.get(trigram)
+        if last is not None:
+            distances.append(positions[i] - positions[last])
+        seen[trigram] = i
+    return distances
+
+def _ioc_limits(alphabet):
+    # IoC for jævnt fordelte bogstaver og for dansk tekst
+    return 1 / len(alphabet), sum(p * p for p in letter_probabilities(alphabet))
+
+def friedman_length(ioc, alphabet=danish_alphabet_2):
+    # Friedmans skøn over nøglelængden ud fra hele tekstens IoC
+    uniform, danish = _ioc_limits(alphabet)
+    if ioc <= uniform:
+        return float('inf')
+    return max(1.0, (danish - uniform) / (ioc - uniform))
+
+def _column_key(columns, alphabet):
+    # Nøglebogstavet for hver kolonne og bits pr. bogstav for hele teksten.
+    # Afkodning med forskydning s flytter histogrammet s pladser, så hver
+    # forskydning vurderes med danske log-sandsynligheder uden at afkode
+    m = len(alphabet)
+    log_p = [-math.log2(p) for p in letter_probabilities(alphabet)]
+    key = []
+    bits = 0.0
+    for counts in columns:
+        cost, shift = min((sum(counts[(t + s) % m] * log_p[t] for t in range(m)), s) for s in range(m))
+        key.append(alphabet[shift])
+        bits += cost
+    total = sum(map(sum, columns))
+    return ''.join(key), bits / total if total else float('inf')
+
+def _shortest_repeat(key):
+    # SJAKSJAK -> SJAK: en periode der er et multiplum giver samme nøgle gentaget
+    for n in range(1, len(key)):
+        if len(key) % n == 0 and key[:n] * (len(key) // n) == key:
+            return key[:n]
+    return key
+
+def vigenere_crack(text, top=5, max_period=MAKS_PERIODE, kandidater=KANDIDATER, preview=300,
+                   workers=None, alphabet=danish_alphabet_2):
+    # Returnerer (perioder, nøgler):
+    #   perioder: [(periode, IoC, Kasiski-andel, score)] med den mest sandsynlige først
+    #   nøgler:   [(nøgle, bits pr. bogstav, afkodet tekst)] med den bedste først
+    # Kasiski-andelen er andelen af gentagelsernes afstande, der går op i
+    # perioden. Nøglerne rangeres efter bits for teksten plus bits for selve
+    # nøglen, så en længere nøgle skal give en tilsvarende bedre tekst.
+    text = text.upper()
+    alphabet = list(alphabet)
+    n_letters = sum(letter_histogram(text, alphabet))
+    if n_letters == 0:
+        return [], []
+    max_period = max(1, min(max_period, n_letters // MINDST_PR_KOLONNE))
+    periods = list(range(1, max_period + 1))
+    workers = min(workers or os.cpu_count() or 1, len(periods))
+    if workers == 1 or len(text) < PARALLEL_FRA:
+        counts = _column_counts(text, periods, alphabet)
+    else:
+        counts = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Hver proces får hver workers'te periode, så arbejdet fordeles jævnt
+            for part in pool.map(_column_counts, [text] * workers,
+                                 [periods[i::workers] for i in range(workers)], [alphabet] * workers):
+                counts.update(part)
+
+    distances = kasiski_distances(text, alphabet)
+    repeats = {}
+    for distance in distances:
+        repeats[distance] = repeats.get(distance, 0) + 1
+    uniform, danish = _ioc_limits(alphabet)
+    stats = []
+    for period in periods:
+        ioc = _ioc(counts[period])
+        kasiski = (sum(count for distance, count in repeats.items() if distance % period == 0) / len(distances)
+                   if distances else 0.0)
+        # IoC og Kasiski normeres, så 0 er tilfældigt og 1 er som forventet ved
+        # den rigtige periode; perioden 1 siger Kasiski intet om
+        score = (ioc - uniform) / (danish - uniform)
+        if period > 1:
+            score += max(0.0, kasiski - 1 / period) / (1 - 1 / period)
+        stats.append((period, ioc, kasiski, score))
+    stats.sort(key=lambda s: -s[3])
+
+    key_bits = math.log2(len(alphabet))
+    keys = {}
+    for period, _, _, _ in stats[:kandidater]:
+        key, bits = _column_key(counts[period], alphabet)
+        key = _shortest_repeat(key)
+        total = bits + len(key) * key_bits / max(n_letters, 1)
+        if key not in keys or total < keys[key][0]:
+            keys[key] = (total, bits)
+    if has_numpy():
+        # Med NumPy vurderes kandidaterne igen med n-gram-modellen, som også
+        # ser på bogstavernes rækkefølge; det skiller især korte tekster ad
+        sample = text[:VURDERING]
+        letters = max(1, sum(letter_histogram(sample, alphabet)))
+        decoded = [_vigenere_part(sample, key, False, alphabet, 0) for key in keys]
+        for key, bits in zip(list(keys), danish_bits_many(decoded)):
+            keys[key] = (bits + len(key) * key_bits / letters, bits)
+    best = sorted(keys.items(), key=lambda item: item[1][0])[:top]
+    sample = text if preview is None else text[:preview]
+    return stats, [(key, bits, _vigenere_part(sample, key, False, alphabet, 0)) for key, (_, bits) in best]
@@ -0,0 +1,374 @@
+import math
+import re
+from functools import lru_cache
+
+from .bacon import BACON_DICT, bacon_code_decode, bacon_code_encode
+from .binaer import binærkode_tabel
+from .bifid import (
+    bifid_decode,
+    bifid_encode,
+    bifid_kode,
+    coords_to_letter,
+    create_danish_square,
+    create_polybius_square,
+    letter_to_coords,
+)
+from .polybius import polybius_decode, polybius_encode, polybius_square
+
+# Morse code dictionary, including Danish letters
+MORSE_CODE_DICT = {
+    'A': '.-',    'B': '-...',  'C': '-.-.',  'D': '-..',   'E': '.',
+    'F': '..-.',  'G': '--.',   'H': '....',  'I': '..',    'J': '.---',
+    'K': '-.-',   'L': '.-..',  'M': '--',    'N': '-.',    'O': '---',
+    'P': '.--.',  'Q': '--.-',  'R': '.-.',   'S': '...',   'T': '-',
+    'U': '..-',   'V': '...-',  'W': '.--',   'X': '-..-',  'Y': '-.--',
+    'Z': '--..',
+    '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-',
+    '5': '.....', '6': '-....', '7': '--...', '8': '---..', '9': '----.',
+    'Æ': '.-.-',  'Ø': '---.',  'Å': '.--.-'
+}
+
+danish_alphabet = [
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'X', 'Y', 'Z', 'Æ', 'Ø', 'Å'
+]
+
+# Tastatur mapping til SMS-kode
+SMS_KEYPAD = {
+    'A': '2', 'B': '22', 'C': '222',
+    'D': '3', 'E': '33', 'F': '333',
+    'G': '4', 'H': '44', 'I': '444',
+    'J': '5', 'K': '55', 'L': '555',
+    'M': '6', 'N': '66', 'O': '666',
+    'P': '7', 'Q': '77', 'R': '777', 'S': '7777',
+    'T': '8', 'U': '88', 'V': '888',
+    'W': '9', 'X': '99', 'Y': '999', 'Z': '9999',
+    # Æ, Ø, Å håndteres før som AE, OE, AA
+}
+
+# New alphabet specifically for 100P code (same letters, but separate variable)
+danish_alphabet_2 = [
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
+    'Æ', 'Ø', 'Å'
+]
+
+# Rækker og kolonner i 100P-tabellen (danish_alphabet_2 fylder dem i rækkefølge)
+rows_100p = ['P', 'O', 'I', 'N', 'T']
+cols_100p = ['1', '2', '3', '4', '5', '6']
+
+# Oversættelsestabeller til alle koder, der erstatter ét tegn ad gangen.
+# Hver tabel bygges én gang pr. (kode, nøgle) og genbruges derefter, så
+# selve kodningen er ét lineært str.translate eller ét join over teksten.
+def _rot_x_table(offset):
+    n = len(danish_alphabet)
+    return str.maketrans({c: danish_alphabet[(i + offset) % n] for i, c in enumerate(danish_alphabet)})
+
+def _kodeord_table(keyword):
+    top_row, bottom_row = keyword_cipher_setup(keyword)
+    mapping = {}
+    # Nederste række først, så øverste række vinder hvis et tegn står i begge
+    for idx, char in enumerate(bottom_row):
+        if char:
+            mapping[char] = top_row[idx] if idx < len(top_row) else char
+    for idx, char in enumerate(top_row):
+        if char:
+            mapping[char] = bottom_row[idx] if idx < len(bottom_row) else char
+    return str.maketrans(mapping)
+
+def _alfa_nr_table(_key):
+    table = {c: str(i + 1) for i, c in enumerate(danish_alphabet)}
+    table[' '] = ' '
+    return table
+
+def _sms_table(_key):
+    table = dict(SMS_KEYPAD)
+    table[' '] = ' '  # mellemrum beholdes
+    return table
+
+def _sms_reverse_table(_key):
+    return {seq: letter for letter, seq in SMS_KEYPAD.items()}
+
+def _morse_reverse_table(_key):
+    return {v: k for k, v in MORSE_CODE_DICT.items()}
+
+def _morse_trie_table(_key):
+    # Træ over morsekoderne: {'.': {...}, '-': {...}, '': bogstav}
+    trie = {}
+    for letter, code in MORSE_CODE_DICT.items():
+        node = trie
+        for symbol in code:
+            node = node.setdefault(symbol, {})
+        node[''] = letter
+    return trie
+
+ROVER_VOKALER = 'AEIOUYÆØÅ'
+_ROVER_KONSONANT = r'[^\W\d_AEIOUYÆØÅaeiouyæøå]'  # bogstaver der ikke er vokaler
+_ROVER_VOKAL_SET = set(ROVER_VOKALER + ROVER_VOKALER.lower())
+
+class _RøversprogTabel(dict):
+    # Tabel til str.translate: konsonant -> konsonant + vokal + konsonant.
+    # Hvert tegn slås op første gang, det ses, så alle bogstaver (også fx é)
+    # behandles som før, uden at tabellen skal kende dem på forhånd
+    def __init__(self, vokal):
+        super().__init__()
+        self.vokal = vokal
+
+    def __missing__(self, code):
+        char = chr(code)
+        value = char + self.vokal + char.lower() if char.isalpha() and char not in _ROVER_VOKAL_SET else code
+        self[code] = value
+        return value
+
+def _roversprog_table(vokal):
+    return _RøversprogTabel(vokal)
+
+def _roversprog_regex(vokal):
+    # Konsonant, fyldvokal og samme konsonant igen (uanset store og små bogstaver)
+    return re.compile(f'({_ROVER_KONSONANT}){re.escape(vokal)}\\1', re.IGNORECASE)
+
+def _polybius_100p_table(_key):
+    return dict(_100p_square().pairs)
+
+def _100p_reverse_table(_key):
+    return dict(_100p_square().letters)
+
+def _100p_table(_key):
+    return dict(_100p_square().encode_table)
+
+_TABLE_BUILDERS = {
+    'rot_x': _rot_x_table,
+    'kodeord': _kodeord_table,
+    'alfa_nr': _alfa_nr_table,
+    'sms': _sms_table,
+    'sms_reverse': _sms_reverse_table,
+    'morse_reverse': _morse_reverse_table,
+    'morse_trie': _morse_trie_table,
+    'røversprog': _roversprog_table,
+    'røversprog_regex': _roversprog_regex,
+    'polybius_100p': _polybius_100p_table,
+    '100p_reverse': _100p_reverse_table,
+    '100p': _100p_table,
+}
+
+# Opslagstabellerne bygges først, når de bruges første gang, men kan stadig
+# hentes under deres gamle navne (fx koder.polybius_100p)
+_LAZY_TABLES = {
+    'REVERSE_MORSE_CODE_DICT': 'morse_reverse',
+    'polybius_100p': 'polybius_100p',
+    'reverse_polybius_100p': '100p_reverse',
+}
+
+def __getattr__(name):
+    if name in _LAZY_TABLES:
+        return codec_table(_LAZY_TABLES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@lru_cache(maxsize=256)
+def codec_table(cipher, key=None):
+    return _TABLE_BUILDERS[cipher](key)
+
+def join_tokens(text, table, default='?', sep=' '):
+    # Slå hvert tegn op i tabellen og saml resultatet i ét join
+    get = table.get
+    return sep.join([get(char, default) for char in text])
+
+def encode_to_morse(text):
+    encoded_words = []
+    for word in text.upper().split():
+        encoded_letters = []
+        for char in word:
+            if char in MORSE_CODE_DICT:
+                encoded_letters.append(MORSE_CODE_DICT[char])
+            else:
+                encoded_letters.append('?')
+        encoded_words.append('/'.join(encoded_letters))
+    return '//'.join(encoded_words)
+def decode_from_morse(morse_code):
+    reverse_morse = codec_table('morse_reverse')
+    decoded_words = []
+    words = morse_code.strip().split('//')
+    for word in words:
+        decoded_letters = []
+        letters = word.strip().split('/')
+        for letter in letters:
+            decoded_letters.append(reverse_morse.get(letter.strip(), '?'))
+        decoded_words.append(''.join(decoded_letters))
+    return ' '.join(decoded_words)
+
+def rot_x_encode(text, offset):
+    return text.upper().translate(codec_table('rot_x', offset % len(danish_alphabet)))
+def rot_x_decode(text, offset):
+    return text.upper().translate(codec_table('rot_x', -offset % len(danish_alphabet)))
+
+def alpha_num_encode(text):
+    return join_tokens(text.upper(), codec_table('alfa_nr'))
+def alpha_num_decode(code):
+    decoded = []
+    for token in code.strip().split():
+        if token.isdigit():
+            idx = int(token) - 1
+            if 0 <= idx < len(danish_alphabet):
+                decoded.append(danish_alphabet[idx])
+            else:
+                decoded.append('?')
+        else:
+            decoded.append('?')
+    return ''.join(decoded)
+
+def keyword_cipher_setup(keyword):
+    reduced_alphabet = [c for c in danish_alphabet if c != 'W']
+    keyword_unique = []
+    seen = set()
+    for char in keyword.upper():
+        if char in reduced_alphabet and char not in seen:
+            seen.add(char)
+            keyword_unique.append(char)
+    remaining_letters = [c for c in reduced_alphabet if c not in seen]
+    full_sequence = keyword_unique + remaining_letters
+
+    # Hvis ulige antal bogstaver, tilføj tom plads for at få lige rækker
+    if len(full_sequence) % 2 != 0:
+        full_sequence.append('')
+
+    mid = math.ceil(len(full_sequence) / 2)  # øverste række får evt. ét bogstav ekstra
+    top_row = full_sequence[:mid]
+    bottom_row = full_sequence[mid:]
+    return top_row, bottom_row
+
+def kodeordskode_encode(text, keyword):
+    # Bevar mellemrum og andre tegn som de er
+    return text.upper().translate(codec_table('kodeord', keyword.upper())).lower()
+def kodeordskode_decode(text, keyword):
+    # Kodning og afkodning er symmetrisk
+    # Kan derfor bruge samme funktion
+    # Brug uppercase for at finde bogstaverne, output med små bogstaver for læsbarhed
+    return kodeordskode_encode(text, keyword)
+
+def sms_encode(text):
+    text = text.upper()
+    # Erstat Æ Ø Å med AE OE AA
+    text = text.replace('Æ', 'AE').replace('Ø', 'OE').replace('Å', 'AA')
+    return join_tokens(text, codec_table('sms'))
+_SMS_ORDSKEL = re.compile(r'\s{2,}')  # sms_encode skriver mellemrum som tre
+
+def sms_decode(code):
+    # Afkoder SMS-kode - forenklet: antager mellemrum mellem bogstaver
+    return ''.join([_sms_word(word) for word in _SMS_ORDSKEL.split(code.strip())])
+def _sms_word(code):
+    decoded_text = _sms_letters(code.split())
+    if 'A' not in decoded_text and 'O' not in decoded_text:
+        return decoded_text
+    # AE OE AA bliver kun til Æ Ø Å, hvor ordlisten kender ordet sådan
+    from .t9 import æøå_fra_par
+    return æøå_fra_par(decoded_text)
+def _sms_letters(tokens):
+    # find bogstav der matcher tal og længde
+    reverse_keypad = codec_table('sms_reverse')
+    return ''.join([reverse_keypad.get(token[0] * len(token), '?') for token in tokens])
+
+def _100p_square(keyword=''):
+    # 100P er en Polybius-firkant med rækkerne POINT og kolonnerne 1-6
+    return polybius_square(tuple(danish_alphabet_2), tuple(rows_100p), tuple(cols_100p), keyword)
+
+def encode_100p(text, keyword='', samlet=False, vectorized=False):
+    return polybius_encode(text, _100p_square(keyword), samlet, vectorized)
+def decode_100p(code, keyword='', samlet=False, vectorized=False):
+    return polybius_decode(code, _100p_square(keyword), samlet, vectorized)
+
+def int_to_roman(num):
+    val = [
+        1000, 900, 500, 400,
+        100, 90, 50, 40,
+        10, 9, 5, 4,
+        1
+    ]
+    syms = [
+        "M", "CM", "D", "CD",
+        "C", "XC", "L", "XL",
+        "X", "IX", "V", "IV",
+        "I"
+    ]
+    roman_num = ''
+    i = 0
+    while num > 0:
+        for _ in range(num // val[i]):
+            roman_num += syms[i]
+            num -= val[i]
+        i += 1
+    return roman_num
+def roman_to_int(s):
+    roman_dict = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+    i = 0
+    num = 0
+    while i < len(s):
+        if i+1 < len(s) and roman_dict[s[i]] < roman_dict[s[i+1]]:
+            num += roman_dict[s[i+1]] - roman_dict[s[i]]
+            i += 2
+        else:
+            num += roman_dict[s[i]]
+            i += 1
+    return num
+
+def _rover_vokal(vokal):
+    if not isinstance(vokal, str) or len(vokal) != 1 or vokal.upper() not in ROVER_VOKALER:
+        raise ValueError(f"Fyldvokalen skal være én af {', '.join(ROVER_VOKALER)}.")
+    return vokal.lower()
+
+def encode_roversprog(text, vokal='o'):
+    # Efter hver konsonant indsættes vokalen og konsonanten igen; alt andet beholdes
+    return text.translate(codec_table('røversprog', _rover_vokal(vokal)))
+def decode_roversprog(text, vokal='o'):
+    # Med vokal=None eller '' findes fyldvokalen selv (se roversprog_vokal)
+    vokal = roversprog_vokal(text) if not vokal else _rover_vokal(vokal)
+    # split med én gruppe giver [tekst, konsonant, tekst, ...], så join er det
+    # samme som sub(r'\1'), bare uden at udfylde skabelonen for hvert mønster
+    return ''.join(codec_table('røversprog_regex', vokal).split(text))
+def _decode_roversprog_part(text, final, vokal='o'):
+    # Afkoder så langt som muligt og returnerer (resultat, antal brugte tegn).
+    # Uden final afkodes kun mønstre, der starter mindst to tegn før
+    # slutningen, så et c o c mønster aldrig bliver delt mellem to bidder
+    pattern = codec_table('røversprog_regex', _rover_vokal(vokal))
+    stop = len(text) if final else len(text) - 2
+    result = []
+    pos = 0
+    for match in pattern.finditer(text):
+        if match.start() >= stop:
+            break
+        result.append(text[pos:match.start()])
+        result.append(match.group(1))
+        pos = match.end()
+    used = max(pos, stop, 0)
+    result.append(text[pos:used])
+    return ''.join(result), used
+
+ROVER_UDSNIT = 20000  # tegn fra starten, som fyldvokalen findes ud fra
+
+def roversprog_vokal(text):
+    # Fyldvokalen med flest c?c-mønstre i starten af teksten; 'o' hvis ingen passer
+    text = text[:ROVER_UDSNIT]
+    counts = {vokal: len(codec_table('røversprog_regex', vokal).findall(text))
+              for vokal in ROVER_VOKALER.lower()}
+    best = max(counts, key=lambda vokal: (counts[vokal], vokal == 'o'))
+    return best if counts[best] else 'o'
+
+def vigenere_kode(text, nøgle, encode=True, alphabet=danish_alphabet_2):
+    return _vigenere_part(text.upper(), nøgle.upper(), encode, alphabet, 0)
+def _vigenere_part(text, nøgle, encode, alphabet, start):
+    # start er nøglens position for første tegn, så en lang tekst kan
+    # kodes i bidder uden at nøglen kommer ud af trit
+    positions = {char: idx for idx, char in enumerate(alphabet)}
+    n = len(nøgle)
+    nøgle_idx = [positions.get(k) for k in nøgle]
+    sign = 1 if encode else -1
+    result = []
+    for i, char in enumerate(text, start):
+        tekst_idx = positions.get(char)
+        if tekst_idx is None:
+            result.append(char)
+        else:
+            shift = nøgle_idx[i % n]
+            if shift is None:
+                raise ValueError(f"{nøgle[i % n]!r} findes ikke i alfabetet")
+            result.append(alphabet[(tekst_idx + sign * shift) % len(alphabet)])
+    return ''.join(result)
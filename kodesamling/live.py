@@ -0,0 +1,118 @@
+# Live-kodning: mens man skriver, kodes kun den del af teksten, der er
+# ændret siden sidst. LiveKode husker forrige input og output samt en række
+# sikre grænser (position i input, længde af output), hvor outputtet indtil
+# grænsen kun afhænger af inputtet før den. Ved en ny tekst findes det
+# fælles begyndelsesstykke, og der kodes videre fra den sidste grænse inden
+# for det. Hvor grænserne ligger afhænger af koden:
+#   Morse:     efter hvert ord (og mellemrummene efter det)
+#   Vigenère:  hvor som helst; nøglens position følger tegnets position
+#   Bifid:     efter hver hel periode (sektor) af bogstaver
+#   Bacon:     efter hver gruppe på 5 bogstaver (afkodning)
+import bisect
+import re
+
+from .bacon import bacon_code_decode
+from .bifid import _UDENFOR, _square_key, _square_tables, bifid_kode
+from .koder import MORSE_CODE_DICT, _vigenere_part, danish_alphabet_2
+
+_VIGENERE_BID = 256  # tegn mellem grænserne for Vigenère
+_ORD = re.compile(r'\s*(\S+)(\s*)')
+
+
+def _common_prefix(a, b):
+    # Længden af det fælles begyndelsesstykke; sammenligning af udsnit sker i C
+    hi = min(len(a), len(b))
+    if a[:hi] == b[:hi]:
+        return hi
+    lo = 0  # a[:lo] == b[:lo], a[:hi + 1] != b[:hi + 1]
+    hi -= 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class LiveKode:
+    # segments(text, start, out_len) giver (slut, outputstykke, grænse?) fra
+    # position start i text, hvor out_len er længden af outputtet indtil start
+    def __init__(self, segments):
+        self.segments = segments
+        self.text = ''
+        self.output = ''
+        self.grænser_ind = [0]
+        self.grænser_ud = [0]
+        self.kodet = 0  # tegn kodet ved sidste update, til statistik
+
+    def update(self, text):
+        prefix = _common_prefix(self.text, text)
+        k = bisect.bisect_right(self.grænser_ind, prefix) - 1
+        start, out_len = self.grænser_ind[k], self.grænser_ud[k]
+        del self.grænser_ind[k + 1:], self.grænser_ud[k + 1:]
+        pieces = [self.output[:out_len]]
+        for end, piece, grænse in self.segments(text, start, out_len):
+            pieces.append(piece)
+            out_len += len(piece)
+            if grænse:
+                self.grænser_ind.append(end)
+                self.grænser_ud.append(out_len)
+        self.text = text
+        self.output = ''.join(pieces)
+        self.kodet = len(text) - start
+        return self.output
+
+
+def _morse_segments(text, start, out_len):
+    # Ét stykke pr. ord; et ord uden mellemrum efter sig kan stadig vokse
+    get = MORSE_CODE_DICT.get
+    for match in _ORD.finditer(text, start):
+        piece = '/'.join([get(char, '?') for char in match[1].upper()])
+        yield match.end(), piece if out_len == 0 else '//' + piece, bool(match[2])
+        out_len = 1
+
+def live_morse():
+    return LiveKode(_morse_segments)
+
+def live_vigenere(nøgle, encode=True, alphabet=danish_alphabet_2):
+    nøgle = nøgle.upper()
+    def segments(text, start, out_len):
+        # Nøglens position er positionen i det store-bogstavs output, dvs. out_len
+        for pos in range(start, len(text), _VIGENERE_BID):
+            end = min(pos + _VIGENERE_BID, len(text))
+            piece = _vigenere_part(text[pos:end].upper(), nøgle, encode, alphabet, out_len)
+            out_len += len(piece)
+            yield end, piece, True
+    return LiveKode(segments)
+
+def _group_segments(size, letters, code):
+    # Stykker med et multiplum af size bogstaver; en ufærdig gruppe til
+    # sidst er ikke en grænse. letters(tegn) er antal bogstaver tegnet tæller
+    # som (ß bliver fx til SS)
+    def segments(text, start, out_len):
+        if not size:
+            yield len(text), code(text[start:]), False
+            return
+        count = 0
+        pos = start
+        for i, char in enumerate(text[start:], start):
+            count += letters(char)
+            if count >= size and count % size == 0:
+                yield i + 1, code(text[pos:i + 1]), True
+                count = 0
+                pos = i + 1
+        if pos < len(text):
+            yield len(text), code(text[pos:]), False
+    return segments
+
+def live_bifid(encode=True, period=5, square=None):
+    cells, size = _square_key(square)
+    rows, _ = _square_tables(cells, size)
+    def letters(char):
+        return sum(1 for o in map(ord, char.upper()) if o < 256 and rows[o] != _UDENFOR)
+    code = lambda part: bifid_kode(part, encode, period, square)
+    return LiveKode(_group_segments(period, letters, code))
+
+def live_bacon_decode():
+    return LiveKode(_group_segments(5, str.isalpha, bacon_code_decode))
@@ -0,0 +1,213 @@
+# Målinger af koderne og appen: antal kald, inputstørrelse, et histogram over
+# svartider og (valgfrit) højeste hukommelsesforbrug via tracemalloc. Alt
+# samles i hukommelsen under én lås, så et kald koster få mikrosekunder
+# ekstra. Summen kan vises i appen eller skrives jævnligt til en fil i
+# Prometheus-tekstformat (eller JSON, hvis filnavnet ender på .json), som
+# overvågningen kan læse lokalt.
+#
+# Miljøvariabler:
+#   KODESAMLING_MAALINGER=/sti/til/kodesamling.prom   skriv målinger til filen
+#   KODESAMLING_TRACEMALLOC=1                          mål også hukommelse
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Øvre grænser for histogrammets spande i sekunder (som Prometheus' standard)
+SPANDE = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INTERVAL = 15.0  # sekunder mellem skrivninger af målefilen
+
+_lås = threading.Lock()
+_målinger = {}
+_lokal = threading.local()  # dybde af indlejrede målinger i denne tråd
+
+
+class _Tæller:
+    __slots__ = ('kald', 'fejl', 'bytes', 'sekunder', 'spande', 'peak')
+
+    def __init__(self):
+        self.kald = 0
+        self.fejl = 0
+        self.bytes = 0
+        self.sekunder = 0.0
+        self.spande = [0] * (len(SPANDE) + 1)  # sidste spand er over alle grænser
+        self.peak = 0
+
+
+def registrer(navn, sekunder, størrelse=0, peak=0, fejl=False):
+    spand = 0
+    while spand < len(SPANDE) and sekunder > SPANDE[spand]:
+        spand += 1
+    with _lås:
+        måling = _målinger.get(navn)
+        if måling is None:
+            måling = _målinger[navn] = _Tæller()
+        måling.kald += 1
+        måling.fejl += fejl
+        måling.bytes += størrelse
+        måling.sekunder += sekunder
+        måling.spande[spand] += 1
+        måling.peak = max(måling.peak, peak)
+
+def _størrelse(value):
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+class Måling:
+    # with Måling('morse kod', len(tekst)): ...
+    # Med tracemalloc slået til måles hukommelsen kun for den yderste måling
+    # i tråden, da tracemalloc har én fælles top
+    def __init__(self, navn, størrelse=0):
+        self.navn = navn
+        self.størrelse = størrelse
+
+    def __enter__(self):
+        dybde = getattr(_lokal, 'dybde', 0)
+        _lokal.dybde = dybde + 1
+        self.hukommelse = dybde == 0 and tracemalloc.is_tracing()
+        if self.hukommelse:
+            tracemalloc.reset_peak()
+            self.før = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        sekunder = time.perf_counter() - self.start
+        _lokal.dybde -= 1
+        peak = 0
+        if self.hukommelse and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1] - self.før, 0)
+        registrer(self.navn, sekunder, self.størrelse, peak, exc_type is not None)
+
+def instrument(func, navn=None):
+    # Måler hvert kald af func; inputstørrelsen er længden af første argument
+    navn = navn or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Måling(navn, _størrelse(args[0]) if args else 0):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def tracemalloc_aktiv():
+    return tracemalloc.is_tracing()
+
+def set_tracemalloc(on):
+    if on and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not on and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def nulstil():
+    with _lås:
+        _målinger.clear()
+
+def _percentil(spande, kald, andel):
+    # Øvre grænse for spanden hvor andel af kaldene er nået (inf over sidste grænse)
+    grænse = andel * kald
+    total = 0
+    for i, count in enumerate(spande):
+        total += count
+        if total >= grænse:
+            return SPANDE[i] if i < len(SPANDE) else float('inf')
+    return float('inf')
+
+def oversigt():
+    # [{navn, kald, ...}] sorteret efter samlet tid, mest først
+    with _lås:
+        rows = [(navn, m.kald, m.fejl, m.bytes, m.sekunder, list(m.spande), m.peak)
+                for navn, m in _målinger.items()]
+    result = []
+    for navn, kald, fejl, størrelse, sekunder, spande, peak in rows:
+        result.append({
+            'navn': navn, 'kald': kald, 'fejl': fejl, 'bytes': størrelse,
+            'sekunder': sekunder, 'middel_ms': 1000 * sekunder / kald,
+            'p50_ms': 1000 * _percentil(spande, kald, 0.5),
+            'p95_ms': 1000 * _percentil(spande, kald, 0.95),
+            'peak_bytes': peak, 'spande': spande,
+        })
+    result.sort(key=lambda row: -row['sekunder'])
+    return result
+
+
+def _etiket(navn):
+    return navn.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+def prometheus_text():
+    lines = [
+        '# HELP kodesamling_sekunder Svartid pr. kald.',
+        '# TYPE kodesamling_sekunder histogram',
+    ]
+    rows = oversigt()
+    for row in rows:
+        navn = _etiket(row['navn'])
+        total = 0
+        for grænse, count in zip(SPANDE + ('+Inf',), row['spande']):
+            total += count
+            lines.append(f'kodesamling_sekunder_bucket{{kode="{navn}",le="{grænse}"}} {total}')
+        lines.append(f'kodesamling_sekunder_sum{{kode="{navn}"}} {row["sekunder"]:.6f}')
+        lines.append(f'kodesamling_sekunder_count{{kode="{navn}"}} {row["kald"]}')
+    for metric, key, hjælp, slags in (
+            ('kodesamling_input_bytes_total', 'bytes', 'Samlet inputstørrelse.', 'counter'),
+            ('kodesamling_fejl_total', 'fejl', 'Kald der endte med en undtagelse.', 'counter'),
+            ('kodesamling_peak_bytes', 'peak_bytes', 'Højeste ekstra hukommelse i ét kald (tracemalloc).', 'gauge')):
+        lines.append(f'# HELP {metric} {hjælp}')
+        lines.append(f'# TYPE {metric} {slags}')
+        lines.extend(f'{metric}{{kode="{_etiket(row["navn"])}"}} {row[key]}' for row in rows)
+    return '\n'.join(lines) + '\n'
+
+def json_text():
+    return json.dumps({'tidspunkt': time.time(), 'spande': SPANDE, 'koder': oversigt()},
+                      ensure_ascii=False)
+
+def skriv(path):
+    data = json_text() if path.endswith('.json') else prometheus_text()
+    # Unikt midlertidigt navn i samme mappe; os.replace gør, at en læser
+    # aldrig ser en halv fil
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp',
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as out:
+            out.write(data)
+        os.chmod(tmp, 0o644)  # mkstemp giver 0600; fx node_exporter skal kunne læse filen
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+_skriver = None
+
+def start_skriver(path, interval=INTERVAL):
+    # Skriver målefilen hvert interval sekunder fra en baggrundstråd; kun én
+    # tråd pr. proces, også når Streamlit kører scriptet forfra
+    global _skriver
+    with _lås:
+        if _skriver is not None:
+            return
+        _skriver = threading.Thread(target=_skriv_jævnligt, args=(path, interval),
+                                    name='kodesamling-maalinger', daemon=True)
+    _skriver.start()
+
+def _skriv_jævnligt(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            skriv(path)
+        except OSError:
+            pass  # fx en mappe der er forsvundet; prøv igen næste gang
+
+def fra_miljø():
+    # Slår tracemalloc og målefilen til ud fra miljøvariablerne
+    if os.environ.get('KODESAMLING_TRACEMALLOC') == '1':
+        set_tracemalloc(True)
+    path = os.environ.get('KODESAMLING_MAALINGER')
+    if path:
+        start_skriver(path)
@@ -0,0 +1,333 @@
+# Morsekode fra lyd: en WAV-fil (fx en optaget fløjte) læses i blokke af fast
+# størrelse. NumPy finder tonens frekvens og beregner lydstyrken omkring den
+# i vinduer af 5 ms (så støj ved andre frekvenser ikke tæller med), og en
+# tærskel der følger støjniveau og signalstyrke afgør, hvornår der er tone.
+# Længderne af tone og pause sorteres i prik/streg og pauser mellem tegn,
+# bogstaver og ord ud fra en løbende vurdering af længden af én prik, og
+# morsetegnene slås op i REVERSE_MORSE_CODE_DICT via decode_from_morse.
+# Kun den seneste blok og et par sekunders lydstyrke holdes i hukommelsen,
+# uanset optagelsens længde.
+#
+# Den anden vej laves morsekode om til en WAV-fil (se nederst).
+import math
+import os
+import struct
+import sys
+import wave
+from array import array
+from functools import lru_cache
+
+from .koder import decode_from_morse
+from .npkompat import numpy_or_none
+
+BLOK = 1 << 16          # samples pr. blok
+VINDUE_SEK = 0.005      # længde af ét lydstyrke-vindue
+HISTORIK = 600          # vinduer (3 s) der bruges til at finde støjniveauet
+TOP_HALVERING_SEK = 5.0 # hvor hurtigt signalstyrken glemmes i lange pauser
+MIN_SNR = 2.0           # tone skal være så mange gange kraftigere end støjen
+TONE_SPIDS = 4.0        # tonens frekvens skal være så mange gange kraftigere end de andre
+OPSTART = 8             # antal toner før prikkens længde gættes
+
+FEJL_NUMPY = "Afkodning af lyd kræver NumPy."
+
+
+def _samples(raw, sampwidth, channels):
+    # Rå PCM-bytes -> mono float32
+    np = numpy_or_none()
+    if sampwidth == 1:
+        data = np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128
+    elif sampwidth == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        data = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32)
+    else:
+        data = np.frombuffer(raw, dtype={2: '<i2', 4: '<i4'}[sampwidth]).astype(np.float32)
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1)
+    return data
+
+
+class _Timing:
+    # Sorterer tone- og pauselængder (i vinduer) ud fra den anslåede prik-længde.
+    # Prik = 1, streg = 3, pause i bogstav = 1, mellem bogstaver = 3, mellem ord = 7.
+    # Pausen mellem bogstaver følges for sig, så Farnsworth-tempo (længere
+    # pauser mellem bogstaver og ord end tegnene selv) også kan læses
+    ALPHA = 0.15
+
+    def __init__(self):
+        self.unit = None
+        self.letter_gap = None
+        self.pending = []   # (tone?, længde) indtil prikkens længde er gættet
+        self.letter = ''
+        self.sep = ''       # separator der skrives før næste bogstav
+        self.started = False
+
+    def add(self, tone, length):
+        if self.unit is None:
+            if not self.started and not tone:
+                return ''  # stilhed før første tone
+            self.started = True
+            self.pending.append((tone, length))
+            if sum(t for t, _ in self.pending) < OPSTART:
+                return ''
+            return self._start()
+        return self._classify(tone, length)
+
+    def _start(self):
+        # Første gæt: den nedre kvartil af alle længder, da prikker og pauser
+        # inde i bogstaver er de hyppigste og korteste. Pausen mellem bogstaver
+        # er den korteste af de lange pauser (mindst 3 prikker)
+        lengths = sorted(length for _, length in self.pending)
+        self.unit = max(lengths[len(lengths) // 4], 1)
+        gaps = [length for tone, length in self.pending if not tone and length >= 2 * self.unit]
+        self.letter_gap = max(min(gaps, default=0), 3 * self.unit)
+        pending, self.pending = self.pending, []
+        return ''.join(self._classify(tone, length) for tone, length in pending)
+
+    def _classify(self, tone, length):
+        unit = self.unit
+        if tone:
+            if length < 2 * unit:
+                self.letter += '.'
+                self.unit += self.ALPHA * (length - unit)
+            else:
+                self.letter += '-'
+                self.unit += self.ALPHA * (length / 3 - unit)
+            return ''
+        if length < 2 * unit:
+            self.unit += self.ALPHA * (length - unit)
+            return ''
+        # Grænsen mellem bogstav- og ordpause ligger midt mellem 3 og 7
+        if length < self.letter_gap * 5 / 3:
+            self.letter_gap += self.ALPHA * (length - self.letter_gap)
+            return self._end_letter('/')
+        # Lange pauser (optageren holdt pause) siger intet om tempoet
+        if length < self.letter_gap * 4:
+            self.letter_gap += self.ALPHA * (length * 3 / 7 - self.letter_gap)
+            self.letter_gap = max(self.letter_gap, 2 * self.unit)
+        return self._end_letter('//')
+
+    def _end_letter(self, sep):
+        if not self.letter:
+            return ''
+        out = self.sep + self.letter
+        self.letter = ''
+        self.sep = sep
+        return out
+
+    def finish(self):
+        out = self._start() if self.unit is None and self.pending else ''
+        return out + self._end_letter('')
+
+
+def morse_wav_stream(fil, block=BLOK, stats=None):
+    # Giver morsekoden i samme format som encode_to_morse ('/' mellem bogstaver,
+    # '//' mellem ord) bid for bid. fil er et filnavn eller en binær fil.
+    # stats (dict) får 'prik_ms' og 'sekunder' undervejs.
+    np = numpy_or_none()
+    if np is None:
+        raise ValueError(FEJL_NUMPY)
+    try:
+        wav = wave.open(fil, 'rb')
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Kan ikke læse WAV-filen: {e}") from e
+    with wav:
+        channels, sampwidth, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        frame = max(int(rate * VINDUE_SEK), 1)
+        decay = 0.5 ** (block / rate / TOP_HALVERING_SEK)
+        timing = _Timing()
+        rest = np.zeros(0, dtype=np.float32)
+        history = np.zeros(0, dtype=np.float32)
+        spectrum = 0.0
+        peak = 0.0
+        tone = False
+        run = 0
+        seconds = 0.0
+        while True:
+            raw = wav.readframes(block)
+            if not raw:
+                break
+            samples = np.concatenate([rest, _samples(raw, sampwidth, channels)])
+            seconds += (len(raw) // (sampwidth * channels)) / rate
+            n = len(samples) // frame
+            rest = samples[n * frame:]
+            if n == 0:
+                continue
+            # Lydstyrke pr. vindue omkring tonens frekvens: den kraftigste
+            # frekvens i de seneste blokke (fløjter kan drive lidt)
+            power = np.abs(np.fft.rfft(samples[:n * frame].reshape(n, frame), axis=1)) ** 2
+            spectrum = power.sum(axis=0) + 0.5 * spectrum
+            top = int(np.argmax(spectrum[1:])) + 1
+            level = np.sqrt(power[:, max(top - 1, 1):top + 2].sum(axis=1))
+
+            # Støjniveau fra de seneste sekunder; signalstyrken glemmes langsomt,
+            # så lange pauser ikke får tærsklen til at falde ned i støjen
+            history = np.concatenate([history, level])[-HISTORIK:]
+            noise = float(np.percentile(history, 20))
+            peak = max(float(level.max()), peak * decay)
+            # En tone ses som én frekvens der rager op over resten af spektret;
+            # ren støj er nogenlunde flad
+            tonal = spectrum[top] > TONE_SPIDS * np.median(spectrum[1:])
+            if tonal and peak > MIN_SNR * noise:
+                # Hysterese: tone starter over 'on' og slutter under 'off'
+                on = noise + 0.45 * (peak - noise)
+                off = noise + 0.25 * (peak - noise)
+                state = np.where(level > on, 1, np.where(level < off, 0, -1))
+            else:
+                state = np.zeros(n, dtype=np.int64)
+            # Udfyld vinduer mellem tærsklerne med den foregående tilstand
+            state = np.concatenate([[int(tone)], state])
+            known = np.where(state >= 0, np.arange(n + 1), 0)
+            state = state[np.maximum.accumulate(known)][1:].astype(bool)
+
+            # Længder af tone og pause; den sidste fortsætter i næste blok
+            changes = np.flatnonzero(state[1:] != state[:-1]) + 1
+            starts = np.concatenate([[0], changes])
+            lengths = np.diff(np.concatenate([starts, [n]]))
+            if state[0] != tone:
+                out = [timing.add(tone, run)] if run else []
+                run = 0
+            else:
+                out = []
+            run += int(lengths[0])
+            for start, length in zip(starts[1:].tolist(), lengths[1:].tolist()):
+                out.append(timing.add(bool(state[start - 1]), run))
+                run = length
+            tone = bool(state[-1])
+            if stats is not None:
+                stats['sekunder'] = seconds
+                if timing.unit:
+                    stats['prik_ms'] = timing.unit * frame / rate * 1000
+            out = ''.join(out)
+            if out:
+                yield out
+        if run and tone:
+            out = timing.add(tone, run)
+            if out:
+                yield out
+        out = timing.finish()
+        if stats is not None and timing.unit:
+            stats['prik_ms'] = timing.unit * frame / rate * 1000
+        if out:
+            yield out
+
+
+def decode_morse_wav(fil, block=BLOK, stats=None):
+    # (morsekode, tekst)
+    morse = ''.join(morse_wav_stream(fil, block, stats))
+    return morse, decode_from_morse(morse) if morse else ''
+
+
+# Morsekode som lyd: én tonebuffer pr. symbol (prik, streg og hver slags
+# pause) syntetiseres én gang, og lyden bygges ved at sætte de færdige
+# buffere sammen. WAV-filen gives i bidder, så den aldrig ligger samlet i
+# hukommelsen.
+LYD_RATE = 8000       # samples pr. sekund
+LYD_TONE = 700        # Hz
+LYD_RAMPE_SEK = 0.005 # blød start og slutning på hver tone, så den ikke klikker
+
+
+def morse_timing(wpm=20, farnsworth=None):
+    # (prik, pause mellem bogstaver, pause mellem ord) i sekunder. Med
+    # Farnsworth sendes tegnene med wpm, men pauserne strækkes, så den
+    # samlede fart bliver farnsworth ord pr. minut (ARRL's formel)
+    unit = 1.2 / wpm
+    if not farnsworth or farnsworth >= wpm:
+        return unit, 3 * unit, 7 * unit
+    delay = (60 * wpm - 37.2 * farnsworth) / (farnsworth * wpm)
+    return unit, 3 * delay / 19, 7 * delay / 19
+
+@lru_cache(maxsize=16)
+def _symbol_buffers(wpm, farnsworth, tone, rate):
+    # 16-bit PCM for prik, streg og de tre slags pauser
+    unit, letter_gap, word_gap = morse_timing(wpm, farnsworth)
+    return {
+        '.': _tone(round(unit * rate), tone, rate),
+        '-': _tone(round(3 * unit * rate), tone, rate),
+        'tegn': bytes(2 * round(unit * rate)),
+        'bogstav': bytes(2 * round(letter_gap * rate)),
+        'ord': bytes(2 * round(word_gap * rate)),
+    }
+
+def _tone(n, tone, rate):
+    ramp = min(int(LYD_RAMPE_SEK * rate), n // 2)
+    np = numpy_or_none()
+    if np is not None:
+        signal = np.sin(2 * np.pi * tone / rate * np.arange(n))
+        if ramp:
+            edge = 0.5 - 0.5 * np.cos(np.pi * np.arange(ramp) / ramp)
+            signal[:ramp] *= edge
+            signal[n - ramp:] *= edge[::-1]
+        return (signal * 0.8 * 32767).astype('<i2').tobytes()
+    # Uden NumPy: samme tone med math, kun én gang pr. symbol
+    samples = array('h', [0]) * n
+    for i in range(n):
+        edge = 1.0
+        if i < ramp:
+            edge = 0.5 - 0.5 * math.cos(math.pi * i / ramp)
+        elif i >= n - ramp:
+            edge = 0.5 - 0.5 * math.cos(math.pi * (n - 1 - i) / ramp)
+        samples[i] = int(math.sin(2 * math.pi * tone / rate * i) * edge * 0.8 * 32767)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+@lru_cache(maxsize=256)
+def _letter_buffer(code, wpm, farnsworth, tone, rate):
+    # Et helt bogstav, fx '.-', sat sammen af symbolbufferne
+    buffers = _symbol_buffers(wpm, farnsworth, tone, rate)
+    return buffers['tegn'].join([buffers[s] for s in code if s in '.-'])
+
+def _morse_words(morse):
+    # Samme opdeling som decode_from_morse; tomme og ukendte bogstaver ('?') springes over
+    words = [[letter.strip() for letter in word.strip().split('/')] for word in morse.strip().split('//')]
+    return [[letter for letter in word if letter and not letter.strip('.-')] for word in words]
+
+def _wav_header(data_bytes, rate):
+    return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_bytes, b'WAVE', b'fmt ', 16,
+                       1, 1, rate, 2 * rate, 2, 16, b'data', data_bytes)
+
+def morse_wav_chunks(morse, wpm=20, farnsworth=None, tone=LYD_TONE, rate=LYD_RATE, chunk=1 << 16):
+    # Giver en hel WAV-fil (16 bit mono) i bidder af ca. chunk bytes. morse er
+    # i samme format som encode_to_morse giver ('/' mellem bogstaver, '//' mellem ord)
+    words = [word for word in _morse_words(morse) if word]
+    buffers = _symbol_buffers(wpm, farnsworth, tone, rate)
+    letter = lambda code: _letter_buffer(code, wpm, farnsworth, tone, rate)
+
+    # Længden skal stå i headeren, så den regnes ud først
+    size = sum(len(letter(code)) for word in words for code in word)
+    size += len(buffers['bogstav']) * sum(len(word) - 1 for word in words)
+    size += len(buffers['ord']) * max(len(words) - 1, 0)
+    yield _wav_header(size, rate)
+
+    parts = []
+    length = 0
+    for i, word in enumerate(words):
+        for j, code in enumerate(word):
+            if j:
+                parts.append(buffers['bogstav'])
+            parts.append(letter(code))
+            length += len(parts[-1])
+            if length >= chunk:
+                yield b''.join(parts)
+                parts = []
+                length = 0
+        if i < len(words) - 1:
+            parts.append(buffers['ord'])
+            length += len(buffers['ord'])
+    if parts:
+        yield b''.join(parts)
+
+def morse_wav_seconds(morse, wpm=20, farnsworth=None, rate=LYD_RATE):
+    header = next(morse_wav_chunks(morse, wpm, farnsworth, rate=rate))
+    return struct.unpack('<I', header[40:44])[0] / (2 * rate)
+
+def write_morse_wav(morse, fil, wpm=20, farnsworth=None, tone=LYD_TONE, rate=LYD_RATE):
+    # fil er et filnavn eller en binær fil
+    chunks = morse_wav_chunks(morse, wpm, farnsworth, tone, rate)
+    if isinstance(fil, (str, os.PathLike)):
+        with open(fil, 'wb') as out:
+            for data in chunks:
+                out.write(data)
+    else:
+        for data in chunks:
+            fil.write(data)
@@ -0,0 +1,132 @@
+# Afkodning af morsekode, hvor skilletegnene mangler helt eller delvist, fx
+# en afskrift som "......-...-" i stedet for "...././.---". Prikker og streger
+# kan deles i bogstaver på rigtig mange måder, så opdelingen findes med
+# Viterbi-søgning: træet over morsekoderne (codec_table('morse_trie')) giver
+# de bogstaver, der kan starte ved hver position, og bogstavmodellen i
+# kodesamling.statistik giver prisen i bits for hvert bogstav efter de
+# foregående. For hver position beholdes kun de STRÅLE billigste hypoteser
+# (højst top pr. sammenhæng), så arbejdet vokser lineært med længden.
+#
+# Skilletegn, der er med, overholdes: '/' eller mellemrum mellem bogstaver
+# og '//' mellem ord. En gruppe mellem to skilletegn, som er en gyldig kode,
+# læses som det ene tegn; kun grupper uden gyldig kode deles op. Er der
+# ingen skilletegn i input, indsætter søgningen selv mellemrum, hvor
+# modellen finder det sandsynligt.
+import re
+
+from .koder import codec_table
+from .statistik import bogstav_model
+
+STRÅLE = 24         # hypoteser der beholdes pr. position
+TOP = 5             # antal læsninger der returneres
+CIFFER_BITS = 10.0  # pris for et tal, som bogstavmodellen ikke kender (som et sjældent bogstav)
+
+_ANDRE_TEGN = str.maketrans({'·': '.', '•': '.', '_': '-', '−': '-', '–': '-', '|': '/'})
+
+
+def _symbols(code):
+    # Kun '.', '-', '/' (bogstavgrænse) og ' ' (ordgrænse)
+    code = re.sub(r'[^.\-/\s]', '', code.translate(_ANDRE_TEGN))
+    code = re.sub(r'\s*/{2,}\s*', '\0', code)
+    code = re.sub(r'[\s/]+', '/', code)
+    return code.replace('\0', ' ').strip(' /')
+
+def _best(hyps, beam, top):
+    # De beam billigste hypoteser, højst top med samme sammenhæng
+    hyps.sort(key=lambda h: h[0])
+    best = []
+    per_context = {}
+    for hyp in hyps:
+        count = per_context.get(hyp[1], 0)
+        if count < top:
+            per_context[hyp[1]] = count + 1
+            best.append(hyp)
+            if len(best) == beam:
+                break
+    return best
+
+def _whole_groups(symbols, trie):
+    # {start: slut} for grupper mellem skilletegn, der er en gyldig kode
+    whole = {}
+    start = 0
+    for end in range(len(symbols) + 1):
+        if end == len(symbols) or symbols[end] in '/ ':
+            branch = trie
+            for symbol in symbols[start:end]:
+                branch = branch.get(symbol)
+                if branch is None:
+                    break
+            if end > start and branch is not None and '' in branch:
+                whole[start] = end
+            start = end + 1
+    return whole
+
+def _text(node):
+    letters = []
+    while node is not None:
+        letters.append(node[0])
+        node = node[1]
+    return ''.join(reversed(letters))
+
+
+def morse_readings(code, top=TOP, beam=STRÅLE, model=None):
+    # [(bits, tekst)] med den mest sandsynlige læsning først
+    model = model or bogstav_model()
+    trie = codec_table('morse_trie')
+    symbols = _symbols(code)
+    n = len(symbols)
+    if n == 0:
+        return []
+    keep = model.order - 1
+    # Mellemrum indsættes kun, når der slet ingen skilletegn er
+    insert_spaces = '/' not in symbols and ' ' not in symbols
+    whole = _whole_groups(symbols, trie)
+    bits_for = model.bits
+    # positions[i]: [(bits, sammenhæng, node)], hvor node = (tegn, forrige node)
+    positions = [[] for _ in range(n + 1)]
+    positions[0].append((0.0, model.start, None))
+    for i in range(n):
+        hyps = _best(positions[i], beam, top)
+        positions[i] = None
+        symbol = symbols[i]
+        if symbol == '/':
+            positions[i + 1].extend(hyps)
+            continue
+        if symbol == ' ':
+            positions[i + 1].extend(((cost + bits_for(context, ' '), (context + ' ')[-keep:], (' ', node))
+                                     for cost, context, node in hyps))
+            continue
+        # En gruppe med en gyldig kode læses kun som det tegn
+        stop = whole.get(i)
+        for cost, context, node in hyps:
+            starts = [(context, cost, node)]
+            if insert_spaces and node is not None and node[0] != ' ':
+                starts.append(((context + ' ')[-keep:], cost + bits_for(context, ' '), (' ', node)))
+            branch = trie
+            j = i
+            while j < n and symbols[j] in '.-':
+                branch = branch.get(symbols[j])
+                if branch is None:
+                    break
+                j += 1
+                letter = branch.get('')
+                if letter is None or stop is not None and j != stop:
+                    continue
+                target = positions[j]
+                for start_context, start_cost, start_node in starts:
+                    bits = CIFFER_BITS if letter.isdigit() else bits_for(start_context, letter)
+                    target.append((start_cost + bits, (start_context + letter)[-keep:], (letter, start_node)))
+    final = [(cost + bits_for(context, ' '), _text(node))
+             for cost, context, node in _best(positions[n], beam, top)]
+    final.sort()
+    readings = []
+    for bits, text in final:
+        if text not in (t for _, t in readings):
+            readings.append((bits, text))
+        if len(readings) == top:
+            break
+    return readings
+
+def decode_morse_unsegmented(code):
+    readings = morse_readings(code, top=1)
+    return readings[0][1] if readings else ''
@@ -0,0 +1,325 @@
+# N-gram-model over danske bogstaver til at vurdere, hvor dansk en tekst er:
+# prisen i bits for hvert bogstav givet de tre foregående (firebogstavsstykker)
+# med tre-, to- og enkeltbogstaver under, vægtet ind efter Witten-Bell som i
+# statistik.BogstavModel. Kun bogstaverne i danish_alphabet_2 tæller;
+# mellemrum og tegnsætning springes over, så tekster uden mellemrum (fx
+# afkodede kolonner i en knækker) vurderes på samme måde som almindelig tekst.
+#
+# Modellen gemmes som tætte float32-tabeller (29**n værdier for hver orden,
+# i alt ca. 2,9 MB) efter et hoved på 4096 bytes, og åbnes med np.memmap. Så
+# koster det næsten intet at indlæse den, og alle Streamlit-processer på
+# samme maskine deler de samme sider i styresystemets cache. Tekster
+# vurderes mange ad gangen: bogstaverne samles i ét array, og koderne for
+# alle stykker slås op i tabellerne i én operation.
+#
+# Standardmodellen bygges første gang fra ordlisten i kodesamling.t9 og
+# gemmes i brugerens cachemappe (se kodesamling.cache). En større model kan bygges
+# fra et lokalt korpus og bruges i stedet via KODESAMLING_NGRAM:
+#   python -m kodesamling.ngram korpus/*.txt -o dansk.ngram
+#   KODESAMLING_NGRAM=dansk.ngram streamlit run streamlit_app.py
+# Modellen kræver NumPy; uden NumPy bruger analyserne statistik.danish_bits.
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+
+from .cache import cache_sti, opret_cache_mappe
+from .koder import danish_alphabet_2
+from .npkompat import numpy_or_none
+from .vektor import _to_indices
+
+ORDEN = 4
+ENDELSE = '.ngram'
+HOVED = 4096          # bytes; tabellerne starter på en sidegrænse
+BATCH = 4 << 20       # tegn der tælles ad gangen, når en model bygges
+_VERSION = 1
+_MAGI = 'kodesamling-ngram'
+
+
+def _letters(texts, alphabet):
+    # Alle teksters bogstaver som indeks i alfabetet (int64) og antallet pr. tekst
+    np = numpy_or_none()
+    texts = [text.upper() for text in texts]
+    if not texts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    _, indices, mask = _to_indices('\x00'.join(texts), tuple(alphabet))
+    # Tekst nr. for hvert tegn; skilletegnet hører til teksten før
+    owner = np.repeat(np.arange(len(texts)), [len(text) + 1 for text in texts])[:-1]
+    lengths = np.bincount(owner[mask], minlength=len(texts))
+    return indices[mask].astype(np.int64), lengths
+
+def _codes(letters, n, m):
+    # Koden for hvert stykke på n bogstaver, der slutter ved position n-1, n, ...
+    code = letters[:len(letters) - n + 1].copy()
+    for j in range(1, n):
+        code *= m
+        code += letters[j:len(letters) - n + 1 + j]
+    return code
+
+def _position_in_text(lengths):
+    # Hvert bogstavs plads i sin egen tekst
+    np = numpy_or_none()
+    starts = np.cumsum(lengths) - lengths
+    return np.arange(int(lengths.sum())) - np.repeat(starts, lengths)
+
+
+def count_ngrams(pieces, order=ORDEN, alphabet=danish_alphabet_2):
+    # pieces: iterable af (tekst, vægt). Returnerer [antal for 1-, 2-, ...
+    # order-bogstavsstykker] som float64-arrays med m**n pladser; stykkerne går
+    # ikke på tværs af to tekster
+    np = numpy_or_none()
+    m = len(alphabet)
+    counts = [np.zeros(m ** n) for n in range(1, order + 1)]
+
+    def add(batch):
+        letters, lengths = _letters([text for text, _ in batch], alphabet)
+        weights = np.repeat(np.array([weight for _, weight in batch], dtype=float), lengths)
+        position = _position_in_text(lengths)
+        for n in range(1, min(order, len(letters)) + 1):
+            whole = position[n - 1:] >= n - 1  # stykket ligger i én tekst
+            counts[n - 1] += np.bincount(_codes(letters, n, m)[whole], weights=weights[n - 1:][whole],
+                                         minlength=m ** n)
+
+    batch = []
+    size = 0
+    for text, weight in pieces:
+        batch.append((text, weight))
+        size += len(text)
+        if size >= BATCH:
+            add(batch)
+            batch = []
+            size = 0
+    if batch:
+        add(batch)
+    return counts
+
+def ngram_bits(counts):
+    # Witten-Bell: p(x | sammenhæng) = λ·antal/total + (1-λ)·p(x | kortere
+    # sammenhæng), hvor λ = total / (total + antal forskellige efterfølgere).
+    # Enkeltbogstaverne får +1, så intet bogstav er umuligt. Returnerer
+    # -log2 p som float32 for hver orden
+    np = numpy_or_none()
+    m = len(counts[0])
+    probabilities = (counts[0] + 1) / (counts[0].sum() + m)
+    tables = [probabilities]
+    for n in range(2, len(counts) + 1):
+        grid = counts[n - 1].reshape(m ** (n - 1), m)
+        total = grid.sum(axis=1)
+        types = (grid > 0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, total / (total + types), 0.0)
+            seen = np.where(total[:, None] > 0, grid / total[:, None], 0.0)
+        # Den kortere sammenhæng er de sidste n-2 bogstaver
+        lower = tables[-1].reshape(m ** (n - 2), m)[np.arange(m ** (n - 1)) % m ** (n - 2)]
+        tables.append((weight[:, None] * seen + (1 - weight[:, None]) * lower).ravel())
+    return [(-np.log2(p)).astype(np.float32) for p in tables]
+
+
+def write_model(path, tables, alphabet=danish_alphabet_2, kilde=None):
+    # Hovedet er en JSON-linje fyldt op med mellemrum til HOVED bytes
+    np = numpy_or_none()
+    offsets = []
+    offset = HOVED
+    for table in tables:
+        offsets.append(offset)
+        offset += table.size * 4
+    header = {'magi': _MAGI, 'version': _VERSION, 'alfabet': ''.join(alphabet), 'orden': len(tables),
+              'dtype': '<f4', 'offsets': offsets, 'kilde': kilde}
+    data = json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n'
+    if len(data) > HOVED:
+        raise ValueError("N-gram-modellens hoved er for langt.")
+    # Et unikt midlertidigt navn i samme mappe, så to processer der skriver
+    # samtidig ikke deler fil, og os.replace ikke skal flytte på tværs af diske
+    path = os.fspath(path)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data.ljust(HOVED, b' '))
+            for table in tables:
+                out.write(np.ascontiguousarray(table, dtype='<f4').tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def _read_header(path):
+    try:
+        with open(path, 'rb') as fil:
+            header = json.loads(fil.read(HOVED))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get('magi') != _MAGI or header.get('version') != _VERSION:
+        return None
+    return header
+
+def _header_problem(header, size):
+    # Hvad der er galt med hovedet i forhold til en fil på size bytes, eller None
+    alfabet, orden, offsets = header.get('alfabet'), header.get('orden'), header.get('offsets')
+    if not isinstance(alfabet, str) or not alfabet or len(set(alfabet)) != len(alfabet):
+        return "alfabetet mangler"
+    if not isinstance(orden, int) or isinstance(orden, bool) or orden < 1 or header.get('dtype') != '<f4':
+        return "orden eller dtype er forkert"
+    if not isinstance(offsets, list) or len(offsets) != orden:
+        return "tabellernes placering mangler"
+    offset = HOVED
+    for n, found in enumerate(offsets, 1):
+        if found != offset:
+            return f"tabel {n} står ikke, hvor den skal"
+        offset += len(alfabet) ** n * 4
+    if size != offset:
+        return f"filen er {size} bytes, ikke {offset}"
+    return None
+
+def load_model(path):
+    # Modellen fra en fil, åbnet med np.memmap (kun de sider der bruges, læses).
+    # Hovedet kontrolleres mod filens længde, så en afbrudt eller beskadiget
+    # fil giver ValueError i stedet for forkerte tal
+    np = numpy_or_none()
+    header = _read_header(path)
+    if header is None:
+        raise ValueError(f"{os.fspath(path)!r} er ikke en n-gram-model.")
+    problem = _header_problem(header, os.path.getsize(path))
+    if problem:
+        raise ValueError(f"{os.fspath(path)!r} er beskadiget: {problem}.")
+    m = len(header['alfabet'])
+    tables = [np.memmap(path, dtype=header['dtype'], mode='r', offset=offset, shape=(m ** n,))
+              for n, offset in enumerate(header['offsets'], 1)]
+    return NgramModel(tables, list(header['alfabet']))
+
+
+class NgramModel:
+    def __init__(self, tables, alphabet=danish_alphabet_2):
+        # tables: -log2 p for 1-, 2-, ... bogstavsstykker, som ngram_bits giver dem
+        self.tables = tables
+        self.alphabet = list(alphabet)
+        self.order = len(tables)
+
+    def text_bits(self, texts):
+        # (bits i alt, antal bogstaver) for hver tekst som arrays. Hvert
+        # bogstav koster -log2 p(bogstav | op til order-1 foregående)
+        np = numpy_or_none()
+        m = len(self.alphabet)
+        letters, lengths = _letters(texts, self.alphabet)
+        bits = np.zeros(len(letters), dtype=np.float64)
+        if len(letters):
+            position = _position_in_text(lengths)
+            for n in range(1, min(self.order, len(letters)) + 1):
+                # Bogstaver med n-1 foregående i samme tekst; kun de første får
+                # en kortere sammenhæng
+                used = position[n - 1:] == n - 1 if n < self.order else position[n - 1:] >= n - 1
+                where = np.flatnonzero(used)
+                bits[where + n - 1] = self.tables[n - 1][_codes(letters, n, m)[where]]
+        totals = np.zeros(len(lengths))
+        nonempty = lengths > 0
+        starts = (np.cumsum(lengths) - lengths)[nonempty]
+        if len(starts):
+            totals[nonempty] = np.add.reduceat(bits, starts)
+        return totals, lengths
+
+    def score_many(self, texts):
+        # Bits pr. bogstav for hver tekst (lavere = mere dansk; inf uden bogstaver)
+        np = numpy_or_none()
+        totals, lengths = self.text_bits(texts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(lengths > 0, totals / np.maximum(lengths, 1), np.inf)
+
+    def score(self, text):
+        return float(self.score_many([text])[0])
+
+
+def _kilde(path):
+    stat = os.stat(path)
+    return {'sti': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def wordlist_model():
+    # Model fra ordlisten i kodesamling.t9 med ordenes hyppighed som vægt;
+    # gemmes i cachemappen og bygges kun igen, når ordlisten ændres
+    from .t9 import ORDLISTE, read_wordlist
+    path = wordlist_model_path()
+    kilde = _kilde(ORDLISTE)
+    header = _read_header(path)
+    if header is not None and header.get('kilde') == kilde and header.get('alfabet') == ''.join(danish_alphabet_2):
+        try:
+            return load_model(path)
+        except (OSError, ValueError):
+            pass  # beskadiget eller forsvundet siden; så bygges den igen
+    with open(ORDLISTE, encoding='utf-8') as fil:
+        counts = read_wordlist(fil)
+    # Vægtene skaleres, så de i alt svarer til ét eksemplar af hvert ord;
+    # ellers ville Witten-Bell tro, at hvert stykke var set utroligt mange
+    # gange, og næsten ikke bruge de kortere sammenhænge
+    scale = len(counts) / sum(counts.values())
+    tables = ngram_bits(count_ngrams((word, count * scale) for word, count in counts.items()))
+    try:
+        opret_cache_mappe(path)
+        write_model(path, tables, kilde=kilde)
+    except OSError:
+        return NgramModel(tables)  # fx ingen skrivbar cachemappe; så bygges den igen næste gang
+    return load_model(path)
+
+def wordlist_model_path():
+    from .t9 import ORDLISTE
+    return cache_sti(ORDLISTE, ENDELSE)
+
+@functools.lru_cache(maxsize=None)
+def standard_model():
+    # Modellen fra KODESAMLING_NGRAM, hvis den er sat, ellers fra ordlisten.
+    # None uden NumPy
+    if numpy_or_none() is None:
+        return None
+    path = os.environ.get('KODESAMLING_NGRAM')
+    return load_model(path) if path else wordlist_model()
+
+
+def read_corpus(paths, size=1 << 20):
+    # (tekst, 1) i bidder af ca. size tegn, delt ved mellemrum, så kun få
+    # stykker på tværs af to ord går tabt
+    for path in paths:
+        with open(path, encoding='utf-8', errors='ignore') as fil:
+            rest = ''
+            while True:
+                chunk = fil.read(size)
+                if not chunk:
+                    break
+                text = rest + chunk
+                cut = max(text.rfind(' '), text.rfind('\n'))
+                if cut <= 0:
+                    rest = text
+                    continue
+                rest = text[cut:]
+                yield text[:cut], 1.0
+            if rest.strip():
+                yield rest, 1.0
+
+def build_model(paths, output, order=ORDEN):
+    # Tæller korpusset og gemmer modellen; returnerer antal bogstaver
+    counts = count_ngrams(read_corpus(paths), order)
+    write_model(output, ngram_bits(counts), kilde={'filer': [os.path.basename(p) for p in paths]})
+    return int(counts[0].sum())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m kodesamling.ngram',
+                                     description='Byg en dansk n-gram-model fra et lokalt tekstkorpus.')
+    parser.add_argument('filer', nargs='+', help='tekstfiler (UTF-8)')
+    parser.add_argument('-o', '--output', required=True, help='modelfilen der skrives')
+    parser.add_argument('--orden', type=int, default=ORDEN,
+                        help='længste stykke i bogstaver (standard: %(default)s)')
+    args = parser.parse_args(argv)
+    if numpy_or_none() is None:
+        print("fejl: n-gram-modellen kræver NumPy", file=sys.stderr)
+        return 1
+    try:
+        letters = build_model(args.filer, args.output, args.orden)
+    except (OSError, ValueError) as e:
+        print(f"fejl: {e}", file=sys.stderr)
+        return 1
+    print(f"{letters} bogstaver talt, {args.output}: {os.path.getsize(args.output) / 2**20:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
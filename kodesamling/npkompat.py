@@ -0,0 +1,15 @@
+# NumPy er valgfri: modulerne med vektoriserede udgaver henter den herfra og
+# falder tilbage til ren Python, når den ikke er installeret.
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def numpy_or_none():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def has_numpy():
+    return numpy_or_none() is not None
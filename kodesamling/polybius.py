@@ -0,0 +1,218 @@
+# Polybius-firkanter: hvert bogstav skrives som sin rækkes og sin kolonnes
+# navn, fx 100P-koden med rækkerne P, O, I, N, T og kolonnerne 1-6. Rækker,
+# kolonner og alfabet kan være hvad som helst (ét tegn pr. navn), og et
+# kodeord kan blande firkanten: kodeordets bogstaver først, så resten af
+# alfabetet.
+#
+# Hver firkant slås op i tætte tabeller fra tegnkode til række og kolonne
+# og fra (række, kolonne) til bogstav, så der aldrig søges i en ordbog pr.
+# tegn. Kodning er én str.translate; med NumPy kodes og afkodes hele teksten
+# som arrays på én gang.
+#
+# Bogstavparrene adskilles normalt af ét mellemrum, og et mellemrum i
+# teksten bliver til tre ("P4 P5 O4   O1 P5 N4"). Et par kan også stå
+# samlet i længere grupper (P4P5O4); de læses to tegn ad gangen. Med
+# samlet=True skrives parrene uden mellemrum, og hvert mellemrum er et
+# ordskifte ("P4P5O4 O1P5N4").
+import re
+from functools import lru_cache
+
+from .npkompat import numpy_or_none
+
+NUMPY_FRA = 4096  # tegn; kortere tekster er hurtigere uden NumPy
+_ORDSKIFTE = re.compile(r'\s{2,}')
+_ORDSKIFTE_TEGN = '\x00'
+_DEL = re.compile(r'\s+|\S\S?')  # en række mellemrum eller et par (evt. et enkelt tegn sidst)
+_ET_MELLEMRUM = re.compile(r'[^\S ]')  # andet enkelt mellemrumstegn end ' '
+_ANDRE_MELLEMRUM = '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f'  # ASCII-tegn hvor isspace() er sand, ud over ' '
+
+
+def polybius_cells(alphabet, keyword=''):
+    # Firkantens bogstaver i rækkefølge: kodeordets unikke bogstaver først
+    keyword = [c for c in keyword.upper() if c in alphabet]
+    return tuple(dict.fromkeys(keyword + list(alphabet)))
+
+
+class _OversætTabel(dict):
+    # Tabel til str.translate: tegn -> par + sep; tegn uden plads -> '?' + sep
+    def __init__(self, encode_table, sep):
+        super().__init__({ord(c): pair + sep for c, pair in encode_table.items()})
+        self.sep = sep
+
+    def __missing__(self, code):
+        value = self[code] = '?' + self.sep
+        return value
+
+
+class PolybiusFirkant:
+    def __init__(self, alphabet, rows, cols, keyword=''):
+        if any(len(label) != 1 for label in rows + cols):
+            raise ValueError("Række- og kolonnenavne skal være enkelte tegn.")
+        if len(set(rows)) != len(rows) or len(set(cols)) != len(cols):
+            raise ValueError("Række- og kolonnenavne skal være forskellige.")
+        self.cells = polybius_cells(alphabet, keyword)
+        if len(self.cells) > len(rows) * len(cols):
+            raise ValueError(f"{len(self.cells)} bogstaver kan ikke være i en "
+                             f"{len(rows)}x{len(cols)} firkant.")
+        self.rows = rows
+        self.cols = cols
+        self.pairs = {letter: rows[i // len(cols)] + cols[i % len(cols)] for i, letter in enumerate(self.cells)}
+        self.letters = {pair: letter for letter, pair in self.pairs.items()}
+        # Mellemrum beholdes (og bliver til tre, når parrene adskilles af ét
+        # mellemrum); andre tegn uden plads i firkanten bliver til '?'
+        self.encode_table = dict(self.pairs)
+        self.encode_table[' '] = ' '
+        self.translate_tables = {sep: _OversætTabel(self.encode_table, sep) for sep in ('', ' ')}
+        self.decode_tables = {samlet: _AfkodTabel(self.letters, samlet) for samlet in (False, True)}
+        self.split_table = _AfkodTabel(dict(self.letters, **{_ORDSKIFTE_TEGN: ' '}), False)
+        # Kun tegn under 256 (latin-1) kan slås op i de tætte tabeller
+        self.dense = all(ord(c) < 256 for c in self.cells + tuple(rows) + tuple(cols))
+
+    def grid(self):
+        # Firkanten som rækker af bogstaver ('' for tomme felter)
+        n = len(self.cols)
+        cells = list(self.cells) + [''] * (len(self.rows) * n - len(self.cells))
+        return [cells[i:i + n] for i in range(0, len(cells), n)]
+
+@lru_cache(maxsize=32)
+def polybius_square(alphabet, rows, cols, keyword=''):
+    # alphabet, rows og cols som tupler eller strenge (de skal kunne hashes)
+    return PolybiusFirkant(tuple(alphabet), tuple(rows), tuple(cols), keyword.upper())
+
+
+@lru_cache(maxsize=32)
+def _arrays(square):
+    # Tætte NumPy-tabeller over byteværdier (latin-1). Kodning: byte -> de
+    # samme (højst tre) bytes som i str.translate-tabellerne og deres antal.
+    # Afkodning: (første byte << 8 | anden byte) -> bogstav, hvor ugyldige
+    # par giver '?' og et mellemrum først giver ' '
+    np = numpy_or_none()
+    encode = {}
+    for sep, table in square.translate_tables.items():
+        values = [table[byte].encode('latin-1') for byte in range(256)]
+        out = np.full((256, 3), ord(' '), dtype=np.uint8)
+        for byte, value in enumerate(values):
+            out[byte, :len(value)] = list(value)
+        encode[sep] = out, np.array([len(value) for value in values], dtype=np.uint8)
+    letters = np.full((256, 256), ord('?'), dtype=np.uint8)
+    letters[_space_lut()] = ord(' ')
+    for pair, letter in square.letters.items():
+        letters[ord(pair[0]), ord(pair[1])] = ord(letter)
+    return encode, letters.ravel()
+
+@lru_cache(maxsize=1)
+def _space_lut():
+    np = numpy_or_none()
+    return np.array([chr(i).isspace() for i in range(256)])
+
+def _latin1(text):
+    # Teksten som et uint8-array, eller None hvis den har tegn over 255
+    np = numpy_or_none()
+    try:
+        return np.frombuffer(text.encode('latin-1'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return None
+
+
+def _encode_python(text, square, samlet):
+    if samlet:
+        return text.translate(square.translate_tables[''])
+    # Hvert par får et mellemrum efter sig; det sidste fjernes igen
+    return text.translate(square.translate_tables[' '])[:-1]
+
+def _encode_np(data, square, samlet):
+    np = numpy_or_none()
+    encode, _ = _arrays(square)
+    table, lengths = encode['' if samlet else ' ']
+    # Hvert tegn får tre pladser, og dem der ikke bruges, fjernes til sidst
+    used = np.arange(3, dtype=np.uint8) < lengths[data][:, None]
+    result = table[data][used].tobytes().decode('latin-1')
+    return result if samlet else result[:-1]
+
+def polybius_encode(text, square, samlet=False, vectorized=False):
+    text = text.upper()
+    if vectorized and square.dense and len(text) >= NUMPY_FRA and numpy_or_none() is not None:
+        data = _latin1(text)
+        if data is not None:
+            return _encode_np(data, square, samlet)
+    return _encode_python(text, square, samlet)
+
+
+class _AfkodTabel(dict):
+    # Par -> bogstav; ukendte par bliver til '?', og en række mellemrum til
+    # ét mellemrum (ordskifte) eller ingenting (skille mellem par). Rækkerne
+    # af mellemrum normaliseres til ' ' og '  ' før opslag, og ukendte par
+    # gemmes ikke, så tabellen ikke vokser med hver afkodet tekst
+    def __init__(self, letters, samlet):
+        super().__init__(letters)
+        self.samlet = samlet
+        self[' '] = ' ' if samlet else ''
+        self['  '] = ' '
+
+    def __missing__(self, token):
+        if token[0].isspace():
+            return ' ' if self.samlet or len(token) > 1 else ''
+        if len(token) > 2:
+            # En gruppe af par uden mellemrum
+            return ''.join([self[token[i:i + 2]] for i in range(0, len(token), 2)])
+        return '?'
+
+def _decode_python(code, square, samlet):
+    if samlet or _ORDSKIFTE_TEGN in code:
+        # Par og rækker af mellemrum findes i ét regex-gennemløb
+        table = square.decode_tables[samlet]
+        return ''.join(map(table.__getitem__, _DEL.findall(_normalize_gaps(code))))
+    # Ordskifter markeres med et tegn, der ikke er i teksten, og resten
+    # klares af split, som i C deler ved hvert mellemrum
+    tokens = _mark_gaps(code).split()
+    return ''.join(map(square.split_table.__getitem__, tokens))
+
+def _normalize_gaps(code):
+    # Rækker af mellemrum bliver til '  ' og enkelte mellemrumstegn til ' '
+    if code.isascii() and '    ' not in code and not any(c in code for c in _ANDRE_MELLEMRUM):
+        return code.replace('   ', '  ')
+    return _ET_MELLEMRUM.sub(' ', _ORDSKIFTE.sub('  ', code))
+
+def _mark_gaps(code):
+    marker = ' ' + _ORDSKIFTE_TEGN + ' '
+    if code.isascii() and '    ' not in code and not any(c in code for c in _ANDRE_MELLEMRUM):
+        # Kun rækker af ét, to eller tre mellemrum (som polybius_encode
+        # skriver): to gange str.replace er meget hurtigere end regex
+        return code.replace('   ', marker).replace('  ', marker)
+    return _ORDSKIFTE.sub(marker, code)
+
+def _decode_np(data, square, samlet):
+    np = numpy_or_none()
+    _, letters = _arrays(square)
+    n = len(data)
+    # Et mellemrum sidst, så hvert tegn har et næste
+    padded = np.empty(n + 1, dtype=np.uint8)
+    padded[:n] = data
+    padded[n] = ord(' ')
+    space = _space_lut()[padded]
+    prev_space = np.empty(n + 1, dtype=bool)
+    prev_space[0] = True
+    prev_space[1:] = space[:-1]
+    # Par læses fra starten af hver gruppe uden mellemrum
+    idx = np.arange(n + 1, dtype=np.int32 if n < 2**31 - 1 else np.int64)
+    group_start = np.maximum.accumulate(np.where(~space & prev_space, idx, 0))
+    keep = ~space & ((idx - group_start) & 1 == 0)
+    # Ordskifte ved første mellemrum i en række på mindst to (alle med samlet)
+    gap = space[:-1] & ~prev_space[:-1]
+    if not samlet:
+        gap &= space[1:]
+    keep[:-1] |= gap
+    # Hvert par (og hvert ordskifte) slås op som to bytes på én gang; et
+    # tegn uden et næste i gruppen giver '?', da mellemrum ikke er en kolonne
+    pos = np.flatnonzero(keep)
+    pairs = padded[pos].astype(np.uint16) << 8
+    pairs |= padded[pos + 1]
+    return letters[pairs].tobytes().decode('latin-1')
+
+def polybius_decode(code, square, samlet=False, vectorized=False):
+    code = code.upper().strip()
+    if vectorized and square.dense and len(code) >= NUMPY_FRA and numpy_or_none() is not None:
+        data = _latin1(code)
+        if data is not None:
+            return _decode_np(data, square, samlet)
+    return _decode_python(code, square, samlet)
@@ -0,0 +1,98 @@
+# Register over koderne: navn, funktionerne til kodning og afkodning samt de
+# parametre, koden tager, med en beskrivelse af feltet i appen. Funktionerne
+# angives som 'modul:funktion' og importeres først, når koden bruges første
+# gang, så et program kun betaler for de koder, det faktisk bruger. Appens
+# menu og de simple sider bygges herfra; sider med mere end kod/afkod
+# (billeder, lyd, knækning ...) ligger i appen og henter deres kode herfra.
+import importlib
+
+from . import maaling
+
+
+class Parameter:
+    # slags: 'tekst' (tekstfelt), 'tal' (heltal), 'flag' (afkrydsning) eller
+    # 'tekstfelt' (flere linjer); navn er funktionens argument. handling er
+    # 'kod' eller 'afkod' for en parameter, der kun bruges den ene vej
+    def __init__(self, navn, label, slags='tekst', standard=None, mindst=None, handling=None):
+        self.navn = navn
+        self.label = label
+        self.slags = slags
+        self.standard = standard
+        self.mindst = mindst
+        self.handling = handling
+
+
+class Kode:
+    def __init__(self, navn, kod, afkod, parametre=(), input_label="Indtast tekst eller kode:"):
+        self.navn = navn
+        self._spec = {'kod': kod, 'afkod': afkod}
+        self._funktioner = {}
+        self.parametre = parametre
+        self.input_label = input_label
+
+    def _funktion(self, handling):
+        # 'modul:funktion' eller ('modul:funktion', {faste argumenter})
+        func = self._funktioner.get(handling)
+        if func is None:
+            spec, faste = self._spec[handling], {}
+            if isinstance(spec, tuple):
+                spec, faste = spec
+            modul, navn = spec.split(':')
+            func = getattr(importlib.import_module(modul), navn)
+            if faste:
+                func = _med_faste(func, faste)
+            self._funktioner[handling] = func
+        return func
+
+    def parametre_til(self, handling):
+        # Parametrene til 'kod' eller 'afkod'
+        return tuple(p for p in self.parametre if p.handling in (None, handling))
+
+    def encode(self, text, **params):
+        with maaling.Måling(f'{self.navn} kod', len(text)):
+            return self._funktion('kod')(text, **params)
+
+    def decode(self, text, **params):
+        with maaling.Måling(f'{self.navn} afkod', len(text)):
+            return self._funktion('afkod')(text, **params)
+
+def _med_faste(func, faste):
+    def kald(text, **params):
+        return func(text, **faste, **params)
+    return kald
+
+
+KODER = {kode.navn: kode for kode in (
+    Kode('100P-koden', ('kodesamling.koder:encode_100p', {'vectorized': True}),
+         ('kodesamling.koder:decode_100p', {'vectorized': True}),
+         (Parameter('keyword', "Kodeord til at blande tabellen (tom = A-Å i rækkefølge):", 'tekst', ''),
+          Parameter('samlet', "Bogstavpar uden mellemrum (fx P4P5O4), mellemrum er ordskifte", 'flag', False))),
+    Kode('Alfa-Nr.', 'kodesamling.koder:alpha_num_encode', 'kodesamling.koder:alpha_num_decode'),
+    Kode('Baconkode', 'kodesamling.bacon:bacon_code_encode', 'kodesamling.bacon:bacon_code_decode',
+         (Parameter('covertext', "Indtast fyldtekst (mindst 5 bogstaver pr. bogstav i beskeden):", 'tekstfelt', '',
+                    handling='kod'),),
+         input_label="Indtast hemmelig besked eller kodet tekst (brug små og store bogstaver):"),
+    Kode('Bifid', 'kodesamling.bifid:bifid_encode', 'kodesamling.bifid:bifid_decode',
+         (Parameter('period', "Periode (antal bogstaver pr. gruppe, 0 = hele beskeden):", 'tal', 5, 0),
+          Parameter('dansk', "Brug dansk 6x6-firkant med Æ, Ø og Å", 'flag', False)),
+         input_label="Indtast tekst:"),
+    Kode('Binærkode', 'kodesamling.binaer:binær_encode', 'kodesamling.binaer:binær_decode',
+         (Parameter('compact', "Kompakt format (8 bit pr. bogstav uden |, mellemrum mellem ord)", 'flag', False),),
+         input_label="Indtast tekst eller binærkode:"),
+    Kode('Kodeordskode', 'kodesamling.koder:kodeordskode_encode', 'kodesamling.koder:kodeordskode_decode',
+         (Parameter('keyword', "Indtast kodeord (brug A-Å, uden W):", 'tekst', 'SJAK'),),
+         input_label="Indtast tekst:"),
+    Kode('Morsekode', 'kodesamling.koder:encode_to_morse', 'kodesamling.koder:decode_from_morse',
+         input_label="Indtast tekst eller morsekode:"),
+    Kode('ROT-X', 'kodesamling.vektor:rot_x_encode_np', 'kodesamling.vektor:rot_x_decode_np',
+         (Parameter('offset', "Forskydning:", 'tal', 0),), input_label="Indtast tekst:"),
+    Kode('Røversprog', 'kodesamling.koder:encode_roversprog', 'kodesamling.koder:decode_roversprog',
+         (Parameter('vokal', "Fyldvokal (A, E, I, O, U, Y, Æ, Ø eller Å):", 'tekst', 'o', handling='kod'),
+          Parameter('vokal', "Fyldvokal (A, E, I, O, U, Y, Æ, Ø eller Å; tom = find selv):", 'tekst', '',
+                    handling='afkod')),
+         input_label="Indtast tekst:"),
+    Kode('SMS-kode', 'kodesamling.koder:sms_encode', 'kodesamling.koder:sms_decode'),
+    Kode('Vigenère', ('kodesamling.vektor:vigenere_kode_np', {'encode': True}),
+         ('kodesamling.vektor:vigenere_kode_np', {'encode': False}),
+         (Parameter('nøgle', "Indtast nøgleord (A-Å):", 'tekst', ''),), input_label="Indtast tekst:"),
+)}
@@ -0,0 +1,256 @@
+from .bacon import FEJL_FOR_KORT, _message_bits, _message_values
+from .binaer import BinærDecoder, binær_encode
+from .bifid import bifid_kode, square_letters
+from .koder import (
+    _decode_roversprog_part,
+    _SMS_ORDSKEL,
+    _sms_word,
+    _vigenere_part,
+    alpha_num_decode,
+    alpha_num_encode,
+    bacon_code_decode,
+    danish_alphabet_2,
+    decode_100p,
+    decode_from_morse,
+    decode_roversprog,
+    encode_100p,
+    encode_roversprog,
+    encode_to_morse,
+    kodeordskode_encode,
+    rot_x_decode,
+    rot_x_encode,
+    roversprog_vokal,
+    sms_encode,
+)
+
+
+# Streaming: hver kode tager en iterable af tekstbidder og giver outputbidder.
+# Tilstand der går på tværs af bidder (nøgleposition, halve sektorer, halve
+# morsetegn osv.) gemmes mellem bidderne, så store filer kan kodes med
+# begrænset hukommelse.
+def read_chunks(fileobj, size=1 << 16):
+    while True:
+        chunk = fileobj.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+def _token_batches(chunks):
+    # Giver lister af hele ord (adskilt af mellemrum); et ord der er delt
+    # mellem to bidder holdes tilbage til næste bid
+    rest = ''
+    for chunk in chunks:
+        text = rest + chunk
+        tokens = text.split()
+        if tokens and not text[-1].isspace():
+            rest = tokens.pop()
+        else:
+            rest = ''
+        if tokens:
+            yield tokens
+    if rest:
+        yield [rest]
+
+def _split_batches(chunks, sep):
+    # Som text.split(sep), men bid for bid; sidste del gives altid til sidst
+    rest = ''
+    for chunk in chunks:
+        parts = (rest + chunk).split(sep)
+        rest = parts.pop()
+        if parts:
+            yield parts
+    yield [rest]
+
+def _joined_stream(chunks, encode_part, sep=' '):
+    # Til koder hvor hvert tegn bliver til et token og alle tokens samles med sep
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        part = encode_part(chunk)
+        yield part if first else sep + part
+        first = False
+
+def encode_to_morse_stream(chunks):
+    first = True
+    for words in _token_batches(chunk.upper() for chunk in chunks):
+        part = encode_to_morse(' '.join(words))
+        yield part if first else '//' + part
+        first = False
+
+def decode_from_morse_stream(chunks):
+    first = True
+    for words in _split_batches(chunks, '//'):
+        part = ' '.join([decode_from_morse(word) for word in words])
+        yield part if first else ' ' + part
+        first = False
+
+def rot_x_encode_stream(chunks, offset, vectorized=False):
+    if vectorized:
+        from .vektor import rot_x_encode_np as encode
+    else:
+        encode = rot_x_encode
+    for chunk in chunks:
+        yield encode(chunk, offset)
+
+def rot_x_decode_stream(chunks, offset, vectorized=False):
+    if vectorized:
+        from .vektor import rot_x_decode_np as decode
+    else:
+        decode = rot_x_decode
+    for chunk in chunks:
+        yield decode(chunk, offset)
+
+def alpha_num_encode_stream(chunks):
+    return _joined_stream(chunks, alpha_num_encode)
+
+def alpha_num_decode_stream(chunks):
+    for tokens in _token_batches(chunks):
+        yield alpha_num_decode(' '.join(tokens))
+
+def kodeordskode_encode_stream(chunks, keyword):
+    for chunk in chunks:
+        yield kodeordskode_encode(chunk, keyword)
+
+def kodeordskode_decode_stream(chunks, keyword):
+    return kodeordskode_encode_stream(chunks, keyword)
+
+def sms_encode_stream(chunks):
+    return _joined_stream(chunks, sms_encode)
+
+def sms_decode_stream(chunks):
+    # AE, OE og AA afgøres ord for ord (se koder.sms_decode), så det sidste
+    # ord i en bid holdes tilbage, indtil næste ordskel er set
+    rest = ''
+    for chunk in chunks:
+        words = _SMS_ORDSKEL.split(rest + chunk)
+        rest = words.pop()
+        text = ''.join([_sms_word(word) for word in words])
+        if text:
+            yield text
+    if rest:
+        yield _sms_word(rest)
+
+def encode_100p_stream(chunks, keyword='', samlet=False, vectorized=False):
+    return _joined_stream(chunks, lambda chunk: encode_100p(chunk, keyword, samlet, vectorized),
+                          sep='' if samlet else ' ')
+
+def decode_100p_stream(chunks, keyword='', samlet=False, vectorized=False):
+    # Der skæres kun ved en række mellemrum, der er helt med, så hverken en
+    # gruppe af par eller et ordskifte deles mellem to bidder. Rækken kommer
+    # med i næste del og bliver til et mellemrum foran den, hvis den er et
+    # ordskifte
+    rest = ''
+    first = True
+    for chunk in chunks:
+        text = rest + chunk
+        end = len(text.rstrip())
+        while end and not text[end - 1].isspace():
+            end -= 1
+        cut = len(text[:end].rstrip())
+        if cut == 0:
+            rest = text
+            continue
+        part, rest = text[:cut], text[cut:]
+        yield _100p_part(part, first, keyword, samlet, vectorized)
+        first = False
+    if rest.strip():
+        yield _100p_part(rest, first, keyword, samlet, vectorized)
+
+def _100p_part(part, first, keyword, samlet, vectorized):
+    code = part.lstrip()
+    lead = len(part) - len(code)
+    decoded = decode_100p(code, keyword, samlet, vectorized)
+    if not first and (lead > 1 or samlet and lead):
+        decoded = ' ' + decoded
+    return decoded
+
+def encode_roversprog_stream(chunks, vokal='o'):
+    for chunk in chunks:
+        yield encode_roversprog(chunk, vokal)
+
+def decode_roversprog_stream(chunks, vokal='o'):
+    # Med vokal=None findes fyldvokalen ud fra den første bid
+    rest = ''
+    for chunk in chunks:
+        text = rest + chunk
+        if not vokal:
+            vokal = roversprog_vokal(text)
+        result, used = _decode_roversprog_part(text, final=False, vokal=vokal)
+        rest = text[used:]
+        if result:
+            yield result
+    if rest:
+        yield decode_roversprog(rest, vokal or 'o')
+
+def binærkode_stream(chunks, encode=True, compact=False):
+    if encode:
+        yield from _joined_stream(chunks, lambda chunk: binær_encode(chunk, compact), sep='' if compact else ' | ')
+        return
+    decoder = BinærDecoder(compact)
+    for chunk in chunks:
+        result = decoder.feed(chunk)
+        if result:
+            yield result
+    result = decoder.feed(b'', final=True)
+    if result:
+        yield result
+
+def vigenere_stream(chunks, nøgle, encode=True, alphabet=danish_alphabet_2, vectorized=False):
+    if vectorized:
+        from .vektor import vigenere_kode_np as part
+    else:
+        part = _vigenere_part
+    nøgle = nøgle.upper()
+    start = 0
+    for chunk in chunks:
+        chunk = chunk.upper()
+        yield part(chunk, nøgle, encode, alphabet, start)
+        start += len(chunk)
+
+def _bifid_stream(chunks, encode, period, square):
+    # Bifid arbejder på perioder af bogstaver; en halv periode gemmes til
+    # næste bid. Med period 0/None er hele beskeden én periode og må samles først
+    rest = ''
+    for chunk in chunks:
+        letters = rest + square_letters(chunk, square)
+        cut = len(letters) - len(letters) % period if period else 0
+        rest = letters[cut:]
+        if cut:
+            yield bifid_kode(letters[:cut], encode, period, square)
+    if rest:
+        yield bifid_kode(rest, encode, period, square)
+
+def bifid_encode_stream(chunks, period=5, square=None):
+    return _bifid_stream(chunks, True, period, square)
+
+def bifid_decode_stream(chunks, period=5, square=None):
+    return _bifid_stream(chunks, False, period, square)
+
+def bacon_code_encode_stream(plaintext, cover_chunks):
+    bits = _message_bits(_message_values(plaintext))
+    j = 0  # index i bits
+    for chunk in cover_chunks:
+        if j >= len(bits):
+            yield chunk
+            continue
+        result_chars = list(chunk)
+        for i, char in enumerate(result_chars):
+            if j >= len(bits):
+                break
+            if char.isalpha():
+                result_chars[i] = char.upper() if bits[j] else char.lower()
+                j += 1
+        yield ''.join(result_chars)
+    if j < len(bits):
+        raise ValueError(FEJL_FOR_KORT)
+
+def bacon_code_decode_stream(chunks):
+    # Kun bogstaverne tæller; en ufærdig gruppe på under 5 gemmes til næste bid
+    rest = ''
+    for chunk in chunks:
+        letters = rest + ''.join(filter(str.isalpha, chunk))
+        cut = len(letters) - len(letters) % 5
+        rest = letters[cut:]
+        if cut:
+            yield bacon_code_decode(letters[:cut])
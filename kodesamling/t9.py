@@ -0,0 +1,273 @@
+# T9: hvert bogstav skrives med ét tryk på sin tast (HEJ = 435), og telefonen
+# gætter ordet ud fra en ordliste. Ordlisten omsættes til et indeks fra
+# tastesekvens til de ord, der passer, med det hyppigste først. Indekset
+# gemmes med marshal i brugerens cachemappe (se kodesamling.cache), så det
+# kun bygges, når ordlisten ændres.
+#
+# En tastesekvens uden mellemrum (43563333344) deles i ord med dynamisk
+# programmering: den billigste opdeling, hvor et ord koster -log2 af dets
+# hyppighed i bits. Cifre uden noget ord koster mere end det sjældneste ord,
+# så de kun bruges, når intet andet passer, og vises som '?'.
+#
+# Ordlisten har ét ord pr. linje, evt. efterfulgt af antal forekomster
+# ("hej 1234"). Uden antal regnes hyppigheden ud fra pladsen i listen
+# (Zipfs lov), så listen skal stå med de hyppigste ord først.
+import functools
+import json
+import marshal
+import math
+import os
+import re
+import tempfile
+
+from .cache import cache_sti, opret_cache_mappe
+from .koder import SMS_KEYPAD
+
+INDEKS_ENDELSE = '.t9indeks'
+ORDLISTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ordliste.txt')
+_VERSION = 1
+UKENDT_EKSTRA = 4.0  # bits pr. ciffer uden ord, ud over prisen for det sjældneste ord
+
+# Æ og Å ligger på 2 og Ø på 6 som på danske telefoner
+T9_KEYS = {letter: seq[0] for letter, seq in SMS_KEYPAD.items()}
+T9_KEYS.update({'Æ': '2', 'Ø': '6', 'Å': '2'})
+
+_CIFRE = re.compile(r'[2-9]+')
+_SKILLE = re.compile(r'[\s0]+')  # 0 er mellemrumstasten
+
+
+def t9_key(word):
+    # Tastesekvensen for et ord, eller None hvis det har tegn uden tast
+    try:
+        return ''.join(T9_KEYS[c] for c in word.upper())
+    except KeyError:
+        return None
+
+def t9_encode(text):
+    # Ét tryk pr. bogstav; mellemrum og andre tegn beholdes
+    return ''.join(T9_KEYS.get(c, c) for c in text.upper())
+
+
+def read_wordlist(lines):
+    # {ord: antal}; linjer der starter med # springes over
+    counts = {}
+    rank = 0
+    for line in lines:
+        parts = line.split()
+        if not parts or parts[0].startswith('#'):
+            continue
+        rank += 1
+        word = parts[0].lower()
+        if len(parts) > 1 and parts[1].isdigit():
+            count = int(parts[1])
+        else:
+            count = 1e6 / rank
+        counts[word] = counts.get(word, 0) + count
+    return counts
+
+def build_index(counts):
+    # {tastesekvens: (ord, bits)} med det hyppigste ord først
+    total = sum(counts.values())
+    keys = {}
+    for word, count in counts.items():
+        key = t9_key(word)
+        if key and count > 0:
+            keys.setdefault(key, []).append((math.log2(total / count), word))
+    index = {}
+    for key, entries in keys.items():
+        entries.sort()
+        index[key] = (tuple(word for _, word in entries), tuple(bits for bits, _ in entries))
+    return index
+
+
+def _index_path(path):
+    return cache_sti(path, INDEKS_ENDELSE)
+
+def _write_index(path, stat, index):
+    header = {'version': _VERSION, 'marshal': marshal.version,
+              'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    sti = _index_path(path)
+    opret_cache_mappe(sti)
+    # Unikt midlertidigt navn, så to processer der bygger samtidig ikke deler fil
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(sti) + '.', suffix='.tmp', dir=os.path.dirname(sti))
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(json.dumps(header).encode('utf-8') + b'\n')
+            out.write(marshal.dumps(index))
+        os.replace(tmp, sti)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def _read_index(path, stat):
+    # Indekset fra disken, hvis det passer til ordlisten; ellers None
+    try:
+        with open(_index_path(path), 'rb') as fil:
+            data = fil.read()
+    except OSError:
+        return None
+    end = data.find(b'\n')
+    try:
+        header = json.loads(data[:end])
+    except ValueError:
+        return None
+    if (header.get('version') != _VERSION or header.get('marshal') != marshal.version
+            or header.get('size') != stat.st_size or header.get('mtime_ns') != stat.st_mtime_ns):
+        return None
+    try:
+        return marshal.loads(data[end + 1:])
+    except (ValueError, EOFError, TypeError):
+        return None
+
+
+class T9Ordbog:
+    def __init__(self, index):
+        self.index = index
+        self.længste = max(map(len, index), default=0)
+        sjældneste = max((bits[-1] for _, bits in index.values()), default=0.0)
+        self.ukendt_bits = sjældneste + UKENDT_EKSTRA
+
+    def __len__(self):
+        return len(self.index)
+
+    def bits(self, word):
+        # Ordets pris i bits, eller None hvis det ikke står i ordlisten
+        entry = self.index.get(t9_key(word))
+        if entry is not None:
+            word = word.lower()
+            for candidate, bits in zip(*entry):
+                if candidate == word:
+                    return bits
+        return None
+
+    def words(self, key):
+        # Ordene til en tastesekvens, hyppigste først
+        entry = self.index.get(key)
+        return list(entry[0]) if entry else []
+
+    def _split(self, digits):
+        # Billigste opdeling af en sekvens af cifre 2-9: [(cifre, ord eller None)]
+        n = len(digits)
+        index = self.index
+        best = [0.0] + [math.inf] * n
+        back = [0] * (n + 1)
+        for i in range(1, n + 1):
+            # Et ciffer uden ord er altid muligt, så der findes en opdeling
+            cost, start = best[i - 1] + self.ukendt_bits, i - 1
+            for j in range(max(0, i - self.længste), i):
+                entry = index.get(digits[j:i])
+                if entry is not None and best[j] + entry[1][0] < cost:
+                    cost, start = best[j] + entry[1][0], j
+            best[i] = cost
+            back[i] = start
+        parts = []
+        i = n
+        while i > 0:
+            j = back[i]
+            key = digits[j:i]
+            if key in index:  # et ord er altid billigere end et ukendt ciffer
+                parts.append((key, index[key][0]))
+            elif parts and parts[-1][1] is None:
+                parts[-1] = (key + parts[-1][0], None)  # saml ukendte cifre
+            else:
+                parts.append((key, None))
+            i = j
+        parts.reverse()
+        return parts
+
+    def segments(self, code):
+        # [(tekst, [ord])]: cifre 2-9 deles i ord med alle mulige ord til
+        # hvert stykke (hyppigste først, tom liste for ukendte cifre); alt
+        # andet (mellemrum, 0, tegnsætning) gives videre som tekst
+        result = []
+        pos = 0
+        for match in _CIFRE.finditer(code):
+            if match.start() > pos:
+                result.append((_SKILLE.sub(' ', code[pos:match.start()]), None))
+            for key, words in self._split(match.group()):
+                result.append((key, list(words) if words else []))
+            pos = match.end()
+        if pos < len(code):
+            result.append((_SKILLE.sub(' ', code[pos:]), None))
+        return result
+
+    def decode(self, code):
+        return segments_text(self.segments(code.strip()))
+
+
+def segments_text(segments):
+    # Teksten fra segments() med det hyppigste ord for hvert stykke
+    parts = []
+    last_word = False
+    for text, words in segments:
+        if words is None:
+            parts.append(text)
+            last_word = False
+            continue
+        if last_word:
+            parts.append(' ')  # ord fundet inde i en sekvens uden mellemrum
+        parts.append(words[0] if words else '?' * len(text))
+        last_word = True
+    return ''.join(parts)
+
+def load_wordlist(path):
+    # Ordbog fra en ordliste på disken; indekset genbruges, hvis det findes
+    path = os.fspath(path)
+    stat = os.stat(path)
+    index = _read_index(path, stat)
+    if index is None:
+        with open(path, encoding='utf-8', errors='ignore') as fil:
+            index = build_index(read_wordlist(fil))
+        try:
+            _write_index(path, stat, index)
+        except OSError:
+            pass  # fx ingen skrivbar cachemappe; så bygges indekset igen næste gang
+    return T9Ordbog(index)
+
+@functools.lru_cache(maxsize=None)
+def standard_ordbog():
+    # Ordbogen fra den medfølgende liste over almindelige danske ord
+    return load_wordlist(ORDLISTE)
+
+@functools.lru_cache(maxsize=4)
+def ordbog_fra_tekst(data):
+    # Ordbog fra en uploadet ordliste (bytes); de seneste gemmes i hukommelsen
+    return T9Ordbog(build_index(read_wordlist(data.decode('utf-8', errors='ignore').splitlines())))
+
+_PAR = {'AE': 'Æ', 'OE': 'Ø', 'AA': 'Å'}
+_PAR_ORD = re.compile(r'[A-ZÆØÅ]*(?:AE|OE|AA)[A-ZÆØÅ]*')
+MAKS_LÆSNINGER = 64  # læsninger der prøves pr. ord
+
+def _læsninger(word, start=0):
+    # Alle måder at læse AE, OE og AA i ordet som enten to bogstaver eller Æ, Ø, Å
+    for i in range(start, len(word) - 1):
+        bogstav = _PAR.get(word[i:i + 2])
+        if bogstav is not None:
+            for rest in _læsninger(word, i + 1):
+                yield rest
+            for rest in _læsninger(word[:i] + bogstav + word[i + 2:], i + 1):
+                yield rest
+            return
+    yield word
+
+def æøå_fra_par(text, ordbog=None):
+    # SMS-koden skriver Æ, Ø og Å som AE, OE og AA. For hvert ord med et af
+    # parrene bruges den læsning, der står i ordlisten og er hyppigst (så
+    # AEROBIC forbliver AEROBIC, mens GAAR bliver GÅR); står ingen af dem
+    # der, beholdes bogstaverne, som de er
+    ordbog = standard_ordbog() if ordbog is None else ordbog
+
+    def læs(match):
+        word = match.group()
+        best, best_bits = word, ordbog.bits(word)
+        for n, candidate in enumerate(_læsninger(word)):
+            if n == MAKS_LÆSNINGER:
+                break
+            bits = ordbog.bits(candidate)
+            if bits is not None and (best_bits is None or bits < best_bits):
+                best, best_bits = candidate, bits
+        return best
+    return _PAR_ORD.sub(læs, text)
+
+def t9_decode(code, ordbog=None):
+    return (standard_ordbog() if ordbog is None else ordbog).decode(code)
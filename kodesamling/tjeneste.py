@@ -0,0 +1,256 @@
+# Lokal HTTP/JSON-tjeneste til at kode og afkode mange tekster pr. kald, fx
+# fra pointsystemet eller scripts der laver opgaver:
+#   python -m kodesamling.tjeneste [--port 8765] [--processer 4]
+#
+#   GET  /koder   ->  {"Morsekode": {"parametre": [...]}, ...}
+#   POST /batch   <-  {"metode": "Vigenère", "handling": "kod",
+#                      "parametre": {"nøgle": "SJAK"}, "tekster": ["hej", ...]}
+#                 ->  {"resultater": ["ZNJ", ...]}
+#   GET  /billeder/morse-480.png  ->  referencebilledet (se kodesamling.billeder)
+#
+# Kun standardbiblioteket: asyncio læser og skriver forbindelserne (HTTP/1.1
+# med keep-alive), små batches kodes direkte i event-loopet, og store sendes
+# til en pulje af processer, så flere kerner bruges. Er der for mange
+# batches i kø, svares der straks 503, og for store forespørgsler afvises
+# med 413, så tjenesten ikke løber tør for hukommelse. Billederne sendes fra
+# hukommelsen med ETag og Cache-Control, så en browser kun henter dem én gang.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .billeder import billede_fil
+from .register import KODER
+
+MAX_BYTES = 8 << 20        # største forespørgsel
+MAX_TEKSTER = 10000        # flest tekster i én batch
+MAX_HOVED = 16 << 10       # største HTTP-hoved
+PROCES_GRÆNSE = 64 << 10   # batches med flere tegn end dette kodes i en proces
+KØ_PR_PROCES = 4           # batches pr. proces der må vente, før der svares 503
+BILLED_ALDER = 86400       # sekunder en browser må bruge et billede uden at spørge igen
+
+_STATUS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 431: 'Request Header Fields Too Large',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+# Fejl fra en kode, fx et nøgleord med tegn uden for alfabetet
+_KODEFEJL = (ValueError, KeyError, IndexError, TypeError)
+
+
+class Fil:
+    # Et svar der ikke er JSON, fx et billede
+    def __init__(self, data, etag, type='image/png'):
+        self.data = data
+        self.etag = etag
+        self.type = type
+
+
+class Fejl(Exception):
+    def __init__(self, status, besked):
+        super().__init__(besked)
+        self.status = status
+
+
+def _find_kode(navn):
+    kode = KODER.get(navn)
+    if kode is None:
+        # Navnet må også skrives uden store bogstaver, fx "vigenère"
+        kode = {k.lower(): v for k, v in KODER.items()}.get(str(navn).lower())
+    return kode
+
+def kør_batch(metode, handling, parametre, tekster):
+    # Kører i event-loopet eller i en proces fra puljen; giver en liste af resultater
+    kode = _find_kode(metode)
+    func = kode.encode if handling == 'kod' else kode.decode
+    return [func(tekst, **parametre) for tekst in tekster]
+
+def _tjek_batch(body):
+    # (metode, handling, parametre, tekster) eller Fejl med status 400/413
+    if not isinstance(body, dict):
+        raise Fejl(400, "Forventede et JSON-objekt.")
+    kode = _find_kode(body.get('metode'))
+    if kode is None:
+        raise Fejl(400, f"Ukendt metode: {body.get('metode')!r}")
+    handling = body.get('handling', 'kod')
+    if handling not in ('kod', 'afkod'):
+        raise Fejl(400, "handling skal være 'kod' eller 'afkod'.")
+    parametre = body.get('parametre') or {}
+    kendte = {p.navn: p for p in kode.parametre_til(handling)}
+    if not isinstance(parametre, dict) or set(parametre) - set(kendte):
+        raise Fejl(400, f"{kode.navn} tager kun parametrene {sorted(kendte)}.")
+    for navn, værdi in parametre.items():
+        slags = kendte[navn].slags
+        # bool er en underklasse af int, men true er ikke et tal
+        if (slags == 'tal' and (isinstance(værdi, bool) or not isinstance(værdi, int))) or (slags == 'flag' and not isinstance(værdi, bool)) \
+                or (slags in ('tekst', 'tekstfelt') and not isinstance(værdi, str)):
+            raise Fejl(400, f"Parameteren {navn} har forkert type.")
+    tekster = body.get('tekster')
+    if not isinstance(tekster, list) or not all(isinstance(t, str) for t in tekster):
+        raise Fejl(400, "tekster skal være en liste af tekster.")
+    if len(tekster) > MAX_TEKSTER:
+        raise Fejl(413, f"Højst {MAX_TEKSTER} tekster pr. batch.")
+    return kode.navn, handling, parametre, tekster
+
+
+class Tjeneste:
+    def __init__(self, processer=None):
+        self.processer = processer or os.cpu_count() or 1
+        self.pulje = None
+        self.ledige = asyncio.Semaphore(self.processer)
+        self.ventende = 0
+
+    async def start(self, host, port):
+        self.pulje = ProcessPoolExecutor(self.processer)
+        return await asyncio.start_server(self.forbindelse, host, port, limit=MAX_HOVED)
+
+    def luk(self):
+        if self.pulje is not None:
+            self.pulje.shutdown(cancel_futures=True)
+
+    async def batch(self, body):
+        metode, handling, parametre, tekster = _tjek_batch(body)
+        # Alle batches tæller med i køen, også de små, der kodes i event-loopet
+        if self.ventende >= self.processer * KØ_PR_PROCES:
+            raise Fejl(503, "For mange batches i kø; prøv igen om lidt.")
+        self.ventende += 1
+        pulje = self.pulje
+        try:
+            if sum(map(len, tekster)) < PROCES_GRÆNSE:
+                # Små batches er hurtigere at kode direkte end at sende til en proces
+                return kør_batch(metode, handling, parametre, tekster)
+            async with self.ledige:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pulje, kør_batch, metode, handling, parametre, tekster)
+        except _KODEFEJL as e:
+            raise Fejl(400, f"{metode}: {e}")
+        except BrokenProcessPool:
+            # En proces døde (fx uden hukommelse), og puljen kan ikke bruges
+            # igen; den skiftes ud én gang, også når flere batches fejler
+            if self.pulje is pulje:
+                self.pulje = ProcessPoolExecutor(self.processer)
+                pulje.shutdown(wait=False, cancel_futures=True)
+            raise Fejl(500, "En kodeproces stoppede uventet; prøv igen.")
+        finally:
+            self.ventende -= 1
+
+    async def svar(self, metode, sti, data):
+        if sti == '/koder':
+            if metode != 'GET':
+                raise Fejl(405, "Brug GET.")
+            return {kode.navn: {'parametre': [{'navn': p.navn, 'slags': p.slags, 'standard': p.standard,
+                                               'handling': p.handling} for p in kode.parametre]}
+                    for kode in KODER.values()}
+        if sti == '/batch':
+            if metode != 'POST':
+                raise Fejl(405, "Brug POST.")
+            try:
+                body = json.loads(data)
+            except ValueError:
+                raise Fejl(400, "Ugyldig JSON.")
+            return {'resultater': await self.batch(body)}
+        if sti.startswith('/billeder/'):
+            if metode != 'GET':
+                raise Fejl(405, "Brug GET.")
+            fil = billede_fil(sti[len('/billeder/'):])
+            if fil is None:
+                raise Fejl(404, f"Ukendt billede: {sti}")
+            return Fil(*fil)
+        raise Fejl(404, f"Ukendt sti: {sti}")
+
+    async def forbindelse(self, reader, writer):
+        try:
+            while True:
+                try:
+                    hoved = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    return  # klienten lukkede forbindelsen
+                except asyncio.LimitOverrunError:
+                    await _skriv(writer, 431, {'fejl': "For stort HTTP-hoved."}, False)
+                    return
+                linjer = hoved.decode('latin-1').split('\r\n')
+                try:
+                    metode, sti, version = linjer[0].split(' ', 2)
+                except ValueError:
+                    await _skriv(writer, 400, {'fejl': "Ugyldig forespørgsel."}, False)
+                    return
+                felter = {}
+                for linje in linjer[1:]:
+                    navn, _, værdi = linje.partition(':')
+                    felter[navn.strip().lower()] = værdi.strip()
+                keep_alive = (felter.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                try:
+                    længde = int(felter.get('content-length', 0))
+                except ValueError:
+                    længde = -1
+                if længde < 0 or længde > MAX_BYTES:
+                    await _skriv(writer, 413, {'fejl': f"Højst {MAX_BYTES} bytes pr. forespørgsel."}, False)
+                    return
+                data = await reader.readexactly(længde) if længde else b''
+                try:
+                    status, svar = 200, await self.svar(metode, sti.split('?')[0], data)
+                except Fejl as e:
+                    status, svar = e.status, {'fejl': str(e)}
+                except Exception as e:  # alt andet er en fejl i tjenesten; svar i stedet for at lukke
+                    traceback.print_exc()
+                    status, svar = 500, {'fejl': f"Intern fejl: {type(e).__name__}"}
+                if isinstance(svar, Fil) and felter.get('if-none-match') == svar.etag:
+                    status = 304  # browseren har allerede billedet
+                await _skriv(writer, status, svar, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def _skriv(writer, status, svar, keep_alive):
+    if isinstance(svar, Fil):
+        body = b'' if status == 304 else svar.data
+        indhold = svar.type
+        ekstra = f'ETag: {svar.etag}\r\nCache-Control: public, max-age={BILLED_ALDER}\r\n'
+    else:
+        body = json.dumps(svar, ensure_ascii=False).encode('utf-8')
+        indhold = 'application/json; charset=utf-8'
+        ekstra = ''
+    hoved = (f'HTTP/1.1 {status} {_STATUS[status]}\r\n'
+             f'Content-Type: {indhold}\r\n'
+             f'Content-Length: {len(body)}\r\n' + ekstra +
+             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+             + ('Retry-After: 1\r\n' if status == 503 else '') + '\r\n')
+    writer.write(hoved.encode('latin-1') + body)
+    await writer.drain()  # venter, hvis klienten læser langsommere end vi skriver
+
+
+async def _serve(host, port, processer):
+    tjeneste = Tjeneste(processer)
+    server = await tjeneste.start(host, port)
+    print(f"Kodesamling lytter på http://{host}:{port} med {tjeneste.processer} processer", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        tjeneste.luk()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m kodesamling.tjeneste',
+                                     description='Lokal JSON-tjeneste til batch-kodning.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--processer', type=int, default=None,
+                        help='antal processer til store batches (standard: antal kerner)')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args.host, args.port, args.processer))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# Vektoriseret ROT-X og Vigenère med NumPy til lange tekster.
+# Teksten laves om til et array af indeks i alfabetet, forskydningen lægges
+# på i én operation, og tegn uden for alfabetet bevares via en maske.
+# Uden NumPy falder funktionerne tilbage til de almindelige udgaver i koder.py.
+from functools import lru_cache
+
+from .koder import _vigenere_part, danish_alphabet, danish_alphabet_2, rot_x_decode, rot_x_encode
+from .npkompat import has_numpy, numpy_or_none
+
+_UDENFOR = 255  # indeks for tegn der ikke er i alfabetet
+
+
+@lru_cache(maxsize=8)
+def _alphabet_arrays(alphabet):
+    # Opslagstabel fra tegnkode (0-255) til indeks i alfabetet, og tilbage
+    np = numpy_or_none()
+    codes = np.array([ord(c) for c in alphabet], dtype=np.uint32)
+    lut = np.full(256, _UDENFOR, dtype=np.uint8)
+    lut[codes] = np.arange(len(alphabet), dtype=np.uint8)
+    return lut, codes
+
+def _to_indices(text, alphabet):
+    np = numpy_or_none()
+    lut, _ = _alphabet_arrays(alphabet)
+    points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    # Alle bogstaver i alfabetet ligger under 256; højere tegnkoder er altid udenfor
+    indices = lut[np.minimum(points, 255)]
+    return points, indices, indices != _UDENFOR
+
+def _from_indices(points, indices, mask, alphabet):
+    _, codes = _alphabet_arrays(alphabet)
+    out = points.copy()
+    out[mask] = codes[indices]
+    return out.tobytes().decode('utf-32-le')
+
+
+def rot_x_shift_np(text, offset, alphabet=danish_alphabet):
+    np = numpy_or_none()
+    text = text.upper()
+    points, indices, mask = _to_indices(text, tuple(alphabet))
+    shifted = (indices[mask].astype(np.int16) + offset % len(alphabet)) % len(alphabet)
+    return _from_indices(points, shifted, mask, tuple(alphabet))
+
+def rot_x_encode_np(text, offset):
+    if not has_numpy():
+        return rot_x_encode(text, offset)
+    return rot_x_shift_np(text, offset)
+
+def rot_x_decode_np(text, offset):
+    if not has_numpy():
+        return rot_x_decode(text, offset)
+    return rot_x_shift_np(text, -offset)
+
+
+def vigenere_kode_np(text, nøgle, encode=True, alphabet=danish_alphabet_2, start=0):
+    # start er nøglens position for første tegn, som i _vigenere_part
+    text = text.upper()
+    nøgle = nøgle.upper()
+    if not nøgle:
+        raise ValueError("Nøgleord må ikke være tomt.")
+    if not has_numpy():
+        return _vigenere_part(text, nøgle, encode, alphabet, start)
+    np = numpy_or_none()
+    alphabet = tuple(alphabet)
+    points, indices, mask = _to_indices(text, alphabet)
+    _, key_indices, key_mask = _to_indices(nøgle, alphabet)
+
+    # Nøglen gentages over hele teksten; ligesom i vigenere_kode tæller alle
+    # tegn med i nøglepositionen, også mellemrum og tegnsætning
+    positions = (np.arange(len(text)) + start) % len(nøgle)
+    used = positions[mask]
+    if not key_mask[used].all():
+        bad = nøgle[int(used[~key_mask[used]][0])]
+        raise ValueError(f"{bad!r} findes ikke i alfabetet")
+    shift = key_indices[used].astype(np.int16)
+    if not encode:
+        shift = -shift
+    shifted = (indices[mask].astype(np.int16) + shift) % len(alphabet)
+    return _from_indices(points, shifted, mask, alphabet)
@@ -1,174 +1,47 @@
 import streamlit as st
+import importlib
+import inspect
 import math
+import tempfile
+import time
 import pandas as pd
 
-# Morse code dictionary, including Danish letters
-MORSE_CODE_DICT = {
-    'A': '.-',    'B': '-...',  'C': '-.-.',  'D': '-..',   'E': '.',
-    'F': '..-.',  'G': '--.',   'H': '....',  'I': '..',    'J': '.---',
-    'K': '-.-',   'L': '.-..',  'M': '--',    'N': '-.',    'O': '---',
-    'P': '.--.',  'Q': '--.-',  'R': '.-.',   'S': '...',   'T': '-',
-    'U': '..-',   'V': '...-',  'W': '.--',   'X': '-..-',  'Y': '-.--',
-    'Z': '--..',
-    '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-',
-    '5': '.....', '6': '-....', '7': '--...', '8': '---..', '9': '----.',
-    'Æ': '.-.-',  'Ø': '---.',  'Å': '.--.-'
-}
-REVERSE_MORSE_CODE_DICT = {v: k for k, v in MORSE_CODE_DICT.items()}
-
-danish_alphabet = [
-    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
-    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'X', 'Y', 'Z', 'Æ', 'Ø', 'Å'
-]
-
-# Tastatur mapping til SMS-kode
-SMS_KEYPAD = {
-    'A': '2', 'B': '22', 'C': '222',
-    'D': '3', 'E': '33', 'F': '333',
-    'G': '4', 'H': '44', 'I': '444',
-    'J': '5', 'K': '55', 'L': '555',
-    'M': '6', 'N': '66', 'O': '666',
-    'P': '7', 'Q': '77', 'R': '777', 'S': '7777',
-    'T': '8', 'U': '88', 'V': '888',
-    'W': '9', 'X': '99', 'Y': '999', 'Z': '9999',
-    # Æ, Ø, Å håndteres før som AE, OE, AA
-}
-
-FRIMURER_BILLEDE_URL = "https://friluftsaktiviteter.dk/wp-content/uploads/2018/10/Frimurer-kode-Hjemmeside-e1541487806703.jpg"
-
-# New alphabet specifically for 100P code (same letters, but separate variable)
-danish_alphabet_2 = [
-    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
-    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-    'Æ', 'Ø', 'Å'
-]
-
-# Build the polybius table using danish_alphabet_2
-rows_100p = ['P', 'O', 'I', 'N', 'T']
-cols_100p = ['1', '2', '3', '4', '5', '6']
-
-polybius_100p = {}
-index = 0
-for r in rows_100p:
-    for c in cols_100p:
-        if index < len(danish_alphabet_2):
-            polybius_100p[danish_alphabet_2[index]] = r + c
-            index += 1
-
-reverse_polybius_100p = {v: k for k, v in polybius_100p.items()}
-
-def encode_to_morse(text):
-    encoded_words = []
-    for word in text.upper().split():
-        encoded_letters = []
-        for char in word:
-            if char in MORSE_CODE_DICT:
-                encoded_letters.append(MORSE_CODE_DICT[char])
-            else:
-                encoded_letters.append('?')
-        encoded_words.append('/'.join(encoded_letters))
-    return '//'.join(encoded_words)
-def decode_from_morse(morse_code):
-    decoded_words = []
-    words = morse_code.strip().split('//')
-    for word in words:
-        decoded_letters = []
-        letters = word.strip().split('/')
-        for letter in letters:
-            decoded_letters.append(REVERSE_MORSE_CODE_DICT.get(letter.strip(), '?'))
-        decoded_words.append(''.join(decoded_letters))
-    return ' '.join(decoded_words)
-
-def rot_x_encode(text, offset):
-    result = ''
-    for char in text.upper():
-        if char in danish_alphabet:
-            index = danish_alphabet.index(char)
-            new_index = (index + offset) % len(danish_alphabet)
-            result += danish_alphabet[new_index]
-        else:
-            result += char
-    return result
-def rot_x_decode(text, offset):
-    result = ''
-    for char in text.upper():
-        if char in danish_alphabet:
-            index = danish_alphabet.index(char)
-            new_index = (index - offset) % len(danish_alphabet)
-            result += danish_alphabet[new_index]
-        else:
-            result += char
-    return result
-
-def alpha_num_encode(text):
-    encoded = []
-    for char in text.upper():
-        if char == ' ':
-            encoded.append(' ')
-        elif char in danish_alphabet:
-            encoded.append(str(danish_alphabet.index(char) + 1))
-        else:
-            encoded.append('?')
-    return ' '.join(encoded)
-def alpha_num_decode(code):
-    decoded = []
-    for token in code.strip().split():
-        if token.isdigit():
-            idx = int(token) - 1
-            if 0 <= idx < len(danish_alphabet):
-                decoded.append(danish_alphabet[idx])
-            else:
-                decoded.append('?')
-        else:
-            decoded.append('?')
-    return ''.join(decoded)
-
-def keyword_cipher_setup(keyword):
-    reduced_alphabet = [c for c in danish_alphabet if c != 'W']
-    keyword_unique = []
-    seen = set()
-    for char in keyword.upper():
-        if char in reduced_alphabet and char not in seen:
-            seen.add(char)
-            keyword_unique.append(char)
-    remaining_letters = [c for c in reduced_alphabet if c not in seen]
-    full_sequence = keyword_unique + remaining_letters
-
-    # Hvis ulige antal bogstaver, tilføj tom plads for at få lige rækker
-    if len(full_sequence) % 2 != 0:
-        full_sequence.append('')
-
-    mid = math.ceil(len(full_sequence) / 2)  # øverste række får evt. ét bogstav ekstra
-    top_row = full_sequence[:mid]
-    bottom_row = full_sequence[mid:]
-    return top_row, bottom_row
-
-def kodeordskode_encode(text, keyword):
-    top_row, bottom_row = keyword_cipher_setup(keyword)
-    result = ''
-    text = text.upper()
-    for char in text:
-        if char in top_row:
-            idx = top_row.index(char)
-            if idx < len(bottom_row):
-                result += bottom_row[idx]
-            else:
-                result += char
-        elif char in bottom_row:
-            idx = bottom_row.index(char)
-            if idx < len(top_row):
-                result += top_row[idx]
-            else:
-                result += char
-        else:
-            # Bevar mellemrum og andre tegn som de er
-            result += char
-    return result.lower()
-def kodeordskode_decode(text, keyword):
-    # Kodning og afkodning er symmetrisk
-    # Kan derfor bruge samme funktion
-    # Brug uppercase for at finde bogstaverne, output med små bogstaver for læsbarhed
-    return kodeordskode_encode(text, keyword)
+from kodesamling import (
+    bacon_capacity,
+    binær_table,
+    create_danish_square,
+    create_polybius_square,
+    danish_alphabet,
+    int_to_roman,
+    keyword_cipher_setup,
+    roman_to_int,
+)
+from kodesamling import maaling
+from kodesamling.register import KODER
+
+_side_start = time.perf_counter()
+maaling.fra_miljø()
+
+def _hent(modul, *navne):
+    # Modulerne bag de enkelte sider importeres først, når siden vises, så en
+    # kørsel kun betaler for den valgte side. Funktionerne måles (se
+    # kodesamling.maaling); klasser og generatorer gives videre som de er
+    mod = importlib.import_module(modul)
+    ting = [getattr(mod, navn) for navn in navne]
+    ting = [maaling.instrument(t) if inspect.isfunction(t) and not inspect.isgeneratorfunction(t) else t
+            for t in ting]
+    return ting[0] if len(ting) == 1 else ting
+
+def _billede(navn, bredde=None):
+    # Referencebillederne ligger i billeder/; uden bredde fylder de hele spalten
+    billede = _hent("kodesamling.billeder", "billede")
+    data = billede(navn, bredde or 960)
+    if data is None:
+        st.warning("Billedet mangler; kør `python -m kodesamling.billeder`.")
+    elif bredde:
+        st.image(data, width=bredde)
+    else:
+        st.image(data, use_container_width=True)
 
 def display_two_row_table(row1, row2):
     html = "<table style='border-collapse: collapse;'>"
@@ -181,508 +54,183 @@ def display_two_row_table(row1, row2):
     html += "</tr></table>"
     st.markdown(html, unsafe_allow_html=True)
 
-def sms_encode(text):
-    text = text.upper()
-    # Erstat Æ Ø Å med AE OE AA
-    text = text.replace('Æ', 'AE').replace('Ø', 'OE').replace('Å', 'AA')
-    encoded = []
-    for char in text:
-        if char == ' ':
-            encoded.append(' ')  # mellemrum beholdes
-        elif char in SMS_KEYPAD:
-            encoded.append(SMS_KEYPAD[char])
-        else:
-            encoded.append('?')
-    return ' '.join(encoded)
-def sms_decode(code):
-    # Afkoder SMS-kode - forenklet: antager mellemrum mellem bogstaver
-    decoded = []
-    for token in code.strip().split():
-        # find bogstav ved at tælle længden af token og tallet
-        if not token:
-            decoded.append(' ')
-            continue
-        digit = token[0]
-        length = len(token)
-        # find bogstav der matcher tal og længde
-        match = '?'
-        for letter, seq in SMS_KEYPAD.items():
-            if seq == digit * length:
-                match = letter
-                break
-        decoded.append(match)
-    decoded_text = ''.join(decoded)
-    # Erstat AE OE AA tilbage til Æ Ø Å
-    decoded_text = decoded_text.replace('AE', 'Æ').replace('OE', 'Ø').replace('AA', 'Å')
-    return decoded_text
-
-def encode_100p(text):
-    text = text.upper()
-    encoded = []
-    for char in text:
-        if char == ' ':
-            encoded.append(' ')
-        elif char in polybius_100p:
-            encoded.append(polybius_100p[char])
-        else:
-            encoded.append('?')
-    return ' '.join(encoded)
-def decode_100p(code):
-    code = code.upper().strip()
-    decoded = []
-    tokens = code.split()
-    for token in tokens:
-        if token == '':
-            decoded.append(' ')
-        elif token in reverse_polybius_100p:
-            decoded.append(reverse_polybius_100p[token])
-        else:
-            decoded.append('?')
-    return ''.join(decoded)
-
-def int_to_roman(num):
-    val = [
-        1000, 900, 500, 400,
-        100, 90, 50, 40,
-        10, 9, 5, 4,
-        1
-    ]
-    syms = [
-        "M", "CM", "D", "CD",
-        "C", "XC", "L", "XL",
-        "X", "IX", "V", "IV",
-        "I"
-    ]
-    roman_num = ''
-    i = 0
-    while num > 0:
-        for _ in range(num // val[i]):
-            roman_num += syms[i]
-            num -= val[i]
-        i += 1
-    return roman_num
-def roman_to_int(s):
-    roman_dict = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
-    i = 0
-    num = 0
-    while i < len(s):
-        if i+1 < len(s) and roman_dict[s[i]] < roman_dict[s[i+1]]:
-            num += roman_dict[s[i+1]] - roman_dict[s[i]]
-            i += 2
-        else:
-            num += roman_dict[s[i]]
-            i += 1
-    return num
-
-def encode_roversprog(text):
-    vowels = "AEIOUYÆØÅaeiouyæøå"
-    result = ""
-    for char in text:
-        if char.lower() not in vowels and char.isalpha():
-            # konsonant: indsæt c + "o" + c (samme bogstav som konsonant)
-            result += char + "o" + char.lower()
-        else:
-            # vokal eller andet: behold som det er
-            result += char
-    return result
-def decode_roversprog(text):
-    vowels = "AEIOUYÆØÅaeiouyæøå"
-    result = ""
-    i = 0
-    while i < len(text):
-        c = text[i]
-        if c.lower() not in vowels and c.isalpha():
-            # Forvent mønster: c o c
-            if i + 2 < len(text) and text[i+1].lower() == "o" and text[i+2].lower() == c.lower():
-                result += c
-                i += 3
-            else:
-                # Hvis ikke mønsteret passer, behold bogstavet som det er
-                result += c
-                i += 1
-        else:
-            result += c
-            i += 1
-    return result
-
-def binærkode_tabel(text, encode=True):
-    # Tabel som dictionary
-    tabel = {
-        'A': '0000 0000', 'B': '0000 0001', 'C': '0000 0010', 'D': '0000 0011',
-        'E': '0000 0100', 'F': '0000 0101', 'G': '0000 0110', 'H': '0000 0111',
-        'I': '0000 1000', 'J': '0000 1001', 'K': '0000 1010', 'L': '0000 1011',
-        'M': '0000 1100', 'N': '0000 1101', 'O': '0000 1110', 'P': '0000 1111',
-        'Q': '0001 0000', 'R': '0001 0001', 'S': '0001 0010', 'T': '0001 0011',
-        'U': '0001 0100', 'V': '0001 0101', 'W': '0001 0110', 'X': '0001 0111',
-        'Y': '0001 1000', 'Z': '0001 1001', 'Æ': '0001 1010', 'Ø': '0001 1011', 'Å': '0001 1100'
-    }
-
-    if encode:
-        # Encoder tekst til binær
-        result = []
-        for char in text.upper():
-            if char in tabel:
-                result.append(tabel[char])
-            elif char == ' ':
-                result.append(' ')  # adskiller ord
-            else:
-                result.append('?')  # Ukendt tegn
-        return ' | '.join(result)
+def _morse_wav_file(morse, wpm, farnsworth, tone):
+    # WAV-filen skrives i bidder til en midlertidig fil (på disken, når den bliver stor)
+    fil = tempfile.SpooledTemporaryFile(max_size=8 << 20)
+    _hent("kodesamling.morselyd", "write_morse_wav")(morse, fil, wpm, farnsworth, tone)
+    fil.seek(0)
+    return fil
+
+LIVE_TEKST = "Live: kod mens du skriver"
+
+@st.fragment
+def live_felt(navn, lav, label, output_label):
+    # Kun dette fragment køres igen, når teksten ændres, og LiveKode i
+    # session state koder kun den ændrede del. navn indeholder siden og dens
+    # indstillinger, så en ny indstilling giver en ny LiveKode
+    user_input = st.text_area(label, key="live_input")
+    live = st.session_state.get("live")
+    if live is None or live[0] != navn:
+        try:
+            live = st.session_state["live"] = (navn, lav())
+        except ValueError as e:
+            st.error(str(e))
+            return
+    st.text_area(output_label, live[1].update(user_input))
+    st.caption(f"{live[1].kodet} af {len(user_input)} tegn kodet ved sidste ændring")
+
+# Sider for det, der ikke er en kode i registret (forklaringer, billeder,
+# bogkoden ...); alle koder i registret får standardsiden
+SIDER = {}
+
+def side(navn):
+    def registrer(func):
+        SIDER[navn] = func
+        return func
+    return registrer
+
+# Standardsiden for en kode kan udvides med ekstra tilstande (fx knækning
+# uden nøgle), live-kodning og indhold under formularen (tabeller, billeder)
+TILSTANDE = {}  # kode: {tilstand: func()}
+LIVE = {}       # kode: (tilstande, func(tilstand, params) -> LiveKode)
+EFTER = {}      # kode: func(tilstand, params)
+
+def tilstand(kode, navn):
+    def registrer(func):
+        TILSTANDE.setdefault(kode, {})[navn] = func
+        return func
+    return registrer
+
+def live(kode, *tilstande):
+    def registrer(func):
+        LIVE[kode] = (tilstande, func)
+        return func
+    return registrer
+
+def efter(kode):
+    def registrer(func):
+        EFTER[kode] = func
+        return func
+    return registrer
+
+def parameter_felt(parameter):
+    if parameter.slags == 'tal':
+        return int(st.number_input(parameter.label, min_value=parameter.mindst, value=parameter.standard, step=1))
+    if parameter.slags == 'flag':
+        return st.checkbox(parameter.label, value=parameter.standard)
+    if parameter.slags == 'tekstfelt':
+        return st.text_area(parameter.label, value=parameter.standard)
+    return st.text_input(parameter.label, value=parameter.standard)
+
+def standard_side(kode):
+    # Felterne kommer fra kodens parametre i registret
+    ekstra = TILSTANDE.get(kode.navn, {})
+    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod", *ekstra))
+    if mode in ekstra:
+        # Ekstra tilstande har deres egne felter; indholdet under siden får standardværdierne
+        params = {p.navn: p.standard for p in kode.parametre}
+        ekstra[mode]()
     else:
-        # Decoder binær til tekst
-        reverse_table = {v: k for k, v in tabel.items()}
-
-        # Fjern evt. whitespaces og split ved både | og mellemrum
-        blocks = []
-        if '|' in text:
-            # Hvis brugeren har brugt |, så brug det som separator
-            blocks = [b.strip() for b in text.split('|') if b.strip()]
-        else:
-            # Ellers split på grupper af 9 tegn (8 bit + 1 space)
-            raw = text.replace('\n', ' ').replace('\r', ' ')
-            raw = raw.strip()
-            while raw:
-                block = raw[:9].strip()
-                blocks.append(block)
-                raw = raw[9:].strip()
-
-        decoded_text = ""
-        for block in blocks:
-            if block == '':
-                decoded_text += ' '
-                continue
-            if block in reverse_table:
-                decoded_text += reverse_table[block]
-            else:
-                decoded_text += '?'
-        return decoded_text
-
-def vigenere_kode(text, nøgle, encode=True, alphabet=danish_alphabet_2):
-    result = ""
-    nøgle = nøgle.upper()
-    n = len(nøgle)
-    for i, char in enumerate(text.upper()):
-        if char in alphabet:
-            tekst_idx = alphabet.index(char)
-            nøgle_idx = alphabet.index(nøgle[i % n])
-            if encode:
-                ny_idx = (tekst_idx + nøgle_idx) % len(alphabet)
-            else:
-                ny_idx = (tekst_idx - nøgle_idx) % len(alphabet)
-            result += alphabet[ny_idx]
-        else:
-            result += char
-    return result
-
-
-    text = text.upper()
-    square = create_polybius_square()
-    sektorer = [text[i:i+5] for i in range(0, len(text), 5)]
-    result = ""
-
-    for sektor in sektorer:
-        coords = [letter_to_coords(c, square) for c in sektor if c.isalpha()]
-        coords = [c for c in coords if c is not None]
-
-        # Opdel koordinaterne i to lige store dele: første halvdel = rækker, anden halvdel = kolonner
-        half_len = len(coords) // 2
-
-        rækker = coords[:half_len]
-        kolonner = coords[half_len:]
-
-        # Hvis ulige antal bogstaver, håndter sidste koordinat
-        if len(coords) % 2 != 0:
-            # Sidste koordinat er delt i to tal, så tilføj begge tal til rækker og kolonner
-            sidste = coords[half_len]
-            rækker.append((sidste[0],))
-            kolonner.append((sidste[1],))
-
-        # Flad rækker og kolonner ud til talrækkefølge som par
-        # Nogle gange kan sidste element være tuple med 1 element - fix det:
-        rækker_flat = []
-        for r in rækker:
-            if isinstance(r, tuple) and len(r) == 1:
-                rækker_flat.append(r[0])
-            else:
-                rækker_flat.append(r[0])
-        kolonner_flat = []
-        for k in kolonner:
-            if isinstance(k, tuple) and len(k) == 1:
-                kolonner_flat.append(k[0])
-            else:
-                kolonner_flat.append(k[1])
-
-        nye_coords = list(zip(rækker_flat, kolonner_flat))
-
-        # Oversæt koordinater tilbage til bogstaver
-        nye_bogstaver = [coords_to_letter(c, square) for c in nye_coords]
-
-        result += "".join(nye_bogstaver)
-
-    return result
-
-def create_polybius_square():
-    # 5x5 firkant uden Æ, Ø, Å - I/J på samme plads
-    return [
-        ['A','B','C','D','E'],
-        ['F','G','H','I','K'],
-        ['L','M','N','O','P'],
-        ['Q','R','S','T','U'],
-        ['V','W','X','Y','Z']
-    ]
-def letter_to_coords(letter, square):
-    letter = letter.upper()
-    if letter == 'J':  # I/J deler plads
-        letter = 'I'
-    for row_idx, row in enumerate(square):
-        if letter in row:
-            return (row_idx + 1, row.index(letter) + 1)
-    return None
-def coords_to_letter(coords, square):
-    row, col = coords
-    return square[row - 1][col - 1]
-def bifid_encode(text):
-    text = text.upper().replace('J', 'I')
-    square = create_polybius_square()
-    # Del teksten op i sektorer af max 5 bogstaver
-    sektorer = [text[i:i+5] for i in range(0, len(text), 5)]
-    result = ""
-
-    for sektor in sektorer:
-        # Find koordinater for hvert bogstav i sektoren
-        coords = [letter_to_coords(c, square) for c in sektor if c.isalpha()]
-        # Split koordinater i rækker og kolonner
-        rækker = [r for r, c in coords]
-        kolonner = [c for r, c in coords]
-        # Kombiner rækker og kolonner i en ny række tal
-        nye_tal = rækker + kolonner
-        # Del op i nye koordinater (2 og 2 tal)
-        nye_coords = [(nye_tal[i], nye_tal[i + 1]) for i in range(0, len(nye_tal), 2)]
-        # Oversæt nye koordinater til bogstaver
-        nye_bogstaver = [coords_to_letter(coord, square) for coord in nye_coords]
-        result += "".join(nye_bogstaver)
-
-    return result
-def bifid_decode(text):
-    text = text.upper().replace('J', 'I')
-    square = create_polybius_square()
-    sektorer = [text[i:i+5] for i in range(0, len(text), 5)]
-    result = ""
-
-    for sektor in sektorer:
-        coords = [letter_to_coords(c, square) for c in sektor if c.isalpha()]
-        # Alle koordinater som tal i rækkefølge
-        tal = []
-        for r, c in coords:
-            tal.append(r)
-            tal.append(c)
-
-        # Halvér listen
-        halv = len(tal) // 2
-        # Første halvdel er rækker, anden halvdel er kolonner
-        rækker = tal[:halv]
-        kolonner = tal[halv:]
-
-        # Hvis ulige antal bogstaver, kan der være ét ekstra tal til kolonner
-        # Hvis det sker, fyldes rækker op tilsvarende
-        if len(kolonner) < len(rækker):
-            kolonner.append(tal[-1])
-
-        # Saml nye koordinater parvis
-        nye_coords = list(zip(rækker, kolonner))
-
-        # Oversæt til bogstaver
-        nye_bogstaver = [coords_to_letter(c, square) for c in nye_coords]
-        result += "".join(nye_bogstaver)
-
-    return result
-
-def bacon_code_encode(plaintext, covertext):
-    bacon_dict = {
-        'A': 'AAAAA', 'B': 'AAAAB', 'C': 'AAABA', 'D': 'AAABB',
-        'E': 'AABAA', 'F': 'AABAB', 'G': 'AABBA', 'H': 'AABBB',
-        'I': 'ABAAA', 'J': 'ABAAA',
-        'K': 'ABAAB', 'L': 'ABABA', 'M': 'ABABB', 'N': 'ABBAA',
-        'O': 'ABBAB', 'P': 'ABBBA', 'Q': 'ABBBB', 'R': 'BAAAA',
-        'S': 'BAAAB', 'T': 'BAABA', 'U': 'BAABB', 'V': 'BAABB',
-        'W': 'BABAA', 'X': 'BABAB', 'Y': 'BABBA', 'Z': 'BABBB'
-    }
-    plaintext = plaintext.upper().replace(" ", "")  # Fjern mellemrum i plaintext
-
-    code = ""
-    for char in plaintext:
-        if char in bacon_dict:
-            code += bacon_dict[char]
-        else:
-            code += 'AAAAA'  # ukendt tegn som AAAAA
-
-    if len(covertext) < len(code):
-        return "FEJL: Fyldteksten skal være mindst lige så lang som Bacon-koden (uden mellemrum)."
-
-    # Skjul Bacon-koden i fyldteksten med små og store bogstaver:
-    # 'A' i koden = små bogstaver i covertext, 'B' = store bogstaver
-    result_chars = list(covertext)  # konverter til liste så vi kan ændre bogstaver
-
-    # Brug kun de nødvendige antal bogstaver fra fyldteksten til kodning
-    j = 0  # index i code
-    for i in range(len(result_chars)):
-        if j >= len(code):
-            break
-        if result_chars[i].isalpha():  # kun bogstaver tæller i fyldtekst
-            if code[j] == 'A':
-                result_chars[i] = result_chars[i].lower()
-            else:
-                result_chars[i] = result_chars[i].upper()
-            j += 1
-        else:
-            # ikke-bogstav lader vi være som de er
-            pass
-
-    # resten af fyldteksten lader vi være uberørt
-    return "".join(result_chars)
-def bacon_code_decode(code_text):
-    bacon_dict = {
-        'A': 'AAAAA', 'B': 'AAAAB', 'C': 'AAABA', 'D': 'AAABB',
-        'E': 'AABAA', 'F': 'AABAB', 'G': 'AABBA', 'H': 'AABBB',
-        'I': 'ABAAA', 'J': 'ABAAA',
-        'K': 'ABAAB', 'L': 'ABABA', 'M': 'ABABB', 'N': 'ABBAA',
-        'O': 'ABBAB', 'P': 'ABBBA', 'Q': 'ABBBB', 'R': 'BAAAA',
-        'S': 'BAAAB', 'T': 'BAABA', 'U': 'BAABB', 'V': 'BAABB',
-        'W': 'BABAA', 'X': 'BABAB', 'Y': 'BABBA', 'Z': 'BABBB'
-    }
-    reverse_dict = {v: k for k, v in bacon_dict.items()}
-
-    # Oversæt input tekst til 'A' og 'B' baseret på små (a) og store (b) bogstaver
-    code = ""
-    for c in code_text:
-        if c.isalpha():
-            if c.islower():
-                code += 'A'
-            else:
-                code += 'B'
-
-    # Split i grupper af 5
-    result = ""
-    for i in range(0, len(code), 5):
-        block = code[i:i+5]
-        if len(block) < 5:
-            break
-        if block in reverse_dict:
-            # I/J og U/V håndteres som I og U
-            letter = reverse_dict[block]
-            if letter == 'J':
-                letter = 'I'
-            if letter == 'V':
-                letter = 'U'
-            result += letter
+        handling = "kod" if mode == "Kod" else "afkod"
+        params = {p.navn: parameter_felt(p) for p in kode.parametre_til(handling)}
+        output_label = "Kodet output:" if mode == "Kod" else "Afkodet output:"
+        live_tilstande, lav = LIVE.get(kode.navn, ((), None))
+        if mode in live_tilstande and st.checkbox(LIVE_TEKST):
+            live_felt((kode.navn, mode, *params.values()), lambda: lav(mode, params), kode.input_label, output_label)
         else:
-            result += '?'
-    return result
-    bacon_dict = {
-        'A': 'AAAAA', 'B': 'AAAAB', 'C': 'AAABA', 'D': 'AAABB',
-        'E': 'AABAA', 'F': 'AABAB', 'G': 'AABBA', 'H': 'AABBB',
-        'I': 'ABAAA', 'J': 'ABAAA',  # I/J deler kode
-        'K': 'ABAAB', 'L': 'ABABA', 'M': 'ABABB', 'N': 'ABBAA',
-        'O': 'ABBAB', 'P': 'ABBBA', 'Q': 'ABBBB', 'R': 'BAAAA',
-        'S': 'BAAAB', 'T': 'BAABA', 'U': 'BAABB', 'V': 'BAABB',  # U/V deler kode
-        'W': 'BABAA', 'X': 'BABAB', 'Y': 'BABBA', 'Z': 'BABBB'
-    }
-    if encode:
-        text = text.upper()
-        result = []
-        for char in text:
-            if char in bacon_dict:
-                result.append(bacon_dict[char])
-            elif char == ' ':
-                result.append(' ')  # bevare mellemrum
-            else:
-                result.append('?')
-        return ' '.join(result)
-    else:
-        # Decode - split i grupper af 5 tegn
-        text = text.replace(' ', '')
-        result = ""
-        for i in range(0, len(text), 5):
-            block = text[i:i+5]
-            if len(block) < 5:
-                break
-            # Find bogstav med match i bacon_dict
-            for k, v in bacon_dict.items():
-                if v == block:
-                    # Undgå dobbeltbogstaver (I/J og U/V) - altid brug I eller U
-                    if k in ['J', 'V']:
-                        result += k.replace('J', 'I').replace('V', 'U')
+            user_input = st.text_area(kode.input_label)
+            if st.button("Udfør"):
+                try:
+                    if mode == "Kod":
+                        st.text_area(output_label, kode.encode(user_input, **params))
                     else:
-                        result += k
-                    break
-            else:
-                result += '?'
-        return result
+                        st.text_area(output_label, kode.decode(user_input, **params))
+                except ValueError as e:
+                    st.error(str(e))
+    if kode.navn in EFTER:
+        EFTER[kode.navn](mode, params)
 
 
-# Streamlit app
-st.title("Kodesamling")
-
-method = st.selectbox("Vælg metode:", (
-    "100P-koden",
-    "Alfa-Nr.",
-    "Baconkode",
-    "Bifid",
-    "Binærkode",
-    "Bogkoden",
-    "Frimurerkode",
-    "Kinesisk skrift",
-    "Kodeordskode",
-    "Morsekode",
-    "Punktskrift",
-    "ROT-X",
-    "Romertal",
-    "Røversprog",
-    "Semaforkode",
-    "Tastaturkode",
-    "Vigenère"
-))
-
-
-if method == "Morsekode":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    user_input = st.text_area("Indtast tekst eller morsekode:")
+@tilstand("Morsekode", "Kod som lyd (WAV)")
+def morse_som_lyd():
+    morse_wav_chunks, morse_wav_seconds = _hent("kodesamling.morselyd", "morse_wav_chunks", "morse_wav_seconds")
+    user_input = st.text_area("Indtast tekst:")
+    wpm = st.slider("Ord pr. minut (tegn):", 5, 40, 20)
+    farnsworth = st.slider("Ord pr. minut i alt (Farnsworth, lavere = længere pauser):", 5, 40, wpm)
+    tone = st.slider("Tone (Hz):", 300, 3000, 700, step=50)
     if st.button("Udfør"):
-        if mode == "Kod":
-            result = encode_to_morse(user_input)
-            st.text_area("Kodet output:", result)
+        result = KODER["Morsekode"].encode(user_input)
+        st.text_area("Kodet output:", result)
+        sekunder = morse_wav_seconds(result, wpm, farnsworth)
+        # Korte beskeder kan afspilles direkte; filen til download
+        # skrives først, når der trykkes på knappen
+        if sekunder <= 120:
+            st.audio(b''.join(morse_wav_chunks(result, wpm, farnsworth, tone)), format="audio/wav")
+        st.download_button(
+            f"Hent som lyd (WAV, {sekunder:.0f} sekunder)",
+            data=lambda: _morse_wav_file(result, wpm, farnsworth, tone),
+            file_name="morse.wav",
+            mime="audio/wav",
+        )
+
+@tilstand("Morsekode", "Afkod uden skilletegn")
+def morse_uden_skilletegn():
+    # Fx "......-...-": bogstaverne gættes ud fra, hvad der ligner dansk
+    user_input = st.text_area("Indtast morsekode (/ og // må mangle helt eller delvist):")
+    if st.button("Udfør") and user_input.strip():
+        læsninger = _hent("kodesamling.morseopdeling", "morse_readings")(user_input)
+        if læsninger:
+            st.text_area("Mest sandsynlige læsning:", læsninger[0][1])
+            st.dataframe(pd.DataFrame([(tekst, round(bits / max(len(tekst), 1), 2)) for bits, tekst in læsninger],
+                                      columns=["Læsning", "Bits pr. tegn (lavere er mere dansk)"]),
+                         hide_index=True)
         else:
-            result = decode_from_morse(user_input)
+            st.warning("Ingen prikker eller streger i input.")
+
+@tilstand("Morsekode", "Afkod lyd (WAV)")
+def morse_fra_lyd():
+    # Fx en optaget fløjte; optagelsen læses i blokke, så den må gerne være lang
+    lydfil = st.file_uploader("Upload en optagelse af morsekode (WAV):", type=["wav"])
+    if st.button("Udfør") and lydfil is not None:
+        stats = {}
+        try:
+            morse, result = _hent("kodesamling.morselyd", "decode_morse_wav")(lydfil, stats=stats)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.text_area("Morsekode:", morse)
             st.text_area("Afkodet output:", result)
+            if 'prik_ms' in stats:
+                st.caption(f"{stats['sekunder']:.1f} sekunder lyd, én prik ≈ {stats['prik_ms']:.0f} ms "
+                           f"(ca. {1200 / stats['prik_ms']:.0f} ord pr. minut)")
+
+@live("Morsekode", "Kod")
+def morse_live(mode, params):
+    return _hent("kodesamling.live", "live_morse")()
 
+@efter("Morsekode")
+def morse_tabel(mode, params):
     # Vis morsekode-tabel billede nederst, skaleret til fuld bredde
     st.markdown("---")
-    st.image("https://simplecode.dk/wp-content/uploads/2020/04/Morsen%C3%B8gle.png", use_container_width=True)
+    _billede("morse")
 
-elif method == "ROT-X":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    key_letter = st.text_input("Indtast nøglebogstav (A-Å):").upper()
-    offset = danish_alphabet.index(key_letter) if key_letter in danish_alphabet else 0
+@tilstand("ROT-X", "Afkod uden nøgle")
+def rot_x_uden_nøgle():
     user_input = st.text_area("Indtast tekst:")
     if st.button("Udfør"):
-        if mode == "Kod":
-            result = rot_x_encode(user_input, offset)
-            st.text_area("Kodet output:", result)
-        else:
-            result = rot_x_decode(user_input, offset)
-            st.text_area("Afkodet output:", result)
-
-elif method == "Alfa-Nr.":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    user_input = st.text_area("Indtast tekst eller kode:")
-    if st.button("Udfør"):
-        if mode == "Kod":
-            result = alpha_num_encode(user_input)
-            st.text_area("Kodet output:", result)
-        else:
-            result = alpha_num_decode(user_input)
-            st.text_area("Afkodet output:", result)
-
+        # Prøv alle forskydninger og vis de mest danske først (færrest bits er bedst)
+        kandidater = _hent("kodesamling.knaek", "rot_x_crack")(user_input, top=5, preview=300)
+        best_offset = kandidater[0][0]
+        st.text_area(f"Bedste bud (nøgle {danish_alphabet[best_offset]}):",
+                     KODER["ROT-X"].decode(user_input, offset=best_offset))
+        df = pd.DataFrame(
+            [(danish_alphabet[o], o, round(score, 2), tekst) for o, score, tekst in kandidater],
+            columns=["Nøgle", "Forskydning", "Bits pr. bogstav", "Afkodet tekst"],
+        )
+        st.dataframe(df, hide_index=True)
+
+@efter("Alfa-Nr.")
+def alfa_nr_tabel(mode, params):
     # Divider alfabet i to med lige mange bogstaver, vis som to tabeller side om side
     split_index = math.ceil(len(danish_alphabet) / 2)
     first_half = danish_alphabet[:split_index]
@@ -700,61 +248,58 @@ elif method == "Alfa-Nr.":
     number_row_2 = "| " + " | ".join([str(i+split_index+1) for i in range(len(second_half))]) + " |"
     st.markdown(f"{header_row_2}\n{separator_row_2}\n{number_row_2}")
 
-elif method == "Kodeordskode":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    keyword = st.text_input("Indtast kodeord (brug A-Å, uden W):", value="SJAK").upper()
-    user_input = st.text_area("Indtast tekst:")
-    if st.button("Udfør"):
-        if mode == "Kod":
-            result = kodeordskode_encode(user_input, keyword)
-            st.text_area("Kodet output:", result)
-        else:
-            result = kodeordskode_decode(user_input, keyword)
-            st.text_area("Afkodet output:", result)
-
+def kodeord_tabel(keyword):
     # Lav og vis tabel med to rækker: øverste og nederste række i kodeordskoden
-    top_row, bottom_row = keyword_cipher_setup(keyword)
+    top_row, bottom_row = keyword_cipher_setup(keyword.upper())
 
     # Juster længder for visning (fyld med tomme strenge hvis nødvendigt)
     max_len = max(len(top_row), len(bottom_row))
     top_row += [''] * (max_len - len(top_row))
     bottom_row += [''] * (max_len - len(bottom_row))
-
-    df = pd.DataFrame([top_row, bottom_row])
-    # Vis uden index og kolonne-headers
     display_two_row_table(top_row, bottom_row)
 
-elif method == "SMS-kode":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    user_input = st.text_area("Indtast tekst eller kode:")
+@tilstand("Kodeordskode", "Afkod uden kodeord")
+def kodeord_uden_kodeord():
+    kode = KODER["Kodeordskode"]
+    ordliste = st.file_uploader("Upload ordliste med mulige kodeord (ét pr. linje):", type=["txt"])
+    user_input = st.text_area(kode.input_label)
     if st.button("Udfør"):
-        if mode == "Kod":
-            result = sms_encode(user_input)
-            st.text_area("Kodet output:", result)
-        else:
-            result = sms_decode(user_input)
-            st.text_area("Afkodet output:", result)
-
-elif method == "Frimurerkode":
+        if ordliste is None:
+            st.warning("Upload en ordliste først.")
+            return
+        # Ordbogsangreb: de bedste kodeord vises løbende mens listen gennemgås
+        words = ordliste.getvalue().decode("utf-8", errors="ignore").splitlines()
+        progress = st.progress(0.0)
+        tabel = st.empty()
+        best = []
+        for done, total, best in _hent("kodesamling.knaek", "kodeord_crack")(user_input, words, top=10):
+            progress.progress(done / total if total else 1.0, text=f"{done} af {total} unikke kodeord")
+            tabel.dataframe(
+                pd.DataFrame([(word, round(score, 2), tekst) for score, word, tekst in best],
+                             columns=["Kodeord", "Bits pr. bogstav", "Afkodet tekst"]),
+                hide_index=True,
+            )
+        if best:
+            keyword = best[0][1].upper()
+            st.text_area(f"Bedste bud (kodeord {keyword}):", kode.decode(user_input, keyword=keyword))
+            kodeord_tabel(keyword)
+
+@efter("Kodeordskode")
+def kodeordskode_tabel(mode, params):
+    if mode in ("Kod", "Afkod"):
+        kodeord_tabel(params["keyword"])
+
+@side("Frimurerkode")
+def side_frimurerkode():
     st.header("Frimurerkode")
 
-    st.image(FRIMURER_BILLEDE_URL, use_container_width=True)
+    _billede("frimurer")
     
     st.markdown("---")
     tekst = st.text_area("Skriv dine resultater her:", height=200)
 
-elif method == "100P-koden":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    user_input = st.text_area("Indtast tekst eller kode:")
-    if st.button("Udfør"):
-        if mode == "Kod":
-            result = encode_100p(user_input)
-            st.text_area("Kodet output:", result)
-        else:
-            result = decode_100p(user_input)
-            st.text_area("Afkodet output:", result)
-
-elif method == "Romertal":
+@side("Romertal")
+def side_romertal():
     mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
     user_input = st.text_input("Indtast tal (for kod) eller romertal (for afkod):").upper()
     if st.button("Udfør"):
@@ -771,15 +316,53 @@ elif method == "Romertal":
                 result = "Ugyldigt romertal."
             st.text_area("Afkodet output:", result)
 
-elif method == "Tastaturkode":
-    st.image(
-        "https://cdn.shopify.com/s/files/1/0810/3669/files/danish-windows-keyboard-layout-keyshorts_1024x1024.png?3916",
-        use_container_width=True
-    )
+@side("Tastaturkode")
+def side_tastaturkode():
+    _billede("tastatur")
 
     result_input = st.text_area("Skriv din kode eller tekst her:")
 
-elif method == "Bogkoden":
+@tilstand("SMS-kode", "Kod med T9")
+def sms_t9_kod():
+    user_input = st.text_area(KODER["SMS-kode"].input_label)
+    if st.button("Udfør"):
+        st.text_area("Kodet output:", value=_hent("kodesamling.t9", "t9_encode")(user_input), height=150)
+
+@tilstand("SMS-kode", "Afkod med T9")
+def sms_t9_afkod():
+    ordliste = st.file_uploader(
+        "Egen ordliste (valgfri, ét ord pr. linje, de hyppigste først eller 'ord antal'):", type=["txt"])
+    user_input = st.text_area(KODER["SMS-kode"].input_label)
+    if st.button("Udfør"):
+        standard_ordbog, ordbog_fra_tekst, segments_text = _hent(
+            "kodesamling.t9", "standard_ordbog", "ordbog_fra_tekst", "segments_text")
+        ordbog = ordbog_fra_tekst(ordliste.getvalue()) if ordliste else standard_ordbog()
+        with maaling.Måling("T9 afkod", len(user_input)):
+            segments = ordbog.segments(user_input.strip())
+        result = segments_text(segments)
+        st.text_area("Afkodet output:", value=result, height=150)
+        # Andre ord med samme taster, hyppigste først
+        flertydige = [(cifre, words[0], ", ".join(words[1:6]))
+                      for cifre, words in segments if words and len(words) > 1]
+        if flertydige:
+            st.markdown("**Andre mulige ord:**")
+            st.dataframe(pd.DataFrame(flertydige, columns=["Taster", "Valgt", "Andre muligheder"]),
+                         hide_index=True)
+        st.caption(f"Ordlisten har {len(ordbog)} forskellige tastesekvenser.")
+
+@efter("SMS-kode")
+def sms_forklaring(mode, params):
+    st.markdown("""
+    Med **flere tryk** (Kod og Afkod) trykker man på tasten, til bogstavet
+    kommer frem: HEJ bliver til 44 33 5. Med **T9** trykkes hver tast kun
+    én gang (HEJ bliver til 435), og ordet gættes ud fra en ordliste. Med
+    T9 kan mellemrummene mellem ordene udelades; så findes ordene ud fra,
+    hvilke der er mest almindelige.
+    """)
+
+@side("Bogkoden")
+def side_bogkoden():
+    Bog, save_book = _hent("kodesamling.bogkode", "Bog", "save_book")
     st.markdown("""
     Med bogkode kan man sende beskeder til
     andre, som har den samme bog/tekst, som du
@@ -836,7 +419,42 @@ elif method == "Bogkoden":
     blive til “skal du med på vm”
     """)
 
-elif method == "Kinesisk skrift":
+    st.markdown("---")
+    st.markdown("### Kod og afkod med din egen bog")
+    bogfil = st.file_uploader("Upload bogen som tekstfil (UTF-8):", type=["txt"])
+    bogsti = st.text_input("... eller skriv stien til en tekstfil på computeren:")
+    linjer_pr_side = st.number_input(
+        "Linjer pr. side (0 = siderne er adskilt af sideskift, eller hele teksten er én side). "
+        "Eksemplet ovenfor har 6 linjer pr. side.",
+        min_value=0, value=0, step=1,
+    )
+    mode = st.radio("Vælg tilstand:", ("Afkod", "Kod"))
+    bogstaver = st.radio("Variant:", ("Ord", "Bogstaver")) == "Bogstaver"
+    tilfældig = mode == "Kod" and st.checkbox("Vælg tilfældigt blandt ordets/bogstavets forekomster")
+    user_input = st.text_area("Indtast talkoder (fx 24,12,3):" if mode == "Afkod" else "Indtast tekst:")
+
+    if st.button("Udfør"):
+        if bogfil is None and not bogsti:
+            st.warning("Upload eller vælg en bog først.")
+        else:
+            try:
+                # Uploadede bøger gemmes på disken, så de kan mmap'es, og
+                # indekset ved siden af dem genbruges ved næste kørsel
+                sti = save_book(bogfil.getvalue()) if bogfil is not None else bogsti
+                with Bog(sti, int(linjer_pr_side)) as bog:
+                    if mode == "Afkod":
+                        result = bog.decode(user_input, bogstaver)
+                    else:
+                        result = bog.encode(user_input, bogstaver, tilfældig)
+                    st.caption(f"Bogen har {bog.pages} sider.")
+                st.text_area("Resultat:", value=result, height=150)
+            except ValueError as e:
+                st.error(str(e))
+            except OSError as e:
+                st.error(f"Kan ikke åbne bogen: {e}")
+
+@side("Kinesisk skrift")
+def side_kinesisk_skrift():
     st.markdown("""
     Kinesisk skrift er teksten skrevet bagfra. Altså
     hvor du staver ordet med det sidste bogstav
@@ -855,17 +473,8 @@ elif method == "Kinesisk skrift":
     ”tgilemme hpoT”
     """)
 
-elif method == "Røversprog":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    user_input = st.text_area("Indtast tekst:")
-    if st.button("Udfør"):
-        if mode == "Kod":
-            result = encode_roversprog(user_input)
-            st.text_area("Kodet output:", result)
-        else:
-            result = decode_roversprog(user_input)
-            st.text_area("Afkodet output:", result)
-    
+@efter("Røversprog")
+def røversprog_forklaring(mode, params):
     st.markdown("""
     Røversprog er en simpel måde at lave sit eget
     kodesprog på, hvor man indsætter ekstra
@@ -883,12 +492,14 @@ elif method == "Røversprog":
     anden vokal end O.
     """)
 
-elif method == "Punktskrift":
-    st.image("https://blind.dk/wp-content/uploads/2024/01/Punktskrift-alfabet-576x1024.png", use_container_width=True)
+@side("Punktskrift")
+def side_punktskrift():
+    _billede("punktskrift", 480)
     user_input = st.text_area("Skriv dine observationer/resultater her løbende:")
 
-elif method == "Semaforkode":
-    st.image("https://friluftsaktiviteter.dk/wp-content/uploads/2019/03/Semafor.jpg", use_container_width=True)
+@side("Semaforkode")
+def side_semaforkode():
+    _billede("semafor")
     user_input = st.text_area("Skriv dine observationer/resultater her løbende:")
     st.markdown("""
     Semaforkode er et signaleringssystem, hvor to flag holdes i forskellige positioner for at angive bogstaver.  
@@ -897,119 +508,113 @@ elif method == "Semaforkode":
     Brug tekstfeltet til at notere dine oversættelser eller observationer løbende.
     """)
 
-elif method == "Binærkode":
-    st.markdown("## Binærkode (fast tabel)")
+@efter("Binærkode")
+def binær_tabel(mode, params):
     st.markdown("""
     Denne kode bruger et fast binært alfabet fra A til Å.
     """)
-    choice = st.radio("Vælg handling:", ["Kod", "Afkod"])
-    user_input = st.text_area("Indtast tekst eller binærkode:")
-    
-    # "Udfør"-knap
-    if st.button("Udfør"):
-        if user_input:
-            if choice == "Kod":
-                result = binærkode_tabel(user_input, encode=True)
-            else:
-                result = binærkode_tabel(user_input, encode=False)
-            st.text_area("Resultat:", value=result, height=150)
-        else:
-            st.warning("Indtast venligst noget tekst eller kode først.")
-
-    # Oversættelsestabel
-    tabel = {
-        'A': '0000 0000', 'B': '0000 0001', 'C': '0000 0010', 'D': '0000 0011',
-        'E': '0000 0100', 'F': '0000 0101', 'G': '0000 0110', 'H': '0000 0111',
-        'I': '0000 1000', 'J': '0000 1001', 'K': '0000 1010', 'L': '0000 1011',
-        'M': '0000 1100', 'N': '0000 1101', 'O': '0000 1110', 'P': '0000 1111',
-        'Q': '0001 0000', 'R': '0001 0001', 'S': '0001 0010', 'T': '0001 0011',
-        'U': '0001 0100', 'V': '0001 0101', 'W': '0001 0110', 'X': '0001 0111',
-        'Y': '0001 1000', 'Z': '0001 1001', 'Æ': '0001 1010', 'Ø': '0001 1011', 'Å': '0001 1100'
-    }
-
-    # Konverter til DataFrame
-    df = pd.DataFrame(list(tabel.items()), columns=["Bogstav", "Binærkode"])
-
-    # Fjern indekset helt
-    df = df.reset_index(drop=True)
-
+    # Oversættelsestabel, regnet ud af koden selv
+    df = pd.DataFrame(binær_table(), columns=["Bogstav", "Binærkode"])
     st.dataframe(df, use_container_width=False)
 
-elif method == "Vigenère":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    nøgleord = st.text_input("Indtast nøgleord (A-Å):").upper()
-    user_input = st.text_area("Indtast tekst:")
-
+@side("Ukendt kode")
+def side_ukendt_kode():
+    TIDSGRÆNSE, UDSNIT, identify = _hent("kodesamling.genkend", "TIDSGRÆNSE", "UDSNIT", "identify")
+    st.write("Indsæt en kode, så prøves de koder, der kan passe til tegnene, og resultaterne sorteres efter hvor meget de ligner dansk.")
+    user_input = st.text_area("Indtast kode:")
     if st.button("Udfør"):
-        if not nøgleord.isalpha() or len(nøgleord) == 0:
-            st.error("Nøgleord skal kun indeholde bogstaver og må ikke være tomt.")
+        results, slow = identify(user_input)
+        if not results:
+            st.error("Teksten passer ikke til nogen af koderne.")
         else:
-            if mode == "Kod":
-                result = vigenere_kode(user_input, nøgleord, encode=True)
-                st.text_area("Kodet output:", result)
-            else:
-                result = vigenere_kode(user_input, nøgleord, encode=False)
-                st.text_area("Afkodet output:", result)
-
-elif method == "Bifid":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-    user_input = st.text_area("Indtast tekst:")
+            score, name, decoded = results[0]
+            st.success(f"Bedste bud: {name}")
+            st.text_area("Afkodet output:", decoded)
+            if len(user_input.strip()) > UDSNIT:
+                st.caption(f"Kun de første ca. {UDSNIT} tegn er afkodet.")
+            # Lavere score = mere dansk
+            df = pd.DataFrame(
+                [(n, round(s, 2), d[:80]) for s, n, d in results],
+                columns=["Metode", "Bits pr. bogstav", "Afkodet tekst"],
+            )
+            st.dataframe(df, use_container_width=True, hide_index=True)
+        if slow:
+            st.caption(f"Udeladt, fordi de brugte mere end {TIDSGRÆNSE} sekunder hver: {', '.join(slow)}")
+
+@tilstand("Vigenère", "Afkod uden nøgle")
+def vigenère_uden_nøgle():
+    user_input = st.text_area(KODER["Vigenère"].input_label)
     if st.button("Udfør"):
-        if mode == "Kod":
-            result = bifid_encode(user_input)
-            st.text_area("Kodet output:", result)
-        else:
-            result = bifid_decode(user_input)
-            st.text_area("Afkodet output:", result)
-
-elif method == "Baconkode":
-    mode = st.radio("Vælg tilstand:", ("Kod", "Afkod"))
-
-    if mode == "Kod":
-        plaintext = st.text_input("Indtast hemmelig kode:")
-
-        # Minimum fyldtekst længde (uden mellemrum)
-        min_cover_length = len(plaintext.replace(" ", "")) * 5 if plaintext else 0
-
-        if plaintext:
-            st.info(f"Fyldteksten skal være mindst {min_cover_length} bogstaver lang (uden mellemrum).")
-
-        covertext = st.text_area("Indtast fyldtekst (skal være mindst lige så lang som Bacon-koden):")
-
-        # Længde uden mellemrum
-        cover_length = len(covertext.replace(" ", ""))
-        progress = min(cover_length / min_cover_length, 1.0) if min_cover_length > 0 else 1.0
-
-        st.progress(progress)
-
-        # Vis besked om længde med farve - opdateres live mens du skriver
-        if min_cover_length > 0:
-            if cover_length < min_cover_length:
-                st.markdown(f"<p style='color: red;'>Fyldteksten er for kort med {min_cover_length - cover_length} bogstaver.</p>", unsafe_allow_html=True)
-            elif cover_length > min_cover_length:
-                st.markdown(f"<p style='color: red;'>Fyldteksten er for lang med {cover_length - min_cover_length} bogstaver.</p>", unsafe_allow_html=True)
-            else:
-                st.markdown(f"<p style='color: green;'>Fyldteksten har den korrekte længde.</p>", unsafe_allow_html=True)
-
-        # Knap til at udføre kodning - kræver at både tekst og fyldtekst er udfyldt og korrekt længde
-        if st.button("Udfør"):
-            if plaintext and covertext:
-                if cover_length < min_cover_length:
-                    st.warning("Fyldteksten er for kort til at skjule hele den skjulte tekst.")
-                else:
-                    output = bacon_code_encode(plaintext, covertext)
-                    st.text_area("Kodet tekst:", output, height=150)
-            else:
-                st.warning("Indtast både tekst og fyldtekst!")
-
-    else:  # Afkod
-        coded_text = st.text_area("Indtast kodet tekst (brug små og store bogstaver):")
-        if st.button("Udfør"):
-            if coded_text:
-                output = bacon_code_decode(coded_text)
-                st.text_area("Afkodet tekst:", output, height=150)
-            else:
-                st.warning("Indtast kodet tekst!")
-
+        vigenere_crack, friedman_length = _hent("kodesamling.knaek", "vigenere_crack", "friedman_length")
+        perioder, nøgler = vigenere_crack(user_input, top=5, preview=300)
+        if not nøgler:
+            st.error("Teksten indeholder ingen bogstaver.")
+            return
+        # Nøglelængde ud fra IoC og Kasiski, nøgle ud fra hver kolonnes bogstavfordeling
+        nøgle = nøgler[0][0]
+        st.text_area(f"Bedste bud (nøgle {nøgle}):", KODER["Vigenère"].decode(user_input, nøgle=nøgle))
+        st.dataframe(pd.DataFrame(
+            [(n, len(n), round(bits, 2), tekst) for n, bits, tekst in nøgler],
+            columns=["Nøgle", "Længde", "Bits pr. bogstav", "Afkodet tekst"],
+        ), hide_index=True)
+        ioc = next(ioc for periode, ioc, _, _ in perioder if periode == 1)
+        st.caption(f"Friedmans skøn over nøglelængden: {friedman_length(ioc):.1f}. "
+                   "Mest sandsynlige perioder:")
+        st.dataframe(pd.DataFrame(
+            [(periode, round(ioc, 4), round(kasiski, 2), round(score, 2))
+             for periode, ioc, kasiski, score in perioder[:10]],
+            columns=["Periode", "IoC", "Kasiski-andel", "Score"],
+        ), hide_index=True)
+
+@live("Vigenère", "Kod", "Afkod")
+def vigenère_live(mode, params):
+    nøgle = params["nøgle"].upper()
+    if not nøgle.isalpha():
+        raise ValueError("Nøgleord skal kun indeholde bogstaver og må ikke være tomt.")
+    return _hent("kodesamling.live", "live_vigenere")(nøgle, mode == "Kod")
+
+@live("Bifid", "Kod", "Afkod")
+def bifid_live(mode, params):
+    square = create_danish_square() if params["dansk"] else create_polybius_square()
+    return _hent("kodesamling.live", "live_bifid")(mode == "Kod", params["period"], square)
+
+@efter("Bifid")
+def bifid_firkant(mode, params):
+    square = create_danish_square() if params["dansk"] else create_polybius_square()
+    st.dataframe(pd.DataFrame(square, index=range(1, len(square) + 1), columns=range(1, len(square) + 1)))
+
+@live("Baconkode", "Afkod")
+def bacon_live(mode, params):
+    return _hent("kodesamling.live", "live_bacon_decode")()
+
+@efter("Baconkode")
+def bacon_kapacitet(mode, params):
+    # Kun bogstaver i fyldteksten kan bære koden; hvert skjult bogstav bruger fem
+    if mode == "Kod" and params["covertext"]:
+        cover_length, capacity = bacon_capacity(params["covertext"])
+        st.caption(f"Fyldteksten har {cover_length} bogstaver og kan skjule op til {capacity} tegn.")
 
+# Streamlit app
+st.title("Kodesamling")
 
+method = st.selectbox("Vælg metode:", sorted(SIDER.keys() | KODER.keys()))
+if method in SIDER:
+    SIDER[method]()
+else:
+    standard_side(KODER[method])
+
+maaling.registrer(f"side: {method}", time.perf_counter() - _side_start)
+
+if st.sidebar.checkbox("Vis målinger"):
+    # Fejlsøgning: hvilke koder, sider og billeder tager tiden
+    st.sidebar.checkbox("Mål hukommelse (tracemalloc)", value=maaling.tracemalloc_aktiv(),
+                        key="tracemalloc", on_change=lambda: maaling.set_tracemalloc(st.session_state.tracemalloc))
+    rows = maaling.oversigt()
+    if rows:
+        st.sidebar.dataframe(pd.DataFrame(
+            [(r["navn"], r["kald"], r["bytes"] // r["kald"], round(r["middel_ms"], 2), r["p95_ms"],
+              r["peak_bytes"] // 1024) for r in rows],
+            columns=["Navn", "Kald", "Bytes pr. kald", "Middel ms", "p95 ms ≤", "Peak KB"],
+        ), hide_index=True)
+    if st.sidebar.button("Nulstil målinger"):
+        maaling.nulstil()